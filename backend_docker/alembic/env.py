@@ -0,0 +1,66 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.config import settings
+from app.database import Base
+from app import models, search  # noqa: F401  (register tables and the search index DDL)
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+# DATABASE_URL from the app settings wins over alembic.ini
+config.set_main_option("sqlalchemy.url", settings.database_url)
+
+target_metadata = Base.metadata
+
+def include_name(name, type_, parent_names) -> bool:
+    # FTS5 shadow tables are managed by app.search, not by autogenerate
+    return not (type_ == "table" and name.startswith(("goals_fts", "tasks_fts")))
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def _run(connection) -> None:
+    # Batch mode lets ALTER-style migrations run on SQLite
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run(connection)
+        return
+    # Every user shard carries the same schema; autogenerate compares against shard 0 only
+    urls = [config.get_main_option("sqlalchemy.url")]
+    command = config.cmd_opts.cmd[0].__name__ if config.cmd_opts is not None else None
+    if command not in ("revision", "check"):
+        urls += [url.strip() for url in settings.database_shard_urls.split(",") if url.strip()]
+    for shard, url in enumerate(urls):
+        # Shard-specific revisions (the user directory lives on shard 0) read this
+        config.attributes["shard"] = shard
+        connectable = create_engine(url, poolclass=pool.NullPool)
+        with connectable.connect() as connection:
+            _run(connection)
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
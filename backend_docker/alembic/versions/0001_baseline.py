@@ -0,0 +1,65 @@
+"""Baseline schema: users, goals, tasks and task dependencies
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "goals",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("user_id", sa.Uuid(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(50)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+
+    op.create_table(
+        "tasks",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("goal_id", sa.Uuid(), sa.ForeignKey("goals.id"), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("status", sa.String(50)),
+        sa.Column("duration_days", sa.Integer()),
+        sa.Column("start_date", sa.DateTime(timezone=True)),
+        sa.Column("end_date", sa.DateTime(timezone=True)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+
+    op.create_table(
+        "task_dependencies",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("task_id", sa.Uuid(), sa.ForeignKey("tasks.id"), nullable=False),
+        sa.Column("depends_on_task_id", sa.Uuid(), sa.ForeignKey("tasks.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+def downgrade() -> None:
+    op.drop_table("task_dependencies")
+    op.drop_table("tasks")
+    op.drop_table("goals")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_table("users")
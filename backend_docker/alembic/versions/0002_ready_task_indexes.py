@@ -0,0 +1,24 @@
+"""Indexes for the ready-tasks query and per-user / per-goal lookups
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index("ix_goals_user_id", "goals", ["user_id"])
+    op.create_index("ix_tasks_goal_id_status", "tasks", ["goal_id", "status"])
+    op.create_index("ix_task_dependencies_task_id", "task_dependencies", ["task_id"])
+    op.create_index("ix_task_dependencies_depends_on_task_id", "task_dependencies", ["depends_on_task_id"])
+
+def downgrade() -> None:
+    op.drop_index("ix_task_dependencies_depends_on_task_id", table_name="task_dependencies")
+    op.drop_index("ix_task_dependencies_task_id", table_name="task_dependencies")
+    op.drop_index("ix_tasks_goal_id_status", table_name="tasks")
+    op.drop_index("ix_goals_user_id", table_name="goals")
@@ -0,0 +1,60 @@
+"""Cold-tier tables for archived goals, tasks and dependencies
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "archived_goals",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("user_id", sa.Uuid(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(50)),
+        sa.Column("created_at", sa.DateTime(timezone=True)),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("task_count", sa.Integer(), nullable=False),
+        sa.Column("completed_tasks", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_archived_goals_user_id", "archived_goals", ["user_id"])
+
+    op.create_table(
+        "archived_tasks",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("goal_id", sa.Uuid(), sa.ForeignKey("archived_goals.id"), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("status", sa.String(50)),
+        sa.Column("duration_days", sa.Integer()),
+        sa.Column("start_date", sa.DateTime(timezone=True)),
+        sa.Column("end_date", sa.DateTime(timezone=True)),
+        sa.Column("created_at", sa.DateTime(timezone=True)),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_archived_tasks_goal_id", "archived_tasks", ["goal_id"])
+
+    op.create_table(
+        "archived_task_dependencies",
+        sa.Column("id", sa.Uuid(), primary_key=True),
+        sa.Column("task_id", sa.Uuid(), sa.ForeignKey("archived_tasks.id"), nullable=False),
+        sa.Column("depends_on_task_id", sa.Uuid(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_archived_task_dependencies_task_id", "archived_task_dependencies", ["task_id"])
+
+def downgrade() -> None:
+    op.drop_index("ix_archived_task_dependencies_task_id", table_name="archived_task_dependencies")
+    op.drop_table("archived_task_dependencies")
+    op.drop_index("ix_archived_tasks_goal_id", table_name="archived_tasks")
+    op.drop_table("archived_tasks")
+    op.drop_index("ix_archived_goals_user_id", table_name="archived_goals")
+    op.drop_table("archived_goals")
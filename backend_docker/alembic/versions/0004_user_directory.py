@@ -0,0 +1,39 @@
+"""User directory mapping users to shards
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+Existing users are all on the single pre-sharding database, so the
+backfill records them on shard 0. The directory lives on shard 0 only;
+other shards skip this revision's DDL.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def _on_directory_shard() -> bool:
+    # Set per database by alembic/env.py and app.migrations; a plain upgrade is shard 0
+    return op.get_context().config.attributes.get("shard", 0) == 0
+
+def upgrade() -> None:
+    if not _on_directory_shard():
+        return
+    op.create_table(
+        "user_directory",
+        sa.Column("user_id", sa.Uuid(), primary_key=True),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("shard", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_user_directory_email", "user_directory", ["email"], unique=True)
+    op.execute("INSERT INTO user_directory (user_id, email, shard) SELECT id, email, 0 FROM users")
+
+def downgrade() -> None:
+    if not _on_directory_shard():
+        return
+    op.drop_index("ix_user_directory_email", table_name="user_directory")
+    op.drop_table("user_directory")
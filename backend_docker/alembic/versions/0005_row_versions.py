@@ -0,0 +1,22 @@
+"""Version counters on goals and tasks for optimistic concurrency
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column("goals", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+    op.add_column("tasks", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+def downgrade() -> None:
+    # Plain DROP COLUMN (SQLite 3.35+) keeps the search triggers that a batch table copy would lose
+    op.drop_column("tasks", "version")
+    op.drop_column("goals", "version")
@@ -0,0 +1,24 @@
+"""Persist plan generation status of batch-created goals
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column("goals", sa.Column("batch_id", sa.Uuid(), nullable=True))
+    op.add_column("goals", sa.Column("plan_status", sa.String(20), nullable=True))
+    op.create_index("ix_goals_batch_id", "goals", ["batch_id"])
+
+def downgrade() -> None:
+    op.drop_index("ix_goals_batch_id", table_name="goals")
+    # Plain drops: batch mode would rebuild goals and lose the search triggers
+    op.drop_column("goals", "plan_status")
+    op.drop_column("goals", "batch_id")
@@ -0,0 +1,24 @@
+"""Full-text search index on goals and tasks
+
+Its own revision, so databases stamped at the baseline (created before
+migrations existed) get it on upgrade as well.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+from app.search import create_search_index, drop_search_index
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # IF NOT EXISTS throughout: databases migrated before this revision already have it
+    create_search_index(op.get_bind())
+
+def downgrade() -> None:
+    drop_search_index(op.get_bind())
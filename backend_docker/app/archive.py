@@ -0,0 +1,211 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import UUID
+import asyncio
+import fcntl
+import hashlib
+import logging
+import os
+import tempfile
+
+from sqlalchemy import case, delete, func, insert, literal, or_, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app import models
+from app.plan_jobs import PENDING, PROCESSING
+
+logger = logging.getLogger(__name__)
+
+# pg_try_advisory_lock key shared by every worker compacting the same database
+COMPACTION_LOCK_ID = 0x7A5C_A7C1
+
+def _candidates(db: Session, completed_before: datetime, limit: int) -> List[tuple]:
+    """(goal id, user id) of goals due for the cold tier: archived, or completed before the cutoff
+
+    Goals whose plan is still being generated are left for a later run,
+    so the generated tasks are not written after the goal moved.
+    """
+    last_change = func.coalesce(models.Goal.updated_at, models.Goal.created_at)
+    return db.execute(
+        select(models.Goal.id, models.Goal.user_id).where(
+            or_(
+                models.Goal.status == "archived",
+                (models.Goal.status == "completed") & (last_change < completed_before)
+            ),
+            or_(models.Goal.plan_status.is_(None), models.Goal.plan_status.notin_([PENDING, PROCESSING]))
+        ).limit(limit)
+    ).all()
+
+def move_goals_to_cold_tier(db: Session, goal_ids: List[UUID]) -> Dict[str, int]:
+    """Copy goals with their tasks and dependencies into the archive tables and delete the hot rows
+
+    Set-based INSERT ... SELECT and DELETE statements; the caller commits.
+    """
+    task_ids = select(models.Task.id).where(models.Task.goal_id.in_(goal_ids))
+
+    goals = db.execute(insert(models.ArchivedGoal).from_select(
+        ["id", "user_id", "text", "status", "created_at", "updated_at", "archived_at",
+         "task_count", "completed_tasks"],
+        select(
+            models.Goal.id, models.Goal.user_id, models.Goal.text, models.Goal.status,
+            models.Goal.created_at, models.Goal.updated_at, func.now(),
+            func.count(models.Task.id),
+            func.coalesce(func.sum(case((models.Task.status == "completed", 1), else_=0)), 0)
+        ).outerjoin(models.Task).where(models.Goal.id.in_(goal_ids)).group_by(models.Goal.id)
+    )).rowcount
+
+    task_columns = ["id", "goal_id", "name", "description", "status", "duration_days",
+                    "start_date", "end_date", "created_at", "updated_at"]
+    tasks = db.execute(insert(models.ArchivedTask).from_select(
+        task_columns,
+        select(*(getattr(models.Task, c) for c in task_columns)).where(models.Task.goal_id.in_(goal_ids))
+    )).rowcount
+
+    dependency_columns = ["id", "task_id", "depends_on_task_id", "created_at"]
+    dependencies = db.execute(insert(models.ArchivedTaskDependency).from_select(
+        dependency_columns,
+        select(*(getattr(models.TaskDependency, c) for c in dependency_columns))
+        .where(models.TaskDependency.task_id.in_(task_ids))
+    )).rowcount
+
+    # Children first; hot edges pointing into the moved tasks go too
+    db.execute(delete(models.TaskDependency).where(or_(
+        models.TaskDependency.task_id.in_(task_ids),
+        models.TaskDependency.depends_on_task_id.in_(task_ids)
+    )))
+    db.execute(delete(models.Task).where(models.Task.goal_id.in_(goal_ids)))
+    db.execute(delete(models.Goal).where(models.Goal.id.in_(goal_ids)))
+    return {"goals": goals, "tasks": tasks, "dependencies": dependencies}
+
+def compact(db: Session, completed_before: datetime, batch_size: int = 200) -> Dict[str, int]:
+    """Move every due goal to the cold tier, one transaction per batch"""
+    from app.crud import user_data_changed
+
+    totals = {"goals": 0, "tasks": 0, "dependencies": 0}
+    while True:
+        batch = _candidates(db, completed_before, batch_size)
+        if not batch:
+            break
+        try:
+            moved = move_goals_to_cold_tier(db, [goal_id for goal_id, _ in batch])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        for key, count in moved.items():
+            totals[key] += count
+        by_user: Dict[UUID, list] = {}
+        for goal_id, user_id in batch:
+            by_user.setdefault(user_id, []).append(goal_id)
+        for user_id, goal_ids in by_user.items():
+            user_data_changed(user_id, goal_ids)
+    return totals
+
+@contextmanager
+def compaction_lock(engine: Engine) -> Iterator[bool]:
+    """Try to become the only process compacting this database; yields whether it did
+
+    PostgreSQL uses a session advisory lock on a dedicated connection, so
+    workers on any host exclude each other. A SQLite file can only be
+    shared by processes on one host, which an flock on a file derived
+    from its path covers. Anything else (in-memory SQLite) is per process.
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            taken = conn.execute(select(func.pg_try_advisory_lock(COMPACTION_LOCK_ID))).scalar()
+            try:
+                yield bool(taken)
+            finally:
+                if taken:
+                    conn.execute(select(func.pg_advisory_unlock(COMPACTION_LOCK_ID)))
+        return
+    database = engine.url.database
+    if engine.dialect.name != "sqlite" or not database or database == ":memory:":
+        yield True
+        return
+    digest = hashlib.sha1(os.path.abspath(database).encode()).hexdigest()[:16]
+    with open(os.path.join(tempfile.gettempdir(), f"taskplanner-compaction-{digest}.lock"), "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def run_compaction() -> Dict[str, int]:
+    """Compact every shard this process can lock; shards another worker is compacting are skipped"""
+    from app import database
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.archive_completed_after_days)
+    totals = {"goals": 0, "tasks": 0, "dependencies": 0}
+    for shard, shard_engine in enumerate(database.shard_engines):
+        with compaction_lock(shard_engine) as locked:
+            if not locked:
+                logger.debug("Shard %s is being compacted by another worker", shard)
+                continue
+            db = database.SessionLocal()
+            db.info["shard"] = shard
+            try:
+                for key, count in compact(db, cutoff, settings.archive_batch_size).items():
+                    totals[key] += count
+            finally:
+                db.close()
+    return totals
+
+async def compaction_loop(interval: float) -> None:
+    """Background job: periodically move archived and long-completed goals to the cold tier"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            moved = await asyncio.to_thread(run_compaction)
+            if moved["goals"]:
+                logger.info("Archived %d goals, %d tasks, %d dependencies to the cold tier",
+                            moved["goals"], moved["tasks"], moved["dependencies"])
+        except Exception as e:
+            logger.error("Archive compaction failed: %s", e)
+
+def get_archived_goal(db: Session, goal_id: UUID, user_id: UUID) -> Optional[Dict[str, Any]]:
+    """A cold-tier goal of the user with its tasks and their dependencies, or None"""
+    goal = db.execute(
+        select(models.ArchivedGoal).where(models.ArchivedGoal.id == goal_id, models.ArchivedGoal.user_id == user_id)
+    ).scalar_one_or_none()
+    if goal is None:
+        return None
+    tasks = db.execute(
+        select(models.ArchivedTask).where(models.ArchivedTask.goal_id == goal_id).order_by(models.ArchivedTask.created_at)
+    ).scalars().all()
+    dependencies: Dict[UUID, list] = {}
+    for dep in db.execute(
+        select(models.ArchivedTaskDependency).where(models.ArchivedTaskDependency.task_id.in_(
+            select(models.ArchivedTask.id).where(models.ArchivedTask.goal_id == goal_id)
+        ))
+    ).scalars():
+        dependencies.setdefault(dep.task_id, []).append(dep)
+    return {
+        "id": goal.id, "text": goal.text, "status": goal.status, "created_at": goal.created_at,
+        "archived_at": goal.archived_at, "task_count": goal.task_count, "completed_tasks": goal.completed_tasks,
+        "tasks": [
+            {**{c: getattr(task, c) for c in ("id", "goal_id", "name", "description", "status", "duration_days",
+                                               "start_date", "end_date", "created_at")},
+             "dependencies": dependencies.get(task.id, [])}
+            for task in tasks
+        ],
+    }
+
+def archived_goals_summary_query(user_id: UUID):
+    """Cold-tier goals shaped like crud.get_user_goals_summary rows"""
+    return select(
+        models.ArchivedGoal.id,
+        models.ArchivedGoal.text,
+        models.ArchivedGoal.status,
+        models.ArchivedGoal.created_at,
+        models.ArchivedGoal.task_count,
+        models.ArchivedGoal.completed_tasks,
+        literal(True).label("archived")
+    ).where(models.ArchivedGoal.user_id == user_id)
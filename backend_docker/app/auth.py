@@ -1,21 +1,27 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
+from uuid import UUID
+import hashlib
+import secrets
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.config import settings
 from app import models
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing, set up on first use so imports stay cheap
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def authenticate_user(db: Session, email: str, password: str) -> Optional[models.User]:
     from app import crud
@@ -37,6 +43,20 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
+def new_refresh_token(user_id: UUID) -> str:
+    """Random refresh token, prefixed with the user id so it can be routed to the user's shard"""
+    return f"{user_id.hex}.{secrets.token_urlsafe(32)}"
+
+def hash_refresh_token(token: str) -> str:
+    # Refresh tokens are 256 random bits, so a fast hash is enough (bcrypt is for guessable passwords)
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def refresh_token_user_id(token: str) -> Optional[UUID]:
+    try:
+        return UUID(hex=token.split(".", 1)[0])
+    except ValueError:
+        return None
+
 def verify_token(token: str) -> Optional[str]:
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
@@ -60,6 +80,10 @@ def get_current_user(db: Session, token: str) -> models.User:
 
     from app import crud
     user = crud.get_user_by_email(db, email)
+    if user is None and getattr(db, "uses_replica", lambda: False)():
+        # A just-registered user may not have reached the replica yet
+        db.info["force_primary"] = True
+        user = crud.get_user_by_email(db, email)
     if user is None:
         raise credentials_exception
 
@@ -0,0 +1,271 @@
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+import itertools
+import json
+import math
+import threading
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from app.config import settings
+
+# Keys of views that belong to one goal start with this; every other key is a user-wide view
+GOAL_PREFIX = "goal:"
+# Entries stored with a max_age are wrapped in {EXPIRES_AT: <epoch seconds>, "value": ...}
+EXPIRES_AT = "__expires_at__"
+
+def goal_key(goal_id: UUID, view: str = "") -> str:
+    return f"{GOAL_PREFIX}{goal_id}" + (f":{view}" if view else "")
+
+class LRUBackend:
+    """In-process entries, one dict per user; the least recently used users are evicted beyond ``max_users``
+
+    Each worker process has its own copy, so with several workers a write
+    only invalidates the worker that handled it. Use the Redis backend there.
+    Entries expire ``ttl_seconds`` after they were stored (0 = never).
+    """
+
+    def __init__(self, max_users: int = 1000, ttl_seconds: float = 0.0, clock=time.monotonic):
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._data: "OrderedDict[UUID, Dict[str, Tuple[Any, float]]]" = OrderedDict()
+        self._generations: "OrderedDict[UUID, int]" = OrderedDict()
+        self._writes: "OrderedDict[UUID, float]" = OrderedDict()
+        # Process-wide, so a generation dropped with an evicted user is never handed out again
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def get(self, user_id: UUID, key: str) -> Optional[Any]:
+        with self._lock:
+            entries = self._data.get(user_id)
+            if entries is None or key not in entries:
+                return None
+            value, expires_at = entries[key]
+            if expires_at and expires_at <= self.clock():
+                del entries[key]
+                return None
+            self._data.move_to_end(user_id)
+            return value
+
+    def set(self, user_id: UUID, key: str, value: Any) -> None:
+        expires_at = self.clock() + self.ttl_seconds if self.ttl_seconds > 0 else 0.0
+        with self._lock:
+            self._data.setdefault(user_id, {})[key] = (value, expires_at)
+            self._data.move_to_end(user_id)
+            while len(self._data) > self.max_users:
+                self._data.popitem(last=False)
+
+    def generation(self, user_id: UUID) -> int:
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def bump(self, user_id: UUID) -> None:
+        with self._lock:
+            self._generations[user_id] = next(self._counter)
+            self._generations.move_to_end(user_id)
+            while len(self._generations) > self.max_users:
+                self._generations.popitem(last=False)
+
+    def mark_write(self, user_id: UUID, keep_seconds: float) -> None:
+        with self._lock:
+            self._writes[user_id] = self.clock()
+            self._writes.move_to_end(user_id)
+            # The oldest writes go first; they are the least likely to still be within the window
+            while len(self._writes) > self.max_users:
+                self._writes.popitem(last=False)
+
+    def written_within(self, user_id: UUID, seconds: float) -> bool:
+        with self._lock:
+            written_at = self._writes.get(user_id)
+        return written_at is not None and self.clock() - written_at < seconds
+
+    def keys(self, user_id: UUID) -> List[str]:
+        with self._lock:
+            return list(self._data.get(user_id, ()))
+
+    def delete(self, user_id: UUID, keys: List[str]) -> None:
+        with self._lock:
+            entries = self._data.get(user_id)
+            for key in keys if entries is not None else ():
+                entries.pop(key, None)
+
+    def clear(self, user_id: UUID) -> None:
+        with self._lock:
+            self._data.pop(user_id, None)
+
+class RedisBackend:
+    """Entries shared by all workers, one Redis hash per user holding JSON values
+
+    ``client`` is anything with redis-py's hget/hset/hkeys/hdel/delete/expire
+    and get/set/incr methods. The hash expires ``ttl_seconds`` after its
+    last write, which bounds memory for users who stop writing. The user's
+    generation and last-write time live in separate keys so clearing the
+    hash keeps them; write times are wall-clock, shared by every worker.
+    """
+
+    def __init__(self, client, ttl_seconds: float = 3600.0, prefix: str = "taskplanner:cache"):
+        self.client = client
+        self.ttl_seconds = int(ttl_seconds)
+        self.prefix = prefix
+
+    def _name(self, user_id: UUID) -> str:
+        return f"{self.prefix}:{user_id}"
+
+    def get(self, user_id: UUID, key: str) -> Optional[Any]:
+        raw = self.client.hget(self._name(user_id), key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, user_id: UUID, key: str, value: Any) -> None:
+        name = self._name(user_id)
+        self.client.hset(name, key, json.dumps(value))
+        if self.ttl_seconds > 0:
+            self.client.expire(name, self.ttl_seconds)
+
+    def keys(self, user_id: UUID) -> List[str]:
+        return [key.decode() if isinstance(key, bytes) else key for key in self.client.hkeys(self._name(user_id))]
+
+    def generation(self, user_id: UUID) -> int:
+        return int(self.client.get(f"{self._name(user_id)}:generation") or 0)
+
+    def bump(self, user_id: UUID) -> None:
+        name = f"{self._name(user_id)}:generation"
+        self.client.incr(name)
+        if self.ttl_seconds > 0:
+            self.client.expire(name, self.ttl_seconds)
+
+    def mark_write(self, user_id: UUID, keep_seconds: float) -> None:
+        self.client.set(f"{self._name(user_id)}:written", repr(time.time()), ex=max(1, math.ceil(keep_seconds)))
+
+    def written_within(self, user_id: UUID, seconds: float) -> bool:
+        raw = self.client.get(f"{self._name(user_id)}:written")
+        return raw is not None and time.time() - float(raw) < seconds
+
+    def delete(self, user_id: UUID, keys: List[str]) -> None:
+        if keys:
+            self.client.hdel(self._name(user_id), *keys)
+
+    def clear(self, user_id: UUID) -> None:
+        self.client.delete(self._name(user_id))
+
+class UserCache:
+    """Per-user cache of computed read views, invalidated by crud writes
+
+    Keys are ``goal_key(goal_id, view)`` for views of one goal and plain
+    names ("dashboard", "goals:...") for views spanning the user's goals.
+    A write to some goals drops those goals' views and the user-wide ones;
+    views of the user's other goals stay cached. Values are stored in
+    their JSON form, so both backends hand back the same plain data.
+
+    Every invalidation bumps the user's generation before deleting. A
+    view computed after a miss is stored with the generation ``lookup``
+    returned, and dropped again if the generation has moved on since: the
+    write it raced with either sees the stored entry when it deletes, or
+    the store sees the bumped generation afterwards.
+
+    A view stored with ``max_age`` (one read from a possibly lagging
+    replica) is served for at most that long, whatever the backend TTL.
+    """
+
+    def __init__(self, backend=None, clock=time.time):
+        self.backend = backend if backend is not None else LRUBackend()
+        self.clock = clock
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, key: str, event: str) -> None:
+        # Stats are grouped by view kind: "goal:<id>:tasks" counts as "goal:tasks"
+        if key.startswith(GOAL_PREFIX):
+            view = key.split(":", 2)[2:]
+            kind = f"goal:{view[0]}" if view else "goal"
+        else:
+            kind = key.split(":", 1)[0]
+        with self._lock:
+            counts = self._stats.setdefault(kind, {"hits": 0, "misses": 0, "sets": 0, "stale": 0})
+            counts[event] += 1
+
+    def get(self, user_id: UUID, key: str) -> Optional[Any]:
+        value = self.backend.get(user_id, key)
+        if isinstance(value, dict) and EXPIRES_AT in value:
+            value = value["value"] if value[EXPIRES_AT] > self.clock() else None
+        self._count(key, "hits" if value is not None else "misses")
+        return value
+
+    def lookup(self, user_id: UUID, key: str) -> Tuple[Optional[Any], int]:
+        """The cached view (or None) and the generation to pass to ``set`` after a miss"""
+        generation = self.backend.generation(user_id)
+        return self.get(user_id, key), generation
+
+    def set(self, user_id: UUID, key: str, value: Any, generation: Optional[int] = None,
+            max_age: Optional[float] = None) -> Any:
+        """Store a view and return it in its cached (JSON) form
+
+        With ``generation`` from ``lookup`` the entry is discarded if the
+        user's data changed while the view was being computed. With
+        ``max_age`` it expires after that many seconds (0: not stored).
+        """
+        value = jsonable_encoder(value)
+        if max_age is not None and max_age <= 0:
+            return value
+        stored = value if max_age is None else {EXPIRES_AT: self.clock() + max_age, "value": value}
+        self.backend.set(user_id, key, stored)
+        if generation is not None and self.backend.generation(user_id) != generation:
+            self.backend.delete(user_id, [key])
+            self._count(key, "stale")
+        else:
+            self._count(key, "sets")
+        return value
+
+    def mark_write(self, user_id: Optional[UUID], keep_seconds: float) -> None:
+        """Remember that the user just committed a write (read-your-writes stickiness)"""
+        if user_id is not None:
+            self.backend.mark_write(user_id, keep_seconds)
+
+    def has_recent_write(self, user_id: Optional[UUID], seconds: float) -> bool:
+        return user_id is not None and seconds > 0 and self.backend.written_within(user_id, seconds)
+
+    def invalidate_goals(self, user_id: Optional[UUID], goal_ids: Iterable[UUID]) -> None:
+        if user_id is None:
+            return
+        self.backend.bump(user_id)
+        prefixes = tuple(goal_key(goal_id) for goal_id in goal_ids)
+        self.backend.delete(user_id, [
+            key for key in self.backend.keys(user_id)
+            if not key.startswith(GOAL_PREFIX) or key.startswith(prefixes)
+        ])
+
+    def invalidate_user(self, user_id: Optional[UUID]) -> None:
+        if user_id is None:
+            return
+        self.backend.bump(user_id)
+        self.backend.clear(user_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_kind = {kind: dict(counts) for kind, counts in self._stats.items()}
+        hits = sum(counts["hits"] for counts in by_kind.values())
+        misses = sum(counts["misses"] for counts in by_kind.values())
+        for counts in by_kind.values():
+            lookups = counts["hits"] + counts["misses"]
+            counts["hit_ratio"] = round(counts["hits"] / lookups, 3) if lookups else None
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else None,
+            "by_kind": by_kind,
+        }
+
+def create_backend():
+    if settings.cache_backend == "redis":
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis needs the redis package (pip install redis)") from e
+        return RedisBackend(redis.Redis.from_url(settings.cache_redis_url), settings.cache_ttl_seconds)
+    return LRUBackend(settings.cache_max_users, settings.cache_ttl_seconds)
+
+# Global instance
+user_cache = UserCache(create_backend())
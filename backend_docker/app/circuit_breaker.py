@@ -0,0 +1,78 @@
+from typing import Any, Callable, Dict
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """Stops calling a degraded dependency until it has had time to recover
+
+    Closed: calls go through, and ``failure_threshold`` consecutive
+    failures (calls slower than ``slow_call_seconds`` included) open the
+    circuit. Open: ``allow()`` is False for ``reset_seconds``. Half-open:
+    a single probe call is let through; its success closes the circuit,
+    its failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float, slow_call_seconds: float,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.clock = clock
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.slow_calls = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; every True must be followed by a record_* or release()"""
+        with self._lock:
+            if self.state == OPEN:
+                if self.clock() - self.opened_at < self.reset_seconds:
+                    return False
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def record_success(self, seconds: float) -> None:
+        if seconds > self.slow_call_seconds:
+            self.slow_calls += 1
+            self.record_failure()
+            return
+        with self._lock:
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.times_opened += 1
+                self.state = OPEN
+                self.opened_at = self.clock()
+            self._probing = False
+
+    def release(self) -> None:
+        """The allowed call was abandoned (cancelled) without an outcome"""
+        with self._lock:
+            self._probing = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "slow_calls": self.slow_calls,
+        }
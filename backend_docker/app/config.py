@@ -4,21 +4,88 @@ from typing import Optional
 class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///./taskplanner.db"
+    database_replica_url: Optional[str] = None  # read-only handlers use this when set
+    replica_sticky_seconds: float = 5.0  # reads stay on the primary this long after a user's write
+    database_shard_urls: str = ""  # comma-separated extra user shards; database_url is shard 0
+    shard_directory_ttl_seconds: float = 60.0  # how long user -> shard lookups are cached
+    db_migrate_on_startup: bool = False  # otherwise startup only checks the schema is at the Alembic head
 
     # JWT
     secret_key: str = "your-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    refresh_token_expire_days: int = 30  # refresh tokens rotate on every use
 
     # Groq
     groq_api_key: str = ""
+    llm_json_mode: bool = True  # ask the provider for a JSON object response
+    llm_prompt_version: str = "v2"
+    llm_max_tokens: int = 2000  # ceiling for the adaptive max_tokens budget
+    llm_min_max_tokens: int = 400
+    llm_max_concurrency: int = 4  # concurrent plan generations, keep under the provider rate limit
+    llm_connect_timeout: float = 5.0
+    llm_read_timeout: float = 30.0
+    llm_pool_max_connections: int = 20
+    llm_pool_max_keepalive: int = 10
+    llm_keepalive_expiry: float = 60.0  # seconds an idle pooled connection is kept open
+    llm_http2: bool = True  # used only when the h2 package is installed
+    llm_generation_deadline_seconds: float = 45.0  # end-to-end budget for all attempts, backoffs included
+    llm_breaker_failure_threshold: int = 5  # consecutive failed (or too slow) calls that open the circuit
+    llm_breaker_reset_seconds: float = 30.0  # how long the circuit stays open before one probe call
+    llm_slo_seconds: float = 15.0  # a successful call slower than this counts as a failure
+
+    # Plan reuse (similarity index over previously generated plans)
+    plan_index_path: str = "./plan_index.npz"  # empty keeps the index in memory only
+    plan_reuse_threshold: float = 0.9  # reuse an existing plan outright at or above this similarity
+    plan_fewshot_threshold: float = 0.3  # include similar plans as examples at or above this
+    plan_fewshot_examples: int = 2
+
+    # Archive tier: archived and long-completed goals move to cold tables
+    archive_interval_seconds: float = 3600.0  # how often the compaction job runs; 0 disables it
+    archive_completed_after_days: int = 30
+    archive_batch_size: int = 200  # goals moved per transaction
+
+    # Timeline (GET /timeline)
+    timeline_daily_capacity: float = 1.0  # task-days of work a user gets through per day
+    timeline_horizon_days: int = 365  # work beyond this many days is left unscheduled
+
+    # Read cache
+    cache_backend: str = "memory"  # memory (per worker process) or redis (shared; needs the redis package)
+    cache_redis_url: str = "redis://localhost:6379/0"
+    cache_max_users: int = 1000  # memory backend: users whose views are kept
+    cache_ttl_seconds: float = 3600.0  # entries expire this long after they are written (redis: after the user's last write)
+
+    # Idempotency-Key support for POST /goals/ and /goals/{id}/regenerate-tasks
+    idempotency_ttl_seconds: float = 86400.0  # how long a stored response is replayed
+    idempotency_wait_seconds: float = 10.0  # how long a duplicate waits for the first request to finish
 
     # App
     environment: str = "development"
-    debug: bool = True
+    debug: bool = False  # enables auto-reload in run.py; keep off outside local development
     api_v1_str: str = "/api/v1"
     project_name: str = "Smart Task Planner"
 
+    # Server (production mode: python run.py --production)
+    web_host: str = "0.0.0.0"
+    web_port: int = 8000
+    web_workers: int = 0  # 0 sizes the pool from the CPU count (1 unless CACHE_BACKEND=redis)
+    shutdown_drain_seconds: float = 25.0  # wait this long for in-flight plan generations on shutdown
+
+    # Metrics
+    metrics_token: str = ""  # GET /metrics needs "Authorization: Bearer <token>"; empty disables it
+
+    # Query monitoring
+    slow_query_threshold_ms: float = 200.0
+    n_plus_one_threshold: int = 10
+
+    # Logging: records go through a bounded queue to a background writer thread
+    log_level: str = "INFO"
+    log_format: str = "json"  # json or text
+    log_queue_size: int = 10000  # records beyond this are dropped (and counted), never blocking
+    log_max_message_chars: int = 2000  # longer messages and tracebacks are truncated
+    log_sample_burst: int = 20  # below ERROR, records per call site per window; 0 disables sampling
+    log_sample_window_seconds: float = 60.0
+
     class Config:
         env_file = ".env"
 
@@ -1,28 +1,92 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func,case
-from typing import List, Optional
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, case, select, insert, update, delete, tuple_, literal, union_all
+from typing import Any, Iterable, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
 import uuid
 
 from app import models, schemas
-from app.auth import get_password_hash
+from app.auth import get_password_hash, hash_refresh_token, new_refresh_token
+from app.cache import user_cache
+from app.plan_jobs import PENDING
+from app.config import settings
+from app.database import mark_user_write
+from app.graph import transitive_reduction
+from app.archive import archived_goals_summary_query
+
+class StaleVersionError(Exception):
+    """Raised when an update's expected version is no longer the stored one"""
+
+    def __init__(self, current_version: int):
+        super().__init__(f"Row is at version {current_version}")
+        self.current_version = current_version
+
+def user_data_changed(user_id: Optional[UUID], goal_ids: Optional[Iterable[UUID]] = None) -> None:
+    """Called after every committed write to a user's goals, tasks or dependencies
+
+    ``goal_ids`` names the goals the write touched; only their cached views
+    (and the user-wide ones) are dropped. Without it all are.
+    """
+    if goal_ids is None:
+        user_cache.invalidate_user(user_id)
+    else:
+        user_cache.invalidate_goals(user_id, goal_ids)
+    # Keep this user's reads on the primary until the replica has caught up
+    mark_user_write(user_id)
 
 # User CRUD operations
 def get_user(db: Session, user_id: UUID) -> Optional[models.User]:
     return db.query(models.User).filter(models.User.id == user_id).first()
 
+def _shard_router(db: Session):
+    """The session's shard router when more than one shard is configured"""
+    router = getattr(db, "shard_router", None)
+    return router if router is not None and router.sharded else None
+
 def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
+    router = _shard_router(db)
+    if router is not None:
+        # Login and token checks find the user's shard in the directory first
+        entry = router.lookup_email(email)
+        if entry is None:
+            return None
+        db.info["shard"] = entry[1]
     return db.query(models.User).filter(models.User.email == email).first()
 
 def create_user(db: Session, user: schemas.UserCreate) -> models.User:
+    """Create a user on its shard and register it in the directory
+
+    With several shards the directory (shard 0) and the user's shard commit
+    separately: the directory row is written first, reserving the email,
+    and deleted again if the user row cannot be committed.
+    """
     hashed_password = get_password_hash(user.password)
     db_user = models.User(
+        id=uuid.uuid4(),
         email=user.email,
         name=user.name,
         hashed_password=hashed_password
     )
-    db.add(db_user)
-    db.commit()
+    router = _shard_router(db)
+    if router is None:
+        db.add(db_user)
+        db.add(models.UserDirectory(user_id=db_user.id, email=user.email, shard=0))
+        db.commit()
+        db.refresh(db_user)
+        return db_user
+
+    shard = db.info["shard"] = router.place(db_user.id)
+    with router.directory_engine.begin() as directory:
+        directory.execute(insert(models.UserDirectory).values(user_id=db_user.id, email=user.email, shard=shard))
+    try:
+        db.add(db_user)
+        db.commit()
+    except Exception:
+        db.rollback()
+        with router.directory_engine.begin() as directory:
+            directory.execute(delete(models.UserDirectory).where(models.UserDirectory.user_id == db_user.id))
+        router.forget(user_id=db_user.id, email=user.email)
+        raise
     db.refresh(db_user)
     return db_user
 
@@ -35,13 +99,106 @@ def update_user(db: Session, user_id: UUID, user_update: schemas.UserUpdate) ->
     if "password" in update_data:
         update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
 
+    old_email = db_user.email
+    was_active = db_user.is_active
     for field, value in update_data.items():
         setattr(db_user, field, value)
+    if db_user.email != old_email:
+        db.query(models.UserDirectory).filter(
+            models.UserDirectory.user_id == user_id
+        ).update({"email": db_user.email})
+    if "hashed_password" in update_data or (was_active and not db_user.is_active):
+        # A new password or a deactivation ends every existing session
+        db.execute(
+            update(models.RefreshToken)
+            .where(models.RefreshToken.user_id == user_id, models.RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.now(timezone.utc))
+        )
 
     db.commit()
     db.refresh(db_user)
+    router = _shard_router(db)
+    if router is not None:
+        router.forget(email=old_email)
     return db_user
 
+# Refresh token operations
+def _issue_refresh_token(db: Session, user_id: UUID, family_id: UUID, now: datetime) -> str:
+    token = new_refresh_token(user_id)
+    db.execute(insert(models.RefreshToken).values(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        token_hash=hash_refresh_token(token),
+        family_id=family_id,
+        expires_at=now + timedelta(days=settings.refresh_token_expire_days)
+    ))
+    return token
+
+def create_refresh_token(db: Session, user_id: UUID) -> str:
+    """Start a new refresh token family (one per login); the user's expired tokens are dropped"""
+    now = datetime.now(timezone.utc)
+    db.execute(delete(models.RefreshToken).where(
+        models.RefreshToken.user_id == user_id,
+        models.RefreshToken.expires_at < now
+    ))
+    token = _issue_refresh_token(db, user_id, uuid.uuid4(), now)
+    db.commit()
+    return token
+
+def rotate_refresh_token(db: Session, user_id: UUID, token: str) -> Optional[Tuple[models.User, str]]:
+    """Exchange a refresh token for the next one in its family
+
+    Returns None for unknown, expired or revoked tokens. Presenting a
+    token that was already rotated means it leaked (or was replayed), so
+    the whole family is revoked and that login has to start over.
+    """
+    now = datetime.now(timezone.utc)
+    row = db.execute(
+        select(models.RefreshToken.id, models.RefreshToken.family_id).where(
+            models.RefreshToken.token_hash == hash_refresh_token(token),
+            models.RefreshToken.user_id == user_id,
+            models.RefreshToken.expires_at > now
+        )
+    ).first()
+    if row is None:
+        db.rollback()
+        return None
+
+    # Conditional UPDATE, so of two concurrent refreshes with one token only one wins
+    claimed = db.execute(
+        update(models.RefreshToken)
+        .where(models.RefreshToken.id == row.id, models.RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+        .returning(models.RefreshToken.id)
+    ).first()
+    user = get_user(db, user_id) if claimed is not None else None
+    if user is None or not user.is_active:
+        db.execute(
+            update(models.RefreshToken)
+            .where(models.RefreshToken.family_id == row.family_id, models.RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+        )
+        db.commit()
+        return None
+
+    new_token = _issue_refresh_token(db, user_id, row.family_id, now)
+    db.commit()
+    return user, new_token
+
+def revoke_refresh_token(db: Session, user_id: UUID, token: str) -> bool:
+    """Revoke the token's family (logout); False if the token is unknown"""
+    family_id = select(models.RefreshToken.family_id).where(
+        models.RefreshToken.token_hash == hash_refresh_token(token),
+        models.RefreshToken.user_id == user_id
+    ).scalar_subquery()
+    result = db.execute(
+        update(models.RefreshToken)
+        .where(models.RefreshToken.family_id == family_id, models.RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+    db.commit()
+    return result.rowcount > 0
+
 # Goal CRUD operations
 def get_goal(db: Session, goal_id: UUID, user_id: UUID) -> Optional[models.Goal]:
     return db.query(models.Goal).filter(
@@ -49,6 +206,9 @@ def get_goal(db: Session, goal_id: UUID, user_id: UUID) -> Optional[models.Goal]
         models.Goal.user_id == user_id
     ).first()
 
+def get_goal_owner_id(db: Session, goal_id: UUID) -> Optional[UUID]:
+    return db.query(models.Goal.user_id).filter(models.Goal.id == goal_id).scalar()
+
 def get_user_goals(db: Session, user_id: UUID, skip: int = 0, limit: int = 100) -> List[models.Goal]:
     return db.query(models.Goal).filter(
         models.Goal.user_id == user_id
@@ -58,22 +218,30 @@ def get_user_goals(db: Session, user_id: UUID, skip: int = 0, limit: int = 100)
 
 # In smart-task-planner/app/crud.py
 
-def get_user_goals_summary(db: Session, user_id: UUID, skip: int = 0, limit: int = 100) -> List[dict]:
-    goals = db.query(
+def get_user_goals_summary(
+    db: Session, user_id: UUID, skip: int = 0, limit: int = 100, include_archived: bool = False
+) -> List[dict]:
+    goals = select(
         models.Goal.id,
         models.Goal.text,
         models.Goal.status,
         models.Goal.created_at,
         func.count(models.Task.id).label('task_count'),
-        func.sum(case((models.Task.status == 'completed', 1), else_=0)).label('completed_tasks')
-    ).outerjoin(models.Task).filter(
+        func.sum(case((models.Task.status == 'completed', 1), else_=0)).label('completed_tasks'),
+        literal(False).label('archived')
+    ).outerjoin(models.Task).where(
         models.Goal.user_id == user_id
     ).group_by(
         models.Goal.id,
         models.Goal.text,
         models.Goal.status,
         models.Goal.created_at
-    ).offset(skip).limit(limit).all()
+    )
+    if include_archived:
+        # The cold tier is only read when asked for; hot goals come first
+        goals = union_all(goals, archived_goals_summary_query(user_id)).subquery()
+        goals = select(goals).order_by(goals.c.archived, goals.c.created_at.desc())
+    goals = db.execute(goals.offset(skip).limit(limit)).all()
 
     return [
         {
@@ -82,7 +250,8 @@ def get_user_goals_summary(db: Session, user_id: UUID, skip: int = 0, limit: int
             "status": goal.status,
             "created_at": goal.created_at,
             "task_count": goal.task_count or 0,
-            "completed_tasks": goal.completed_tasks or 0
+            "completed_tasks": goal.completed_tasks or 0,
+            "archived": bool(goal.archived)
         }
         for goal in goals
     ]
@@ -95,20 +264,82 @@ def create_goal(db: Session, goal: schemas.GoalCreate, user_id: UUID) -> models.
     db.add(db_goal)
     db.commit()
     db.refresh(db_goal)
+    user_data_changed(user_id, [db_goal.id])
     return db_goal
 
-def update_goal(db: Session, goal_id: UUID, user_id: UUID, goal_update: schemas.GoalUpdate) -> Optional[models.Goal]:
-    db_goal = get_goal(db, goal_id, user_id)
-    if not db_goal:
-        return None
-
-    update_data = goal_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_goal, field, value)
+def create_goals_bulk(db: Session, goals: List[schemas.GoalCreate], user_id: UUID,
+                      batch_id: Optional[UUID] = None) -> List[UUID]:
+    """Insert several goals in a single transaction and return their ids in input order
+
+    With a ``batch_id`` the goals start with plan status "pending".
+    """
+    # Ids are assigned up front so nothing has to be reloaded after the commit
+    goal_ids = [uuid.uuid4() for _ in goals]
+    db.add_all([
+        models.Goal(
+            id=goal_id, text=goal.text, user_id=user_id,
+            batch_id=batch_id, plan_status=PENDING if batch_id is not None else None
+        )
+        for goal_id, goal in zip(goal_ids, goals)
+    ])
+    db.commit()
+    user_data_changed(user_id, goal_ids)
+    return goal_ids
+
+def set_plan_status(db: Session, goal_id: UUID, plan_status: str) -> None:
+    """Record plan generation progress of a goal (not a user edit: no version bump)"""
+    db.execute(
+        update(models.Goal)
+        .where(models.Goal.id == goal_id)
+        .values(plan_status=plan_status)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
 
+def get_batch_statuses(db: Session, batch_id: UUID, user_id: UUID) -> List[Any]:
+    """(id, plan_status) of the user's goals in a batch; an empty list for unknown batches"""
+    return db.query(models.Goal.id, models.Goal.plan_status).filter(
+        models.Goal.batch_id == batch_id,
+        models.Goal.user_id == user_id
+    ).order_by(models.Goal.created_at, models.Goal.id).all()
+
+def _versioned_update(db: Session, model, conditions: list, values: dict,
+                      expected_version: Optional[int], current_version_query):
+    """One UPDATE ... RETURNING that checks ownership and the expected version, and bumps the version
+
+    Only when no row matched is the current version read, to tell a
+    missing row (None) from a stale one (StaleVersionError).
+    """
+    if expected_version is not None:
+        conditions = conditions + [model.version == expected_version]
+    row = db.execute(
+        update(model)
+        .where(*conditions)
+        .values(**values, version=model.version + 1)
+        .returning(*model.__table__.columns)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        db.rollback()
+        current = current_version_query.scalar() if expected_version is not None else None
+        if current is not None:
+            raise StaleVersionError(current)
+        return None
     db.commit()
-    db.refresh(db_goal)
-    return db_goal
+    return row
+
+def update_goal(db: Session, goal_id: UUID, user_id: UUID, goal_update: schemas.GoalUpdate,
+                expected_version: Optional[int] = None) -> Optional[Any]:
+    row = _versioned_update(
+        db, models.Goal,
+        [models.Goal.id == goal_id, models.Goal.user_id == user_id],
+        goal_update.dict(exclude_unset=True),
+        expected_version,
+        db.query(models.Goal.version).filter(models.Goal.id == goal_id, models.Goal.user_id == user_id)
+    )
+    if row is not None:
+        user_data_changed(user_id, [goal_id])
+    return row
 
 def delete_goal(db: Session, goal_id: UUID, user_id: UUID) -> bool:
     db_goal = get_goal(db, goal_id, user_id)
@@ -117,6 +348,7 @@ def delete_goal(db: Session, goal_id: UUID, user_id: UUID) -> bool:
 
     db.delete(db_goal)
     db.commit()
+    user_data_changed(user_id, [goal_id])
     return True
 
 # Task CRUD operations
@@ -126,13 +358,49 @@ def get_task(db: Session, task_id: UUID, user_id: UUID) -> Optional[models.Task]
         models.Goal.user_id == user_id
     ).first()
 
+def get_task_owner_id(db: Session, task_id: UUID) -> Optional[UUID]:
+    return db.query(models.Goal.user_id).join(models.Task).filter(models.Task.id == task_id).scalar()
+
 def get_goal_tasks(db: Session, goal_id: UUID, user_id: UUID) -> List[models.Task]:
     return db.query(models.Task).join(models.Goal).filter(
         models.Task.goal_id == goal_id,
         models.Goal.user_id == user_id
     ).all()
 
-def create_task(db: Session, task: schemas.TaskCreate, goal_id: UUID) -> models.Task:
+def get_goal_graph(db: Session, goal_id: UUID) -> Tuple[List[Any], List[Any]]:
+    """Task rows and (task_id, depends_on_task_id) edge rows of a goal, two column-only queries"""
+    tasks = db.query(
+        models.Task.id,
+        models.Task.name,
+        models.Task.status,
+        models.Task.duration_days
+    ).filter(models.Task.goal_id == goal_id).order_by(models.Task.created_at, models.Task.id).all()
+    edges = db.query(
+        models.TaskDependency.task_id,
+        models.TaskDependency.depends_on_task_id
+    ).join(models.Task, models.Task.id == models.TaskDependency.task_id).filter(
+        models.Task.goal_id == goal_id
+    ).all()
+    return tasks, edges
+
+def get_edges_leaving_goal(db: Session, goal_id: UUID, user_id: UUID) -> List[Any]:
+    """The user's (task_id, depends_on_task_id) edges with at least one end outside the goal
+
+    A cycle through a goal's tasks can only leave the goal along these edges.
+    """
+    dependent = aliased(models.Task)
+    prerequisite = aliased(models.Task)
+    return db.query(
+        models.TaskDependency.task_id,
+        models.TaskDependency.depends_on_task_id
+    ).join(dependent, dependent.id == models.TaskDependency.task_id).join(
+        prerequisite, prerequisite.id == models.TaskDependency.depends_on_task_id
+    ).join(models.Goal, models.Goal.id == dependent.goal_id).filter(
+        models.Goal.user_id == user_id,
+        (dependent.goal_id != goal_id) | (prerequisite.goal_id != goal_id)
+    ).all()
+
+def create_task(db: Session, task: schemas.TaskCreate, goal_id: UUID, user_id: Optional[UUID] = None) -> models.Task:
     db_task = models.Task(
         name=task.name,
         description=task.description,
@@ -141,79 +409,102 @@ def create_task(db: Session, task: schemas.TaskCreate, goal_id: UUID) -> models.
     )
     db.add(db_task)
     db.commit()
+    user_data_changed(user_id or get_goal_owner_id(db, goal_id), [goal_id])
     db.refresh(db_task)
     return db_task
 
-def create_tasks_bulk(db: Session, tasks_data: List[dict], goal_id: UUID) -> List[models.Task]:
-    db_tasks = []
-    task_name_to_id = {}
+def create_tasks_bulk(db: Session, tasks_data: List[dict], goal_id: UUID, user_id: Optional[UUID] = None) -> List[UUID]:
+    """Insert a plan's tasks and dependency edges; returns the new task ids in plan order
+
+    Ids are assigned here, so tasks and edges each go in one executemany
+    INSERT without a flush or refresh per row.
+    """
+    task_ids = [uuid.uuid4() for _ in tasks_data]
+    task_name_to_id = {task_data["name"]: task_id for task_data, task_id in zip(tasks_data, task_ids)}
 
     # First pass: create all tasks
-    for task_data in tasks_data:
-        db_task = models.Task(
-            name=task_data["name"],
-            description=task_data.get("description"),
-            duration_days=task_data.get("duration_days", 1),
-            goal_id=goal_id
-        )
-        db.add(db_task)
-        db.flush()  # Flush to get the ID without committing
-        db_tasks.append(db_task)
-        task_name_to_id[task_data["name"]] = db_task.id
+    if tasks_data:
+        db.execute(insert(models.Task), [
+            {
+                "id": task_id,
+                "name": task_data["name"],
+                "description": task_data.get("description"),
+                "duration_days": task_data.get("duration_days", 1),
+                "goal_id": goal_id,
+            }
+            for task_data, task_id in zip(tasks_data, task_ids)
+        ])
 
     # Second pass: create dependencies
-    for i, task_data in enumerate(tasks_data):
-        if "depends_on" in task_data and task_data["depends_on"]:
-            for dep_name in task_data["depends_on"]:
-                if dep_name in task_name_to_id:
-                    dependency = models.TaskDependency(
-                        task_id=db_tasks[i].id,
-                        depends_on_task_id=task_name_to_id[dep_name]
-                    )
-                    db.add(dependency)
-
-    db.commit()
-
-    # Refresh all tasks to get updated relationships
-    for task in db_tasks:
-        db.refresh(task)
-
-    return db_tasks
-
-def update_task(db: Session, task_id: UUID, user_id: UUID, task_update: schemas.TaskUpdate) -> Optional[models.Task]:
-    db_task = get_task(db, task_id, user_id)
-    if not db_task:
-        return None
-
-    update_data = task_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_task, field, value)
+    task_name_to_index = {task_data["name"]: i for i, task_data in enumerate(tasks_data)}
+    edges = [
+        (task_name_to_index[dep_name], i)
+        for i, task_data in enumerate(tasks_data)
+        for dep_name in task_data.get("depends_on") or []
+        if dep_name in task_name_to_id
+    ]
+    try:
+        # Edges already implied by a longer chain (common in LLM plans) are not stored
+        edges = transitive_reduction(len(tasks_data), edges)
+    except ValueError:
+        pass  # cyclic plan: store the edges as given
+    if edges:
+        db.execute(insert(models.TaskDependency), [
+            {"id": uuid.uuid4(), "task_id": task_ids[i], "depends_on_task_id": task_ids[prerequisite]}
+            for prerequisite, i in edges
+        ])
 
     db.commit()
-    db.refresh(db_task)
-    return db_task
+    user_data_changed(user_id or get_goal_owner_id(db, goal_id), [goal_id])
+    return task_ids
+
+def update_task(db: Session, task_id: UUID, user_id: UUID, task_update: schemas.TaskUpdate,
+                expected_version: Optional[int] = None) -> Optional[Any]:
+    owned_goals = select(models.Goal.id).where(models.Goal.user_id == user_id)
+    row = _versioned_update(
+        db, models.Task,
+        [models.Task.id == task_id, models.Task.goal_id.in_(owned_goals)],
+        task_update.dict(exclude_unset=True),
+        expected_version,
+        db.query(models.Task.version).join(models.Goal).filter(
+            models.Task.id == task_id,
+            models.Goal.user_id == user_id
+        )
+    )
+    if row is not None:
+        user_data_changed(user_id, [row.goal_id])
+    return row
 
 def delete_task(db: Session, task_id: UUID, user_id: UUID) -> bool:
     db_task = get_task(db, task_id, user_id)
     if not db_task:
         return False
 
+    goal_id = db_task.goal_id
     db.delete(db_task)
     db.commit()
+    user_data_changed(user_id, [goal_id])
     return True
 
 # Task Dependency CRUD operations
-def create_task_dependency(db: Session, task_id: UUID, depends_on_task_id: UUID) -> models.TaskDependency:
+def _goals_of_tasks(db: Session, task_ids: Iterable[UUID]) -> List[UUID]:
+    """Goals whose cached views show any of these tasks' dependency edges"""
+    return list(db.execute(
+        select(models.Task.goal_id).where(models.Task.id.in_(set(task_ids))).distinct()
+    ).scalars())
+
+def create_task_dependency(db: Session, task_id: UUID, depends_on_task_id: UUID, user_id: Optional[UUID] = None) -> models.TaskDependency:
     dependency = models.TaskDependency(
         task_id=task_id,
         depends_on_task_id=depends_on_task_id
     )
     db.add(dependency)
     db.commit()
+    user_data_changed(user_id or get_task_owner_id(db, task_id), _goals_of_tasks(db, [task_id, depends_on_task_id]))
     db.refresh(dependency)
     return dependency
 
-def delete_task_dependency(db: Session, task_id: UUID, depends_on_task_id: UUID) -> bool:
+def delete_task_dependency(db: Session, task_id: UUID, depends_on_task_id: UUID, user_id: Optional[UUID] = None) -> bool:
     dependency = db.query(models.TaskDependency).filter(
         models.TaskDependency.task_id == task_id,
         models.TaskDependency.depends_on_task_id == depends_on_task_id
@@ -224,8 +515,28 @@ def delete_task_dependency(db: Session, task_id: UUID, depends_on_task_id: UUID)
 
     db.delete(dependency)
     db.commit()
+    user_data_changed(user_id or get_task_owner_id(db, task_id), _goals_of_tasks(db, [task_id, depends_on_task_id]))
     return True
 
+def apply_dependency_changes(
+    db: Session,
+    added: List[Tuple[UUID, UUID]],
+    removed: List[Tuple[UUID, UUID]],
+    user_id: Optional[UUID] = None
+) -> None:
+    """Insert and delete (task_id, depends_on_task_id) edges in one transaction"""
+    if removed:
+        db.execute(delete(models.TaskDependency).where(
+            tuple_(models.TaskDependency.task_id, models.TaskDependency.depends_on_task_id).in_(removed)
+        ))
+    if added:
+        db.execute(insert(models.TaskDependency), [
+            {"id": uuid.uuid4(), "task_id": task_id, "depends_on_task_id": depends_on_task_id}
+            for task_id, depends_on_task_id in added
+        ])
+    db.commit()
+    user_data_changed(user_id, _goals_of_tasks(db, [task_id for edge in added + removed for task_id in edge]))
+
 def check_circular_dependency(db: Session, task_id: UUID, depends_on_task_id: UUID) -> bool:
     """Check if adding a dependency would create a circular reference"""
     def has_path(start_id: UUID, target_id: UUID, visited: set) -> bool:
@@ -246,3 +557,85 @@ def check_circular_dependency(db: Session, task_id: UUID, depends_on_task_id: UU
         return False
 
     return has_path(depends_on_task_id, task_id, set())
+
+# Dashboard queries (set-based, one statement each)
+def _dashboard_task_query(db: Session, user_id: UUID):
+    return db.query(
+        models.Task.id,
+        models.Task.goal_id,
+        models.Goal.text.label("goal_text"),
+        models.Task.name,
+        models.Task.status,
+        models.Task.duration_days
+    ).join(models.Goal).filter(models.Goal.user_id == user_id)
+
+def get_goal_status_counts(db: Session, user_id: UUID) -> dict:
+    rows = db.query(models.Goal.status, func.count(models.Goal.id)).filter(
+        models.Goal.user_id == user_id
+    ).group_by(models.Goal.status).all()
+    return {status: count for status, count in rows}
+
+def get_task_status_counts(db: Session, user_id: UUID) -> dict:
+    rows = db.query(models.Task.status, func.count(models.Task.id)).join(models.Goal).filter(
+        models.Goal.user_id == user_id
+    ).group_by(models.Task.status).all()
+    return {status: count for status, count in rows}
+
+def get_in_progress_tasks(db: Session, user_id: UUID, limit: int = 20) -> List[dict]:
+    rows = _dashboard_task_query(db, user_id).filter(
+        models.Task.status == "in_progress"
+    ).order_by(models.Task.created_at).limit(limit).all()
+    return [row._asdict() for row in rows]
+
+def _unblocked():
+    """Correlated NOT EXISTS: no prerequisite of models.Task is still unfinished"""
+    prerequisite = aliased(models.Task)
+    blocked = select(models.TaskDependency.id).join(
+        prerequisite, prerequisite.id == models.TaskDependency.depends_on_task_id
+    ).where(
+        models.TaskDependency.task_id == models.Task.id,
+        prerequisite.status != "completed"
+    ).exists()
+    return ~blocked
+
+def get_next_actionable_tasks(db: Session, user_id: UUID, limit: int = 20) -> List[dict]:
+    """Pending tasks whose prerequisites are all completed"""
+    rows = _dashboard_task_query(db, user_id).filter(
+        models.Task.status == "pending",
+        _unblocked()
+    ).order_by(models.Task.created_at).limit(limit).all()
+    return [row._asdict() for row in rows]
+
+def get_timeline_inputs(db: Session, user_id: UUID) -> Tuple[List[Any], List[Any]]:
+    """Unfinished tasks of the user's active goals (oldest goal first) and the edges between them"""
+    tasks = _dashboard_task_query(db, user_id).filter(
+        models.Goal.status == "active",
+        models.Task.status != "completed"
+    ).order_by(models.Goal.created_at, models.Goal.id, models.Task.created_at, models.Task.id).all()
+    prerequisite = aliased(models.Task)
+    edges = db.query(
+        models.TaskDependency.task_id,
+        models.TaskDependency.depends_on_task_id
+    ).join(models.Task, models.Task.id == models.TaskDependency.task_id).join(
+        models.Goal, models.Goal.id == models.Task.goal_id
+    ).join(
+        prerequisite, prerequisite.id == models.TaskDependency.depends_on_task_id
+    ).filter(
+        models.Goal.user_id == user_id,
+        models.Task.status != "completed",
+        prerequisite.status != "completed"
+    ).all()
+    return tasks, edges
+
+READY_TASK_SORTS = {
+    "goal": (models.Goal.created_at, models.Goal.id, models.Task.created_at, models.Task.id),
+    "duration": (models.Task.duration_days, models.Task.created_at, models.Task.id),
+}
+
+def get_ready_tasks(db: Session, user_id: UUID, skip: int = 0, limit: int = 50, sort: str = "goal") -> List[dict]:
+    """Unfinished tasks across all of a user's goals whose prerequisites are all completed"""
+    rows = _dashboard_task_query(db, user_id).filter(
+        models.Task.status != "completed",
+        _unblocked()
+    ).order_by(*READY_TASK_SORTS[sort]).offset(skip).limit(limit).all()
+    return [row._asdict() for row in rows]
@@ -1,23 +1,110 @@
-from sqlalchemy import create_engine
+from typing import Optional
+from uuid import UUID
+
+from fastapi import Request
+from sqlalchemy import create_engine, Insert, Update, Delete
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from app.cache import user_cache
 from app.config import settings
+from app.shards import ShardRouter
+
+def _create_engine(url: str):
+    return create_engine(
+        url,
+        connect_args={"check_same_thread": False} if "sqlite" in url else {}
+    )
+
+# Create SQLAlchemy engines: the primary takes every write, the optional replica serves reads
+engine = _create_engine(settings.database_url)
+replica_engine = _create_engine(settings.database_replica_url) if settings.database_replica_url else None
+
+# Extra user shards; shard 0 is the primary above, which also holds the user directory
+shard_engines = [engine] + [
+    _create_engine(url.strip()) for url in settings.database_shard_urls.split(",") if url.strip()
+]
+shard_router = ShardRouter(shard_engines, cache_ttl=settings.shard_directory_ttl_seconds)
+
+# Read-your-writes: when each user last committed a write, kept in the cache backend so that
+# with CACHE_BACKEND=redis every worker sees it, not only the one that handled the write
+def mark_user_write(user_id: Optional[UUID]) -> None:
+    user_cache.mark_write(user_id, settings.replica_sticky_seconds)
+
+def has_recent_write(user_id: Optional[UUID]) -> bool:
+    return user_cache.has_recent_write(user_id, settings.replica_sticky_seconds)
+
+class RoutingSession(Session):
+    """Session that sends reads to a replica when it is marked read-only
+
+    Flushes and DML always go to the primary, as do reads for a user who
+    wrote within the last ``replica_sticky_seconds``. Set
+    ``session.info["user_id"]`` once the caller is known and
+    ``session.info["force_primary"]`` to opt out entirely.
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
-)
+    With several shards configured, statements go to the shard in
+    ``session.info["shard"]`` (or the one owning ``info["user_id"]``) and
+    ``user_directory`` always goes to shard 0. The replica belongs to shard 0.
+    """
+
+    def __init__(self, *args, primary=None, replica=None, shard_router=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.primary = primary
+        self.replica = replica
+        self.shard_router = shard_router
+
+    def current_shard(self) -> int:
+        shard = self.info.get("shard")
+        if shard is None and self.info.get("user_id") is not None:
+            shard = self.info["shard"] = self.shard_router.shard_of_user(self.info["user_id"])
+        return shard or 0
+
+    def uses_replica(self) -> bool:
+        return (
+            self.replica is not None
+            and self.info.get("read_only", False)
+            and not self.info.get("force_primary", False)
+            and not has_recent_write(self.info.get("user_id"))
+        )
+
+    def cache_max_age(self) -> Optional[float]:
+        """How long a view computed in this session may be cached (None: the cache's own TTL)
+
+        Once a statement was served by the replica, the view may lag the
+        primary; keep it no longer than the read-your-writes window.
+        """
+        return settings.replica_sticky_seconds if self.info.get("used_replica") else None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.shard_router is not None and self.shard_router.sharded:
+            if mapper is not None and mapper.persist_selectable.name == "user_directory":
+                return self.shard_router.directory_engine
+            shard = self.current_shard()
+            if shard:
+                return self.shard_router.engines[shard]
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)) or not self.uses_replica():
+            return self.primary
+        self.info["used_replica"] = True
+        return self.replica
+
+def make_session_factory(primary, replica=None, shard_router=None) -> sessionmaker:
+    return sessionmaker(
+        class_=RoutingSession, autocommit=False, autoflush=False,
+        bind=primary, primary=primary, replica=replica, shard_router=shard_router
+    )
 
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = make_session_factory(engine, replica_engine, shard_router)
 
 # Create Base class
 Base = declarative_base()
 
+READ_ONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
 # Dependency to get DB session
-def get_db():
+def get_db(request: Request):
     db = SessionLocal()
+    # Read-only requests may be served from the replica
+    db.info["read_only"] = request.method in READ_ONLY_METHODS
     try:
         yield db
     finally:
@@ -1,22 +1,36 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import Optional
+import re
+import secrets
+import uuid
 
+from app.config import settings
 from app.database import get_db
 from app.auth import get_current_user
+from app.request_context import bind_log_fields
 from app import models
 
-# Security scheme
-security = HTTPBearer()
+# Security scheme; a missing token is answered with 401 below (HTTPBearer's own error is a 403)
+security = HTTPBearer(auto_error=False)
 
 def get_current_active_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     db: Session = Depends(get_db)
 ) -> models.User:
     """Get the current authenticated user"""
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     token = credentials.credentials
     user = get_current_user(db, token)
+    # Lets the routing session apply read-your-writes stickiness for this user
+    db.info["user_id"] = user.id
+    bind_log_fields(user_id=str(user.id))
 
     if not user.is_active:
         raise HTTPException(
@@ -25,6 +39,33 @@ def get_current_active_user(
         )
     return user
 
+def parse_id(value: str, kind: str) -> uuid.UUID:
+    """Parse an id path parameter, answering 400 if it is not a UUID"""
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid {kind} ID format"
+        )
+
+def etag(version: int) -> str:
+    return f'"{version}"'
+
+_ETAG = re.compile(r'^(?:W/)?"?(\d+)"?$')
+
+def if_match_version(if_match: Optional[str] = Header(None)) -> Optional[int]:
+    """Version required by an If-Match header; None (no check) when absent or ``*``"""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    match = _ETAG.match(if_match.strip())
+    if not match:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="If-Match must be a version ETag such as \"3\""
+        )
+    return int(match.group(1))
+
 def verify_goal_access(
     goal_id: str,
     current_user: models.User = Depends(get_current_active_user),
@@ -32,17 +73,8 @@ def verify_goal_access(
 ) -> models.Goal:
     """Verify that the current user has access to the specified goal"""
     from app import crud
-    import uuid
 
-    try:
-        goal_uuid = uuid.UUID(goal_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid goal ID format"
-        )
-
-    goal = crud.get_goal(db, goal_uuid, current_user.id)
+    goal = crud.get_goal(db, parse_id(goal_id, "goal"), current_user.id)
     if not goal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -57,20 +89,22 @@ def verify_task_access(
 ) -> models.Task:
     """Verify that the current user has access to the specified task"""
     from app import crud
-    import uuid
-
-    try:
-        task_uuid = uuid.UUID(task_id)
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid task ID format"
-        )
 
-    task = crud.get_task(db, task_uuid, current_user.id)
+    task = crud.get_task(db, parse_id(task_id, "task"), current_user.id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
     return task
+
+def require_metrics_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)) -> None:
+    """Guard for operational endpoints: the configured metrics token, never a user's JWT"""
+    if not settings.metrics_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if credentials is None or not secrets.compare_digest(credentials.credentials, settings.metrics_token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
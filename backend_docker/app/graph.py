@@ -0,0 +1,77 @@
+from collections import deque
+from typing import List, Sequence, Tuple
+
+def topological_layers(n: int, edges: Sequence[Tuple[int, int]]) -> Tuple[List[int], List[int], bool]:
+    """Topological order and layer numbers for an indexed DAG
+
+    ``edges`` are ``(prerequisite, dependent)`` index pairs. A node's layer is
+    the length of the longest prerequisite chain leading to it, so every
+    layer only depends on earlier ones. Returns ``(order, layers, has_cycle)``;
+    nodes caught in a cycle are appended after the rest, one layer further.
+    """
+    successors: List[List[int]] = [[] for _ in range(n)]
+    indegree = [0] * n
+    for source, target in edges:
+        successors[source].append(target)
+        indegree[target] += 1
+
+    layers = [0] * n
+    # Kahn's algorithm; a FIFO queue keeps the original order among independent nodes
+    queue = deque(i for i in range(n) if indegree[i] == 0)
+    order: List[int] = []
+    while queue:
+        node = queue.popleft()
+        order.append(node)
+        for target in successors[node]:
+            layers[target] = max(layers[target], layers[node] + 1)
+            indegree[target] -= 1
+            if indegree[target] == 0:
+                queue.append(target)
+
+    has_cycle = len(order) < n
+    if has_cycle:
+        last_layer = max((layers[i] for i in order), default=-1) + 1
+        for i in range(n):
+            if indegree[i] > 0:
+                order.append(i)
+                layers[i] = last_layer
+    return order, layers, has_cycle
+
+def transitive_reduction(n: int, edges: Sequence[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Drop edges implied by longer paths (a->c when a->b->c exists) from a DAG
+
+    Reachability is kept as one integer bitset per node and filled in
+    reverse topological order, so the cost is O(V * E / wordsize).
+    Duplicate edges collapse; the input order of the kept edges is preserved.
+    """
+    order, _, has_cycle = topological_layers(n, edges)
+    if has_cycle:
+        raise ValueError("transitive reduction needs an acyclic graph")
+
+    successors: List[set] = [set() for _ in range(n)]
+    for source, target in edges:
+        successors[source].add(target)
+
+    reach = [0] * n  # bit j set: j is reachable from i by a path of length >= 1
+    for node in reversed(order):
+        bits = 0
+        for target in successors[node]:
+            bits |= (1 << target) | reach[target]
+        reach[node] = bits
+
+    # Nodes reachable from a node through one of its successors; in a DAG a
+    # successor never reaches itself, so a target found here has a longer path
+    indirect = [0] * n
+    for node in range(n):
+        for target in successors[node]:
+            indirect[node] |= reach[target]
+
+    kept: List[Tuple[int, int]] = []
+    seen = set()
+    for source, target in edges:
+        if (source, target) in seen:
+            continue
+        seen.add((source, target))
+        if not indirect[source] >> target & 1:
+            kept.append((source, target))
+    return kept
@@ -0,0 +1,78 @@
+from typing import Any, Dict
+import importlib.util
+import logging
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+class PoolStats:
+    """Counts requests against new connections, so reuse of the keep-alive pool is visible
+
+    Fed by httpcore trace events: a request that did not trigger a TCP
+    connect (and TLS handshake) went out on a pooled connection.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+        self.http2_requests = 0
+
+    async def trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+        elif event_name == "connection.start_tls.complete":
+            self.tls_handshakes += 1
+        elif event_name == "http2.send_request_headers.started":
+            self.http2_requests += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        reused = max(self.requests - self.connections_opened, 0)
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "tls_handshakes": self.tls_handshakes,
+            "reused_connections": reused,
+            "reuse_rate": round(reused / self.requests, 4) if self.requests else None,
+            "http2_requests": self.http2_requests,
+        }
+
+class InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """Connection-pooling transport that reports connection events to PoolStats"""
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.requests += 1
+        request.extensions["trace"] = self.stats.trace
+        return await super().handle_async_request(request)
+
+def http2_available() -> bool:
+    return settings.llm_http2 and importlib.util.find_spec("h2") is not None
+
+def llm_timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        settings.llm_read_timeout,
+        connect=settings.llm_connect_timeout,
+        pool=settings.llm_connect_timeout,
+    )
+
+def create_llm_http_client(stats: PoolStats) -> httpx.AsyncClient:
+    """Shared client for all LLM calls: bounded keep-alive pool, explicit timeouts, HTTP/2 if h2 is installed"""
+    limits = httpx.Limits(
+        max_connections=settings.llm_pool_max_connections,
+        max_keepalive_connections=settings.llm_pool_max_keepalive,
+        keepalive_expiry=settings.llm_keepalive_expiry,
+    )
+    http2 = http2_available()
+    if settings.llm_http2 and not http2:
+        logger.info("HTTP/2 requested for the LLM client but h2 is not installed; using HTTP/1.1")
+    return httpx.AsyncClient(
+        transport=InstrumentedTransport(stats, limits=limits, http2=http2),
+        timeout=llm_timeout(),
+    )
@@ -0,0 +1,139 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Optional
+from uuid import UUID
+import asyncio
+import hashlib
+import json
+import time
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app import models
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+_POLL_SECONDS = 0.05
+
+def request_fingerprint(method: str, path: str, body: Any = None) -> str:
+    """Hash of what a request asks for, so a reused key with a different payload is caught"""
+    payload = json.dumps(jsonable_encoder(body), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{method} {path}\n{payload}".encode()).hexdigest()
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+def _row(user_id: UUID, key: str):
+    return (models.IdempotencyKey.user_id == user_id) & (models.IdempotencyKey.key == key)
+
+class IdempotentAttempt:
+    """A claimed Idempotency-Key: either a stored response to replay, or the right to run the handler"""
+
+    def __init__(self, db: Session, user_id: UUID, key: Optional[str]):
+        self.db = db
+        self.user_id = user_id
+        self.key = key
+        self.replay: Optional[JSONResponse] = None
+        self.stored = False
+
+    def store(self, response: Any, status_code: int = status.HTTP_200_OK) -> Any:
+        """Save the response for replays of this key and return it unchanged"""
+        if self.key is not None:
+            self.db.execute(update(models.IdempotencyKey).where(_row(self.user_id, self.key)).values(
+                status_code=status_code,
+                response_body=json.dumps(jsonable_encoder(response)),
+                expires_at=_now() + timedelta(seconds=settings.idempotency_ttl_seconds)
+            ))
+            self.db.commit()
+            self.stored = True
+        return response
+
+def _try_claim(db: Session, user_id: UUID, key: str, request_hash: str) -> bool:
+    """Insert an in-progress row for the key; False if one exists already
+
+    Expired rows of the user are dropped first. A claim expires after
+    ``idempotency_wait_seconds``, so one left by a crashed worker does not
+    block retries for the whole TTL.
+    """
+    now = _now()
+    db.execute(delete(models.IdempotencyKey).where(
+        models.IdempotencyKey.user_id == user_id,
+        models.IdempotencyKey.expires_at < now
+    ))
+    try:
+        db.execute(insert(models.IdempotencyKey).values(
+            user_id=user_id,
+            key=key,
+            request_hash=request_hash,
+            expires_at=now + timedelta(seconds=settings.idempotency_wait_seconds)
+        ))
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+        return False
+
+async def _acquire(db: Session, user_id: UUID, key: str, request_hash: str) -> Optional[JSONResponse]:
+    """Claim the key, or wait for the request holding it and return its stored response"""
+    deadline = time.monotonic() + settings.idempotency_wait_seconds
+    while not _try_claim(db, user_id, key, request_hash):
+        existing = db.execute(
+            select(
+                models.IdempotencyKey.request_hash,
+                models.IdempotencyKey.status_code,
+                models.IdempotencyKey.response_body
+            ).where(_row(user_id, key))
+        ).first()
+        db.commit()
+        if existing is None:
+            continue  # released or expired in between; claim again
+        if existing.request_hash != request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used for a different request"
+            )
+        if existing.status_code is not None:
+            return JSONResponse(
+                content=json.loads(existing.response_body),
+                status_code=existing.status_code,
+                headers={REPLAYED_HEADER: "true"}
+            )
+        if time.monotonic() > deadline:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress"
+            )
+        # Duplicates are serialized behind the first request
+        await asyncio.sleep(_POLL_SECONDS)
+    return None
+
+@asynccontextmanager
+async def idempotent(db: Session, user_id: UUID, key: Optional[str],
+                     request_hash: str) -> AsyncIterator[IdempotentAttempt]:
+    """Run a handler at most once per Idempotency-Key
+
+    Usage:
+        async with idempotent(db, user.id, key, fingerprint) as attempt:
+            if attempt.replay is not None:
+                return attempt.replay
+            ...
+            return attempt.store(response)
+
+    Without a key the block always runs. If it raises (or returns without
+    storing) the claim is released so a retry runs the request again.
+    """
+    attempt = IdempotentAttempt(db, user_id, key)
+    if key is not None:
+        attempt.replay = await _acquire(db, user_id, key, request_hash)
+    try:
+        yield attempt
+    finally:
+        if key is not None and attempt.replay is None and not attempt.stored:
+            db.rollback()
+            db.execute(delete(models.IdempotencyKey).where(_row(user_id, key)))
+            db.commit()
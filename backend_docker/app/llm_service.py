@@ -1,114 +1,364 @@
 import json
+import time
 import asyncio
-from typing import List, Dict, Any, Optional
-from groq import AsyncGroq
+import hashlib
+from typing import List, Dict, Any, Optional, Tuple
 from fastapi import HTTPException
+from pydantic import ValidationError
 import logging
 
 from app.config import settings
+from app.circuit_breaker import CircuitBreaker
 from app.schemas import LLMPlanResponse, LLMTaskResponse
+from app.prompts import get_prompt_template, format_examples
+from app.token_budget import TokenUsageTracker, MaxTokensBudget
+from app.plan_index import PlanIndex
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+def _strip_trailing_commas(text: str) -> str:
+    """Drop commas right before a closing bracket, leaving string literals untouched"""
+    out: List[str] = []
+    in_string = False
+    escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "}]":
+            end = len(out)
+            while end and out[end - 1].isspace():
+                end -= 1
+            if end and out[end - 1] == ",":
+                del out[end - 1]
+        out.append(char)
+    return "".join(out)
+
+class PlanParseError(ValueError):
+    """Raised when an LLM response cannot be turned into a valid plan"""
+
 class LLMService:
     def __init__(self):
         self.max_retries = 3
         self.retry_delay = 1.0
-        self.timeout = 30.0
-        # Initialize Groq client
-        self.client = AsyncGroq(api_key=settings.groq_api_key)
+        self._client = None  # created on first use; importing groq is slow
+        self._http_client = None
+        self.pool_stats = None
         # Best Groq models for task planning
         self.model = "llama-3.3-70b-versatile"  # Fast and intelligent model
         # Alternative models: "mixtral-8x7b-32768", "llama3-8b-8192"
+        self.json_mode = settings.llm_json_mode
+        self.prompt_version = settings.llm_prompt_version
+        self.prompt_template = get_prompt_template(self.prompt_version)
+        self.usage = TokenUsageTracker()
+        self.max_tokens_budget = MaxTokensBudget(
+            ceiling=settings.llm_max_tokens,
+            floor=settings.llm_min_max_tokens
+        )
+        self.plan_index = PlanIndex(settings.plan_index_path)
+        self.reuse_stats = {
+            "lookups": 0,
+            "reused": 0,
+            "few_shot": 0,
+            "misses": 0,
+        }
+        self._avg_call_seconds: Optional[float] = None  # moving average of Groq latency
+        self.stats = {
+            "provider_calls": 0,
+            "parsed_clean": 0,
+            "parsed_after_repair": 0,  # each one is a provider round trip we did not repeat
+            "dependencies_repaired": 0,
+            "parse_failures": 0,
+            "fallback_plans": 0,
+            "coalesced": 0,  # callers that shared another caller's in-flight generation
+            "short_circuited": 0,  # generations answered without calling Groq while the circuit was open
+            "deadline_exceeded": 0,
+            "truncated_retries": 0,  # adaptive max_tokens cut the plan off; retried at the ceiling
+        }
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.llm_breaker_failure_threshold,
+            reset_seconds=settings.llm_breaker_reset_seconds,
+            slow_call_seconds=settings.llm_slo_seconds,
+        )
+        # Single flight: one generation per normalized goal text at a time
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+
+    @property
+    def client(self):
+        if self._client is None:
+            from groq import AsyncGroq
+            from app.http_pool import PoolStats, create_llm_http_client, llm_timeout
+
+            # One pooled HTTP client for every call keeps connections (and TLS sessions) warm
+            self.pool_stats = PoolStats()
+            self._http_client = create_llm_http_client(self.pool_stats)
+            self._client = AsyncGroq(
+                api_key=settings.groq_api_key,
+                http_client=self._http_client,
+                timeout=llm_timeout(),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client (on shutdown)"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        self._client = self._http_client = None
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Connection reuse of the LLM HTTP pool (empty until the first call)"""
+        return self.pool_stats.snapshot() if self.pool_stats is not None else {}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Parsing / repair counters for the metrics endpoint"""
+        stats = dict(self.stats)
+        stats["round_trips_saved"] = stats["parsed_after_repair"]
+        stats["prompt_version"] = self.prompt_version
+        stats["max_tokens"] = self.max_tokens_budget.snapshot()
+        stats["in_flight"] = len(self._in_flight)
+        stats["circuit"] = self.breaker.snapshot()
+        return stats
+
+    def get_reuse_stats(self) -> Dict[str, Any]:
+        """Similarity-index hit rates and the Groq time they saved"""
+        stats = dict(self.reuse_stats)
+        lookups = stats["lookups"] or 1
+        stats["reuse_rate"] = round(stats["reused"] / lookups, 4)
+        stats["few_shot_rate"] = round(stats["few_shot"] / lookups, 4)
+        stats["indexed_plans"] = len(self.plan_index)
+        stats["avg_groq_latency_seconds"] = self._avg_call_seconds
+        stats["groq_seconds_saved"] = round(stats["reused"] * (self._avg_call_seconds or 0.0), 3)
+        return stats
+
+    def _find_similar_plans(self, goal_text: str, user_id: Optional[Any], reuse: bool = True):
+        """Return (plan to reuse, few-shot examples) from the user's own indexed plans
+
+        With ``reuse=False`` (regeneration) near-identical plans, usually the
+        goal's own previous one, are neither reused nor shown as examples.
+        """
+        if user_id is None:
+            return None, []
+        self.reuse_stats["lookups"] += 1
+        matches = self.plan_index.search(goal_text, user_id, k=max(1, settings.plan_fewshot_examples))
+        if reuse and matches and matches[0].similarity >= settings.plan_reuse_threshold:
+            self.reuse_stats["reused"] += 1
+            return LLMPlanResponse.model_validate(matches[0].plan), []
+
+        examples = [
+            (m.goal_text, m.plan) for m in matches
+            if m.similarity >= settings.plan_fewshot_threshold
+            and (reuse or m.similarity < settings.plan_reuse_threshold)
+        ]
+        self.reuse_stats["few_shot" if examples else "misses"] += 1
+        return None, examples
+
+    def _coalesce_key(self, goal_text: str, examples: List) -> str:
+        # Everything the prompt is built from: callers whose prompts would match share one call
+        digest = hashlib.sha1(
+            json.dumps(examples, sort_keys=True, default=str).encode()
+        ).hexdigest()[:16] if examples else ""
+        return f"{self.prompt_version}:{digest}:{' '.join(goal_text.lower().split())}"
 
-    async def generate_task_plan(self, goal_text: str) -> LLMPlanResponse:
-        """Generate a task plan from a goal using Groq's LLM models"""
-        prompt = self._create_planning_prompt(goal_text)
+    async def generate_task_plan(self, goal_text: str, user_id: Optional[Any] = None,
+                                 reuse: bool = True) -> LLMPlanResponse:
+        """Generate a task plan from a goal, sharing one generation among concurrent identical goals
+
+        The user's own index is consulted first. Callers left with the same
+        prompt (normalized goal text and few-shot examples), whichever user
+        they are, await a single task and each get their own copy of the
+        plan, which is then indexed under each caller. A cancelled caller
+        only stops waiting; the generation is cancelled once nobody waits
+        for it. ``reuse=False`` asks for a fresh plan (regeneration).
+        """
+        reused_plan, examples = self._find_similar_plans(goal_text, user_id, reuse)
+        if reused_plan is not None:
+            logger.info("Reusing indexed plan for a near-identical goal")
+            return reused_plan
+
+        key = self._coalesce_key(goal_text, examples)
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._generate_task_plan(goal_text, examples, user_id))
+            self._in_flight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda done: self._forget_in_flight(key, done))
+        else:
+            self.stats["coalesced"] += 1
+
+        self._waiters[key] += 1
+        try:
+            plan, generated = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task is self._in_flight.get(key):
+                self._waiters[key] -= 1
+                if self._waiters[key] == 0:
+                    task.cancel()
+            raise
+        if task is self._in_flight.get(key):
+            self._waiters[key] -= 1
+        if generated and user_id is not None:
+            self.plan_index.add(goal_text, plan.model_dump(), user_id)
+        return plan.model_copy(deep=True)
+
+    def _forget_in_flight(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+            del self._waiters[key]
+
+    async def _generate_task_plan(self, goal_text: str, examples: List,
+                                  user_id: Optional[Any] = None) -> Tuple[LLMPlanResponse, bool]:
+        """Generate a task plan from a goal using Groq's LLM models
+
+        Returns the plan and whether Groq produced it (as opposed to the
+        degraded or template fallback); only generated plans are indexed.
+        """
+        prompt = self._create_planning_prompt(goal_text, examples)
+        # One budget for every attempt, timeout and backoff of this generation
+        deadline = time.monotonic() + settings.llm_generation_deadline_seconds
 
         for attempt in range(self.max_retries):
+            if deadline - time.monotonic() <= 0:
+                # Spent on earlier attempts: don't call Groq, and don't count it against the breaker
+                self.stats["deadline_exceeded"] += 1
+                logger.warning("Generation deadline spent before attempt %d", attempt + 1)
+                break
+            if not self.breaker.allow():
+                # Groq is failing: answer now instead of queueing behind timeouts
+                self.stats["short_circuited"] += 1
+                return self._degraded_plan(goal_text, examples), False
+
+            # A retry after unusable output gets the full budget in case it was cut off
+            max_tokens = self.max_tokens_budget.next_max_tokens() if attempt == 0 else self.max_tokens_budget.ceiling
+            started = time.monotonic()
             try:
-                response = await self._call_groq_api(prompt)
-                return self._parse_llm_response(response)
+                response, finish_reason = await asyncio.wait_for(
+                    self._call_groq_api(prompt, max_tokens, user_id),
+                    timeout=deadline - started
+                )
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
             except Exception as e:
-                logger.warning(f"Groq API call attempt {attempt + 1} failed: {str(e)}")
-                if attempt == self.max_retries - 1:
-                    # Last attempt failed, raise exception
+                self.breaker.record_failure()
+                if isinstance(e, asyncio.TimeoutError):
+                    self.stats["deadline_exceeded"] += 1
+                    logger.warning("Groq call attempt %d hit the generation deadline", attempt + 1)
+                else:
+                    logger.warning("Groq API call attempt %d failed: %s", attempt + 1, e)
+                backoff = self.retry_delay * (2 ** attempt)
+                if attempt == self.max_retries - 1 or time.monotonic() + backoff >= deadline:
+                    # Out of attempts or out of time, raise exception
                     raise HTTPException(
                         status_code=503,
                         detail="AI service temporarily unavailable. Please try again later."
                     )
                 # Wait before retrying
-                await asyncio.sleep(self.retry_delay * (2 ** attempt))
+                await asyncio.sleep(backoff)
+                continue
+            self.breaker.record_success(time.monotonic() - started)
 
-        # This should never be reached, but just in case
-        raise HTTPException(
-            status_code=503,
-            detail="AI service temporarily unavailable"
-        )
+            if finish_reason == "length" and max_tokens < self.max_tokens_budget.ceiling:
+                # Cut off by the adaptive budget: truncation repair would drop the trailing tasks
+                self.stats["truncated_retries"] += 1
+                logger.warning("Groq response hit max_tokens=%s on attempt %s; retrying at the ceiling",
+                               max_tokens, attempt + 1)
+                continue
+
+            try:
+                plan = self._parse_llm_response(response)
+            except PlanParseError as e:
+                # Local repair already failed; only now is another round trip worth it
+                self.stats["parse_failures"] += 1
+                logger.warning("Unusable Groq response on attempt %d: %s", attempt + 1, e)
+                continue
+
+            return plan, True
+
+        return self._create_fallback_plan(goal_text), False
+
+    def _degraded_plan(self, goal_text: str, examples: List) -> LLMPlanResponse:
+        """Plan used while the circuit is open: the caller's closest indexed plan, else the template
 
-    def _create_planning_prompt(self, goal_text: str) -> str:
-        """Create a structured prompt for task planning optimized for Groq models"""
-        return f"""You are an expert project manager and task planning assistant. Your job is to break down user goals into actionable tasks with clear dependencies and realistic time estimates.
-
-INSTRUCTIONS:
-1. Analyze the following goal and break it down into 3-8 concrete, actionable tasks
-2. Each task should be specific, measurable, and achievable
-3. Estimate realistic duration in days for each task (minimum 1 day)
-4. Identify dependencies between tasks (which tasks must be completed before others can start)
-5. Tasks should follow a logical sequence that leads to goal completion
-6. Return your response in valid JSON format ONLY - no additional text
-
-GOAL: {goal_text}
-
-Return a JSON response with this exact structure:
-{{
-  "tasks": [
-    {{
-      "name": "Task name (be specific and actionable)",
-      "description": "Detailed description of what needs to be done",
-      "duration_days": 3,
-      "depends_on": ["Name of prerequisite task 1", "Name of prerequisite task 2"]
-    }}
-  ]
-}}
-
-CRITICAL REQUIREMENTS:
-- Task names in "depends_on" must exactly match the "name" field of other tasks
-- Use empty array [] for tasks with no dependencies
-- Only include tasks that are necessary to achieve the goal
-- Be realistic with time estimates (minimum 1 day per task)
-- Focus on the most critical path to success
-- Response must be valid JSON only
-
-JSON Response:"""
-
-    async def _call_groq_api(self, prompt: str) -> str:
-        """Make an API call to Groq with error handling"""
+        ``examples`` come from the user's own index entries only, so a
+        degraded answer never hands one user another user's plan.
+        """
+        if examples:
+            logger.warning("Groq circuit open; reusing the user's closest indexed plan")
+            return LLMPlanResponse.model_validate(examples[0][1])
+        logger.warning("Groq circuit open; using the template plan")
+        return self._create_fallback_plan(goal_text)
+
+    def _create_planning_prompt(self, goal_text: str, examples: Optional[List] = None) -> str:
+        """Create the user prompt for task planning from the configured template version"""
+        prompt = self.prompt_template.user.format(goal_text=goal_text)
+        if examples:
+            prompt = format_examples(examples) + prompt
+        return prompt
+
+    async def _call_groq_api(self, prompt: str, max_tokens: int,
+                             user_id: Optional[Any] = None) -> Tuple[str, Optional[str]]:
+        """Make an API call to Groq with error handling; returns the text and the finish reason"""
         try:
             # Make the API call to Groq
+            self.stats["provider_calls"] += 1
+            extra_params = {}
+            if self.json_mode:
+                # Structured output: the provider guarantees a syntactically valid JSON object
+                extra_params["response_format"] = {"type": "json_object"}
+
+            started = time.perf_counter()
             response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {
                         "role": "system",
-                        "content": "You are a professional project manager. Always respond with valid JSON only. Do not include any explanatory text before or after the JSON."
+                        "content": self.prompt_template.system
                     },
                     {
                         "role": "user",
                         "content": prompt
                     }
                 ],
-                max_tokens=2000,
+                max_tokens=max_tokens,
                 temperature=0.7,
                 top_p=0.9,
-                stream=False
+                stream=False,
+                **extra_params
+            )
+
+            elapsed = time.perf_counter() - started
+            self._avg_call_seconds = elapsed if self._avg_call_seconds is None else (
+                0.8 * self._avg_call_seconds + 0.2 * elapsed
             )
+            logger.info("Groq call finished", extra={
+                "model": self.model,
+                "duration_ms": round(elapsed * 1000, 1),
+                "completion_tokens": response.usage.completion_tokens if response.usage else None,
+            })
+
+            choice = response.choices[0]
+            if response.usage is not None:
+                self.usage.record(
+                    self.model, user_id,
+                    response.usage.prompt_tokens, response.usage.completion_tokens
+                )
+                self.max_tokens_budget.observe(
+                    response.usage.completion_tokens,
+                    truncated=choice.finish_reason == "length"
+                )
 
-            return response.choices[0].message.content.strip()
+            return choice.message.content.strip(), choice.finish_reason
 
         except Exception as e:
-            logger.error(f"Groq API error: {str(e)}")
+            logger.error("Groq API error: %s", e)
             # Check for specific error types
             if "rate_limit" in str(e).lower():
                 raise HTTPException(
@@ -127,62 +377,147 @@ JSON Response:"""
                 )
 
     def _parse_llm_response(self, response_text: str) -> LLMPlanResponse:
-        """Parse the LLM response into structured data"""
+        """Parse the LLM response into a validated plan, repairing it locally if needed"""
+        cleaned_response = self._extract_json(response_text)
+
+        repaired = False
         try:
-            # Clean the response - remove any markdown formatting or extra text
-            cleaned_response = response_text.strip()
+            response_data = json.loads(cleaned_response)
+        except json.JSONDecodeError:
+            try:
+                response_data = json.loads(self._repair_json(cleaned_response))
+            except json.JSONDecodeError as e:
+                logger.debug("Unrepairable Groq response: %.500s", response_text)
+                raise PlanParseError(f"Invalid JSON: {e}")
+            repaired = True
 
-            # Remove markdown code blocks if present
-            if cleaned_response.startswith("```json"):
-                cleaned_response = cleaned_response[7:]
-            elif cleaned_response.startswith("```"):
-                cleaned_response = cleaned_response[3:]
+        if isinstance(response_data, list):
+            # Bare array of tasks instead of {"tasks": [...]}
+            response_data = {"tasks": response_data}
+            repaired = True
+        if not isinstance(response_data, dict) or not isinstance(response_data.get("tasks"), list):
+            raise PlanParseError("Response missing 'tasks' field")
 
-            if cleaned_response.endswith("```"):
-                cleaned_response = cleaned_response[:-3]
+        raw_tasks = response_data["tasks"]
+        usable_tasks = [t for t in raw_tasks if isinstance(t, dict) and t.get("name")]
+        if len(usable_tasks) != len(raw_tasks):
+            repaired = True
+        if not usable_tasks:
+            raise PlanParseError("Response contains no usable tasks")
 
-            cleaned_response = cleaned_response.strip()
+        for task_data in usable_tasks:
+            if task_data.get("description") is None:
+                task_data["description"] = ""
+            if not isinstance(task_data.get("depends_on"), list):
+                task_data["depends_on"] = []
 
-            # Sometimes Groq models add explanatory text, try to extract JSON
-            if not cleaned_response.startswith('{'):
-                # Look for JSON object in the response
-                start_idx = cleaned_response.find('{')
-                end_idx = cleaned_response.rfind('}') + 1
-                if start_idx != -1 and end_idx != 0:
-                    cleaned_response = cleaned_response[start_idx:end_idx]
+        try:
+            plan = LLMPlanResponse.model_validate({"tasks": usable_tasks})
+        except ValidationError as e:
+            raise PlanParseError(f"Response does not match plan schema: {e.error_count()} errors")
 
-            # Parse JSON
-            response_data = json.loads(cleaned_response)
+        for task in plan.tasks:
+            task.duration_days = max(1, task.duration_days)
+        self._repair_dependencies(plan)
 
-            # Validate structure
-            if "tasks" not in response_data:
-                raise ValueError("Response missing 'tasks' field")
-
-            tasks = []
-            for task_data in response_data["tasks"]:
-                # Validate required fields
-                if "name" not in task_data:
-                    raise ValueError("Task missing 'name' field")
-
-                task = LLMTaskResponse(
-                    name=task_data["name"],
-                    description=task_data.get("description", ""),
-                    duration_days=max(1, task_data.get("duration_days", 1)),
-                    depends_on=task_data.get("depends_on", [])
-                )
-                tasks.append(task)
+        if repaired:
+            self.stats["parsed_after_repair"] += 1
+        else:
+            self.stats["parsed_clean"] += 1
+        logger.info("Successfully parsed %d tasks from Groq response", len(plan.tasks))
+        return plan
 
-            logger.info(f"Successfully parsed {len(tasks)} tasks from Groq response")
-            return LLMPlanResponse(tasks=tasks)
+    @staticmethod
+    def _extract_json(response_text: str) -> str:
+        """Strip markdown fences and explanatory text around the JSON payload"""
+        cleaned_response = response_text.strip()
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse Groq JSON response: {e}")
-            logger.error(f"Response text: {response_text}")
-            # Fallback: create a simple single task
-            return self._create_fallback_plan(goal_text)
-        except Exception as e:
-            logger.error(f"Error parsing Groq response: {e}")
-            return self._create_fallback_plan(goal_text)
+        # Remove markdown code blocks if present
+        if cleaned_response.startswith("```json"):
+            cleaned_response = cleaned_response[7:]
+        elif cleaned_response.startswith("```"):
+            cleaned_response = cleaned_response[3:]
+
+        if cleaned_response.endswith("```"):
+            cleaned_response = cleaned_response[:-3]
+
+        cleaned_response = cleaned_response.strip()
+
+        # Sometimes Groq models add explanatory text, start at the first JSON value
+        if not cleaned_response.startswith(('{', '[')):
+            start_idx = min(
+                (idx for idx in (cleaned_response.find('{'), cleaned_response.find('[')) if idx != -1),
+                default=-1
+            )
+            if start_idx != -1:
+                cleaned_response = cleaned_response[start_idx:]
+
+        return cleaned_response
+
+    @staticmethod
+    def _repair_json(text: str) -> str:
+        """Cheap fixes for the usual LLM JSON defects: trailing commas, trailing prose and truncation
+
+        A response cut off by max_tokens is trimmed back to the last complete
+        object or array and the still-open brackets are closed.
+        """
+        text = _strip_trailing_commas(text)
+
+        stack: List[str] = []
+        in_string = False
+        escaped = False
+        last_safe_end = 0
+        last_safe_stack: List[str] = []
+
+        for idx, char in enumerate(text):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+                continue
+
+            if char == '"':
+                in_string = True
+            elif char in "{[":
+                stack.append("}" if char == "{" else "]")
+            elif char in "}]":
+                if not stack:
+                    return text[:idx]
+                stack.pop()
+                if not stack:
+                    # Complete document; anything after it is commentary
+                    return text[:idx + 1]
+                last_safe_end = idx + 1
+                last_safe_stack = list(stack)
+
+        if not stack and not in_string:
+            return text
+
+        # Truncated: keep everything up to the last closed value, then close what is open
+        repaired = text[:last_safe_end].rstrip().rstrip(",")
+        return repaired + "".join(reversed(last_safe_stack))
+
+    def _repair_dependencies(self, plan: LLMPlanResponse) -> None:
+        """Point dangling depends_on names at the task they clearly mean, or drop them"""
+        def normalize(name: str) -> str:
+            return " ".join(name.lower().split()).strip(" .")
+
+        names = {task.name for task in plan.tasks}
+        by_normalized = {normalize(task.name): task.name for task in plan.tasks}
+
+        for task in plan.tasks:
+            resolved = []
+            for dep_name in task.depends_on:
+                if dep_name not in names:
+                    dep_name = by_normalized.get(normalize(dep_name))
+                if dep_name and dep_name != task.name and dep_name not in resolved:
+                    resolved.append(dep_name)
+            if resolved != task.depends_on:
+                self.stats["dependencies_repaired"] += 1
+                task.depends_on = resolved
 
     def _create_fallback_plan(self, goal_text: str) -> LLMPlanResponse:
         """Create a simple fallback plan when LLM parsing fails"""
@@ -196,7 +531,9 @@ JSON Response:"""
             depends_on=[]
         )
 
-        logger.warning(f"Using fallback plan for goal: {goal_text}")
+        self.stats["fallback_plans"] += 1
+        # The goal id is on the record already; keep user text out of the logs
+        logger.warning("Using fallback plan")
         return LLMPlanResponse(tasks=[fallback_task])
 
 # Global instance
@@ -0,0 +1,160 @@
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, Tuple
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+
+from app.config import settings
+from app.request_context import get_log_fields
+
+# Attributes every LogRecord has; anything else arrived through extra= or the context filter
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+def truncate(text: str, limit: int) -> str:
+    if limit <= 0 or len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [{len(text) - limit} chars truncated]"
+
+class ContextFilter(logging.Filter):
+    """Copy the request's log fields (request_id, user_id, goal_id) onto each record
+
+    Runs in the thread that logged, before the record crosses the queue
+    and loses its context.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in get_log_fields().items():
+            if value is not None and not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+class SamplingFilter(logging.Filter):
+    """Let at most ``burst`` records below ERROR through per call site and window
+
+    The number dropped in a window is reported as ``suppressed`` on the
+    first record the call site emits in the next one.
+    """
+
+    def __init__(self, burst: int, window_seconds: float):
+        super().__init__()
+        self.burst = burst
+        self.window_seconds = window_seconds
+        self.suppressed_total = 0
+        self._sites: Dict[Tuple[str, int], list] = {}  # call site -> [window start, emitted, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.burst <= 0 or record.levelno >= logging.ERROR:
+            return True
+        site = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            state = self._sites.get(site)
+            if state is None or now - state[0] >= self.window_seconds:
+                if state is not None and state[2]:
+                    record.suppressed = state[2]
+                self._sites[site] = [now, 1, 0]
+                return True
+            if state[1] < self.burst:
+                state[1] += 1
+                return True
+            state[2] += 1
+            self.suppressed_total += 1
+            return False
+
+class BoundedQueueHandler(QueueHandler):
+    """Hands records to the writer thread without ever blocking the caller
+
+    Messages (with any traceback) are formatted and truncated here; when
+    the queue is full the record is dropped and counted.
+    """
+
+    def __init__(self, log_queue: queue.Queue, max_chars: int):
+        super().__init__(log_queue)
+        self.max_chars = max_chars
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        record.msg = record.message = truncate(record.msg, self.max_chars)
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any context or extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = truncate(self.formatException(record.exc_info), settings.log_max_message_chars)
+        return json.dumps(entry, default=str)
+
+_handler: Optional[BoundedQueueHandler] = None
+_sampler: Optional[SamplingFilter] = None
+_listener: Optional[QueueListener] = None
+_pid: Optional[int] = None
+
+def configure_logging() -> None:
+    """Send all records through a bounded queue to a writer thread (idempotent per process)"""
+    global _handler, _sampler, _listener, _pid
+    if _handler is not None and _pid == os.getpid():
+        return
+
+    root = logging.getLogger()
+    if _handler is not None:
+        # Forked child: the parent's writer thread did not survive the fork
+        root.removeHandler(_handler)
+
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(
+        JsonFormatter() if settings.log_format == "json"
+        else logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    )
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+    _handler = BoundedQueueHandler(log_queue, settings.log_max_message_chars)
+    _sampler = SamplingFilter(settings.log_sample_burst, settings.log_sample_window_seconds)
+    _handler.addFilter(_sampler)
+    _handler.addFilter(ContextFilter())
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _pid = os.getpid()
+
+    root.addHandler(_handler)
+    root.setLevel(settings.log_level.upper())
+    _listener.start()
+
+def shutdown_logging() -> None:
+    """Write out whatever is still queued"""
+    if _listener is not None and _pid == os.getpid() and _listener._thread is not None:
+        try:
+            _listener.stop()
+        except queue.Full:
+            pass
+
+def get_logging_stats() -> Dict[str, int]:
+    return {
+        "queued": _handler.queue.qsize() if _handler is not None else 0,
+        "dropped": _handler.dropped if _handler is not None else 0,
+        "suppressed": _sampler.suppressed_total if _sampler is not None else 0,
+    }
+
+atexit.register(shutdown_logging)
+os.register_at_fork(after_in_child=lambda: _handler is not None and configure_logging())
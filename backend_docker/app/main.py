@@ -1,27 +1,57 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+import asyncio
 import logging
+import os
 
 from app.config import settings
-from app.database import engine
-from app import models
-from app.routers import auth, goals, tasks
+from app.database import engine, shard_engines
+from app import archive, query_monitor
+from app.migrations import ensure_schema
+from app.dependencies import require_metrics_token
+from app.request_context import request_id_var, new_request_id, begin_log_fields, end_log_fields
+from app.logging_setup import configure_logging, get_logging_stats
+from app.llm_service import llm_service
+from app.cache import user_cache
+from app.plan_jobs import plan_jobs
+from app.routers import auth, goals, tasks, search, dashboard, timeline, transfer
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging: JSON records written by a background thread, never blocking the event loop
+configure_logging()
 logger = logging.getLogger(__name__)
 
+# Time every SQL statement and flag slow / repeated ones per request
+query_monitor.install_query_monitor()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up...")
-    # Create database tables
-    models.Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created")
+    # Migrations are applied by `alembic upgrade head`; startup only checks the revision
+    for shard, shard_engine in enumerate(shard_engines):
+        revision = ensure_schema(shard_engine, upgrade=settings.db_migrate_on_startup, shard=shard)
+        logger.info("Database shard %s schema at revision %s", shard, revision)
+    logger.info(
+        "Worker %s ready: %s concurrent plan generations, DB pool: %s",
+        os.getpid(), settings.llm_max_concurrency, engine.pool.status()
+    )
+    compaction = None
+    if settings.archive_interval_seconds > 0:
+        compaction = asyncio.create_task(archive.compaction_loop(settings.archive_interval_seconds))
     yield
     # Shutdown
     logger.info("Shutting down...")
+    if compaction is not None:
+        compaction.cancel()
+        with suppress(asyncio.CancelledError):
+            await compaction
+    if plan_jobs.in_flight:
+        logger.info("Draining %d in-flight plan generation jobs...", plan_jobs.in_flight)
+        if not await plan_jobs.drain(settings.shutdown_drain_seconds):
+            logger.warning("Gave up on %d plan generation jobs after %gs", plan_jobs.in_flight, settings.shutdown_drain_seconds)
+    await asyncio.to_thread(llm_service.plan_index.save)
+    await llm_service.aclose()
 
 # Create FastAPI app
 app = FastAPI(
@@ -40,20 +70,53 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+
+@app.middleware("http")
+async def request_context_middleware(request: Request, call_next):
+    """Tag each request with an id and collect the queries it issues"""
+    request_id = request.headers.get("X-Request-ID") or new_request_id()
+    request_id_token = request_id_var.set(request_id)
+    log_fields_token = begin_log_fields(request_id=request_id)
+    stats_token = query_monitor.begin_request()
+    try:
+        response = await call_next(request)
+    finally:
+        query_monitor.end_request(stats_token)
+        end_log_fields(log_fields_token)
+        request_id_var.reset(request_id_token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "message": "Smart Task Planner API is running", "powered_by": "Groq Lightning-Fast LLMs"}
 
+# Metrics endpoint, for operators only
+@app.get("/metrics", dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    return {
+        "llm": llm_service.get_stats(),
+        "tokens": llm_service.usage.snapshot(),
+        "plan_reuse": llm_service.get_reuse_stats(),
+        "llm_http_pool": llm_service.get_pool_stats(),
+        "logging": get_logging_stats(),
+        "response_cache": user_cache.get_stats()
+    }
+
 # Include routers
 app.include_router(auth.router, prefix=settings.api_v1_str)
 app.include_router(goals.router, prefix=settings.api_v1_str)
 app.include_router(tasks.router, prefix=settings.api_v1_str)
+app.include_router(search.router, prefix=settings.api_v1_str)
+app.include_router(dashboard.router, prefix=settings.api_v1_str)
+app.include_router(timeline.router, prefix=settings.api_v1_str)
+app.include_router(transfer.router, prefix=settings.api_v1_str)
 
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
-    logger.error(f"Global exception handler caught: {exc}")
+    logger.error("Global exception handler caught: %s", exc, exc_info=exc)
     return HTTPException(
         status_code=500,
         detail="Internal server error"
@@ -74,7 +137,7 @@ if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
         "app.main:app",
-        host="0.0.0.0",
-        port=8000,
+        host=settings.web_host,
+        port=settings.web_port,
         reload=settings.debug
     )
@@ -0,0 +1,65 @@
+from pathlib import Path
+from typing import Optional
+import logging
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_DIR = Path(__file__).resolve().parent.parent / "alembic"
+BASELINE_REVISION = "0001"
+
+class SchemaOutOfDateError(RuntimeError):
+    """Raised at startup when the database is not at the migrations head"""
+
+def alembic_config(connection=None, shard: int = 0):
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    config.set_main_option("sqlalchemy.url", settings.database_url)
+    config.attributes["shard"] = shard
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+def head_revision() -> Optional[str]:
+    from alembic.script import ScriptDirectory
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+def current_revision(engine: Engine) -> Optional[str]:
+    from alembic.runtime.migration import MigrationContext
+    with engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+def ensure_schema(engine: Engine, upgrade: bool = False, shard: int = 0) -> str:
+    """Check the database is at the migrations head, optionally upgrading it first
+
+    A database created before migrations existed (tables but no revision)
+    is stamped with the baseline revision when upgrading. ``shard`` tells
+    the migrations which user shard they run on.
+    """
+    head = head_revision()
+    current = current_revision(engine)
+    if current == head:
+        return current
+
+    legacy = current is None and inspect(engine).has_table("users")
+    if not upgrade:
+        hint = f"alembic stamp {BASELINE_REVISION} && alembic upgrade head" if legacy else "alembic upgrade head"
+        raise SchemaOutOfDateError(
+            f"Database schema is at {current or 'no revision'}, expected {head}; run `{hint}`"
+        )
+
+    from alembic import command
+    with engine.begin() as connection:
+        config = alembic_config(connection, shard)
+        if legacy:
+            logger.warning("Database predates migrations; stamping revision %s", BASELINE_REVISION)
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
+    logger.info("Database upgraded from %s to %s", current or "empty", head)
+    return head
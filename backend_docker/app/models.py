@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Text, DateTime, Integer, ForeignKey, Boolean
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Text, DateTime, Integer, ForeignKey, Boolean, Index
+from sqlalchemy import Uuid as UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -23,11 +23,15 @@ class Goal(Base):
     __tablename__ = "goals"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
     text = Column(Text, nullable=False)
     status = Column(String(50), default="active")  # active, completed, archived
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # bumped by every update; ETag / If-Match
+    # Set for goals created through POST /goals/batch, so any worker can report the batch
+    batch_id = Column(UUID(as_uuid=True), index=True)
+    plan_status = Column(String(20))  # pending, processing, completed, failed
 
     # Relationships
     owner = relationship("User", back_populates="goals")
@@ -35,6 +39,8 @@ class Goal(Base):
 
 class Task(Base):
     __tablename__ = "tasks"
+    # Per-goal lookups, and the unfinished-task filter of the ready-tasks query
+    __table_args__ = (Index("ix_tasks_goal_id_status", "goal_id", "status"),)
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     goal_id = Column(UUID(as_uuid=True), ForeignKey("goals.id"), nullable=False)
@@ -46,6 +52,7 @@ class Task(Base):
     end_date = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # see Goal.version
 
     # Relationships
     goal = relationship("Goal", back_populates="tasks")
@@ -65,10 +72,80 @@ class TaskDependency(Base):
     __tablename__ = "task_dependencies"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id"), nullable=False)
-    depends_on_task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id"), nullable=False)
+    task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id"), nullable=False, index=True)
+    depends_on_task_id = Column(UUID(as_uuid=True), ForeignKey("tasks.id"), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     task = relationship("Task", foreign_keys=[task_id], back_populates="dependencies")
     depends_on_task = relationship("Task", foreign_keys=[depends_on_task_id], back_populates="dependents")
+
+# Email / user id -> shard lookup. Only shard 0's copy is used; see app.shards
+class UserDirectory(Base):
+    __tablename__ = "user_directory"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    email = Column(String(255), unique=True, index=True, nullable=False)
+    shard = Column(Integer, nullable=False, default=0)
+
+# Long-lived, rotating refresh tokens; only a SHA-256 of each token is stored
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    token_hash = Column(String(64), unique=True, nullable=False)
+    family_id = Column(UUID(as_uuid=True), nullable=False, index=True)  # every rotation of one login
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True))
+
+# Responses stored per Idempotency-Key so client retries are replayed, see app.idempotency
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer)  # null while the first request is still running
+    response_body = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+# Cold tier: archived and long-completed goals are moved here (with their task graph)
+# by app.archive, so queries on the hot tables never scan them. Rows are read-only.
+class ArchivedGoal(Base):
+    __tablename__ = "archived_goals"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    text = Column(Text, nullable=False)
+    status = Column(String(50))
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Summary counts frozen at archive time, so listings need no join
+    task_count = Column(Integer, nullable=False, default=0)
+    completed_tasks = Column(Integer, nullable=False, default=0)
+
+class ArchivedTask(Base):
+    __tablename__ = "archived_tasks"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    goal_id = Column(UUID(as_uuid=True), ForeignKey("archived_goals.id"), nullable=False, index=True)
+    name = Column(String(255), nullable=False)
+    description = Column(Text)
+    status = Column(String(50))
+    duration_days = Column(Integer)
+    start_date = Column(DateTime(timezone=True))
+    end_date = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+
+class ArchivedTaskDependency(Base):
+    __tablename__ = "archived_task_dependencies"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    task_id = Column(UUID(as_uuid=True), ForeignKey("archived_tasks.id"), nullable=False, index=True)
+    depends_on_task_id = Column(UUID(as_uuid=True), nullable=False)
+    created_at = Column(DateTime(timezone=True))
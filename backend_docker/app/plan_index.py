@@ -0,0 +1,180 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+import zlib
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset("""
+a an and are as at be by for from how i in into is it my of on or our the to up we with
+want need plan get make do will would like about
+""".split())
+
+class HashingVectorizer:
+    """Stateless text embedding: hashed word unigrams plus in-word character trigrams
+
+    Trigrams let "cert" and "certification" share features, so goals that
+    are worded differently still land near each other.
+    """
+
+    def __init__(self, n_features: int = 1024):
+        self.n_features = n_features
+
+    def _features(self, text: str) -> List[str]:
+        words = [w for w in _TOKEN_RE.findall(text.lower()) if w not in _STOPWORDS]
+        features = [f"w:{w}" for w in words]
+        for word in words:
+            padded = f"<{word}>"
+            features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+
+    def transform(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.n_features, dtype=np.float32)
+        for feature in self._features(text):
+            h = zlib.crc32(feature.encode())
+            vector[h % self.n_features] += 1.0 if h & 0x80000000 else -1.0
+        # Sublinear term frequency keeps repeated words from dominating
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+class PlanMatch(NamedTuple):
+    similarity: float
+    goal_text: str
+    plan: Dict[str, Any]
+
+class PlanIndex:
+    """In-memory nearest-neighbour index of generated plans, persisted to an .npz file
+
+    Every entry belongs to the user whose goal produced it, and searches
+    only see the caller's own entries: plans carry task names from private
+    goals and must not be handed to anyone else.
+    """
+
+    def __init__(self, path: Optional[str], n_features: int = 1024,
+                 max_entries: int = 5000, save_interval: float = 30.0):
+        self.path = path or None
+        self.vectorizer = HashingVectorizer(n_features)
+        self.max_entries = max_entries
+        self.save_interval = save_interval
+        self._vectors = np.zeros((0, n_features), dtype=np.float32)
+        self._entries: List[Dict[str, Any]] = []
+        self._owners: List[str] = []  # entry i belongs to user self._owners[i]
+        self._dirty = False
+        self._saving = False
+        self._last_save = time.monotonic()
+        self._loaded = False
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._entries)
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                vectors = data["vectors"]
+                entries = json.loads(str(data["entries"]))
+            if vectors.shape[1] == self.vectorizer.n_features and len(entries) == len(vectors):
+                self._vectors, self._entries = vectors.astype(np.float32), entries
+                # Entries saved before plans were scoped have no owner and never match
+                self._owners = [entry.get("user_id") or "" for entry in entries]
+                logger.info("Loaded %d plans from %s", len(entries), self.path)
+        except Exception as e:
+            logger.warning("Could not load plan index from %s: %s", self.path, e)
+
+    def _owned_by(self, user_id: Any) -> np.ndarray:
+        """Indexes of the user's entries"""
+        return np.flatnonzero(np.array(self._owners, dtype=object) == str(user_id))
+
+    def search(self, goal_text: str, user_id: Any, k: int = 3) -> List[PlanMatch]:
+        """The k indexed goals of the user most similar to ``goal_text``, best first"""
+        self._ensure_loaded()
+        rows = self._owned_by(user_id) if self._entries else np.zeros(0, dtype=np.int64)
+        if len(rows) == 0:
+            return []
+        scores = self._vectors[rows] @ self.vectorizer.transform(goal_text)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            PlanMatch(float(scores[i]), self._entries[rows[i]]["goal_text"], self._entries[rows[i]]["plan"])
+            for i in top
+        ]
+
+    def add(self, goal_text: str, plan: Dict[str, Any], user_id: Any) -> None:
+        self._ensure_loaded()
+        vector = self.vectorizer.transform(goal_text)
+        entry = {"user_id": str(user_id), "goal_text": goal_text, "plan": plan}
+        rows = self._owned_by(user_id) if self._entries else np.zeros(0, dtype=np.int64)
+        if len(rows):
+            scores = self._vectors[rows] @ vector
+            best = int(np.argmax(scores))
+            if scores[best] >= 0.98:
+                # Same goal again: keep the newest plan instead of a duplicate row
+                self._entries[rows[best]] = entry
+                self._mark_dirty()
+                return
+
+        self._vectors = np.vstack([self._vectors, vector[np.newaxis, :]])
+        self._entries.append(entry)
+        self._owners.append(entry["user_id"])
+        if len(self._entries) > self.max_entries:
+            # Oldest plans go first
+            overflow = len(self._entries) - self.max_entries
+            self._vectors = self._vectors[overflow:]
+            self._entries = self._entries[overflow:]
+            self._owners = self._owners[overflow:]
+        self._mark_dirty()
+
+    def _mark_dirty(self) -> None:
+        self._dirty = True
+        if time.monotonic() - self._last_save < self.save_interval or self._saving:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.save()
+            return
+        # Compressing and writing the file takes a while; keep it off the event loop
+        snapshot = self._snapshot()
+        if snapshot is None:
+            return
+        self._saving = True
+        future = loop.run_in_executor(None, self._write, *snapshot)
+        future.add_done_callback(lambda _: setattr(self, "_saving", False))
+
+    def _snapshot(self) -> Optional[Tuple[np.ndarray, List[Dict[str, Any]]]]:
+        # Taken on the caller's thread; add() replaces the vector array rather than mutating it
+        self._last_save = time.monotonic()
+        if not self.path or not self._dirty:
+            return None
+        self._dirty = False
+        return self._vectors, list(self._entries)
+
+    def _write(self, vectors: np.ndarray, entries: List[Dict[str, Any]]) -> None:
+        tmp_path = f"{self.path}.tmp.npz"
+        try:
+            np.savez_compressed(tmp_path, vectors=vectors, entries=np.array(json.dumps(entries)))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self._dirty = True
+            logger.warning("Could not save plan index to %s: %s", self.path, e)
+
+    def save(self) -> None:
+        """Write the index to disk atomically (no-op if unchanged or memory-only); blocking"""
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            self._write(*snapshot)
@@ -0,0 +1,64 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+import asyncio
+
+from app.config import settings
+
+# Per-goal plan generation states, stored in goals.plan_status (None: never tracked)
+PENDING = "pending"
+PROCESSING = "processing"
+COMPLETED = "completed"
+FAILED = "failed"
+
+class PlanJobTracker:
+    """Coordinates background plan generation across requests
+
+    A single semaphore bounds how many Groq calls run at once, whichever
+    endpoint scheduled them, and in-flight jobs are counted so shutdown
+    can wait for them.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._idle: Optional[asyncio.Event] = None
+        self.in_flight = 0
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    @property
+    def idle(self) -> asyncio.Event:
+        if self._idle is None:
+            self._idle = asyncio.Event()
+            self._idle.set()
+        return self._idle
+
+    @asynccontextmanager
+    async def running(self) -> AsyncIterator[None]:
+        """Count a generation job as in flight, including while it waits for the semaphore"""
+        self.in_flight += 1
+        self.idle.clear()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self.idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """Wait for in-flight jobs to finish; False if some were still running at the timeout"""
+        if self.in_flight == 0:
+            return True
+        try:
+            await asyncio.wait_for(self.idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+# Global instance
+plan_jobs = PlanJobTracker(max_concurrency=settings.llm_max_concurrency)
@@ -0,0 +1,72 @@
+from typing import Any, Dict, List, NamedTuple, Tuple
+import json
+
+class PromptTemplate(NamedTuple):
+    system: str
+    user: str  # formatted with goal_text=...
+
+# v1: the original verbose prompt, kept so results can be compared against it
+_V1_SYSTEM = "You are a professional project manager. Always respond with valid JSON only. Do not include any explanatory text before or after the JSON."
+
+_V1_USER = """You are an expert project manager and task planning assistant. Your job is to break down user goals into actionable tasks with clear dependencies and realistic time estimates.
+
+INSTRUCTIONS:
+1. Analyze the following goal and break it down into 3-8 concrete, actionable tasks
+2. Each task should be specific, measurable, and achievable
+3. Estimate realistic duration in days for each task (minimum 1 day)
+4. Identify dependencies between tasks (which tasks must be completed before others can start)
+5. Tasks should follow a logical sequence that leads to goal completion
+6. Return your response in valid JSON format ONLY - no additional text
+
+GOAL: {goal_text}
+
+Return a JSON response with this exact structure:
+{{
+  "tasks": [
+    {{
+      "name": "Task name (be specific and actionable)",
+      "description": "Detailed description of what needs to be done",
+      "duration_days": 3,
+      "depends_on": ["Name of prerequisite task 1", "Name of prerequisite task 2"]
+    }}
+  ]
+}}
+
+CRITICAL REQUIREMENTS:
+- Task names in "depends_on" must exactly match the "name" field of other tasks
+- Use empty array [] for tasks with no dependencies
+- Only include tasks that are necessary to achieve the goal
+- Be realistic with time estimates (minimum 1 day per task)
+- Focus on the most critical path to success
+- Response must be valid JSON only
+
+JSON Response:"""
+
+# v2: same contract in roughly a quarter of the tokens; the rules live in the system message
+_V2_SYSTEM = """You are a project planner. Reply with one JSON object only:
+{"tasks":[{"name":str,"description":str,"duration_days":int>=1,"depends_on":[task names]}]}
+Rules: 3-8 specific, actionable tasks on the critical path; realistic durations in days; depends_on uses exact names of other tasks ([] if none); concise descriptions."""
+
+_V2_USER = "Goal: {goal_text}"
+
+PROMPT_TEMPLATES: Dict[str, PromptTemplate] = {
+    "v1": PromptTemplate(system=_V1_SYSTEM, user=_V1_USER),
+    "v2": PromptTemplate(system=_V2_SYSTEM, user=_V2_USER),
+}
+
+def get_prompt_template(version: str) -> PromptTemplate:
+    try:
+        return PROMPT_TEMPLATES[version]
+    except KeyError:
+        raise ValueError(f"Unknown prompt template version: {version}")
+
+def format_examples(examples: List[Tuple[str, Dict[str, Any]]]) -> str:
+    """Compact few-shot block from (goal_text, plan) pairs; descriptions are dropped to save tokens"""
+    lines = ["Plans for similar goals, for reference:"]
+    for goal_text, plan in examples:
+        compact = {"tasks": [
+            {"name": t["name"], "duration_days": t["duration_days"], "depends_on": t["depends_on"]}
+            for t in plan["tasks"]
+        ]}
+        lines.append(f"Goal: {goal_text}\n{json.dumps(compact, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
@@ -0,0 +1,123 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator, List, Optional, Tuple
+import logging
+import re
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.request_context import get_request_id
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_LIST_RE = re.compile(r"\(\s*(?:\?|%\([^)]*\)s|%s|:\w+)(?:\s*,\s*(?:\?|%\([^)]*\)s|%s|:\w+))*\s*\)")
+
+def normalize_statement(statement: str) -> str:
+    """Reduce a SQL statement to its shape so repeated executions group together"""
+    shape = _WHITESPACE_RE.sub(" ", statement).strip()
+    shape = _STRING_LITERAL_RE.sub("?", shape)
+    shape = _NUMBER_LITERAL_RE.sub("?", shape)
+    # Expanded IN lists / multi-row VALUES vary in length but share a shape
+    return _PARAM_LIST_RE.sub("(?)", shape)
+
+class QueryStats:
+    """Statements observed during one request (or one tracked block)"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        shape = normalize_statement(statement)
+        with self._lock:
+            self.count += 1
+            self.total_ms += duration_ms
+            self.shapes[shape] += 1
+
+    def repeated_shapes(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes that ran more than ``threshold`` times"""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+_request_stats_var: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# Blocks wrapped in track_queries() see every statement, whichever thread runs it
+_collectors: List[QueryStats] = []
+_collectors_lock = threading.Lock()
+
+_installed = False
+
+# The start time lives on the statement's execution context, which is discarded with it, so a
+# statement that fails (no after_cursor_execute) leaves nothing behind on the pooled connection
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_monitor_start = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_monitor_start", None)
+    if started is None:
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+
+    stats = _request_stats_var.get()
+    if stats is not None:
+        stats.record(statement, duration_ms)
+    if _collectors:
+        with _collectors_lock:
+            collectors = list(_collectors)
+        for collector in collectors:
+            collector.record(statement, duration_ms)
+
+    if duration_ms >= settings.slow_query_threshold_ms:
+        logger.warning(
+            "Slow query (%.1f ms) request_id=%s: %s",
+            duration_ms, get_request_id(), normalize_statement(statement)
+        )
+
+def install_query_monitor() -> None:
+    """Attach timing hooks to every SQLAlchemy engine (idempotent)"""
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _installed = True
+
+def begin_request() -> Token:
+    return _request_stats_var.set(QueryStats())
+
+def end_request(token: Token) -> Optional[QueryStats]:
+    """Close the request's stats and flag statement shapes that look like N+1 loops"""
+    stats = _request_stats_var.get()
+    _request_stats_var.reset(token)
+    if stats is None:
+        return None
+
+    for shape, n in stats.repeated_shapes(settings.n_plus_one_threshold):
+        logger.warning(
+            "Possible N+1: statement ran %d times in request_id=%s: %s",
+            n, get_request_id(), shape
+        )
+    return stats
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect every statement executed while the block runs"""
+    install_query_monitor()
+    stats = QueryStats()
+    with _collectors_lock:
+        _collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        with _collectors_lock:
+            _collectors.remove(stats)
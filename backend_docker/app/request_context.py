@@ -0,0 +1,46 @@
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Iterator, Optional
+import uuid
+
+# Per-request identifiers, readable from anywhere in the call stack
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+# Fields attached to every log record: request_id, user_id, goal_id, ...
+_log_fields_var: ContextVar[Optional[Dict[str, Any]]] = ContextVar("log_fields", default=None)
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex
+
+def get_request_id() -> Optional[str]:
+    return request_id_var.get()
+
+def begin_log_fields(**fields: Any) -> Token:
+    """Start a fresh set of log fields for a request"""
+    return _log_fields_var.set(dict(fields))
+
+def end_log_fields(token: Token) -> None:
+    _log_fields_var.reset(token)
+
+def bind_log_fields(**fields: Any) -> None:
+    """Add fields to the current request's log records
+
+    The dict is shared by reference, so this also works from sync
+    dependencies that FastAPI runs in a copied context.
+    """
+    current = _log_fields_var.get()
+    if current is None:
+        _log_fields_var.set(dict(fields))
+    else:
+        current.update(fields)
+
+@contextmanager
+def log_fields(**fields: Any) -> Iterator[None]:
+    """Scoped log fields, for background jobs that must not leak into each other"""
+    token = _log_fields_var.set({**(_log_fields_var.get() or {}), **fields})
+    try:
+        yield
+    finally:
+        _log_fields_var.reset(token)
+
+def get_log_fields() -> Dict[str, Any]:
+    return _log_fields_var.get() or {}
@@ -4,8 +4,8 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.auth import authenticate_user, create_access_token
-from app.schemas import Token, UserCreate, User, APIResponse
+from app.auth import authenticate_user, create_access_token, refresh_token_user_id, verify_password
+from app.schemas import Token, RefreshRequest, PasswordChange, UserCreate, UserUpdate, User, APIResponse
 from app.dependencies import get_current_active_user
 from app import crud
 from app.config import settings
@@ -46,6 +46,53 @@ async def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    return _token_response(user, crud.create_refresh_token(db, user.id))
+
+@router.post("/refresh", response_model=Token)
+async def refresh(body: RefreshRequest, db: Session = Depends(get_db)):
+    """Exchange a refresh token for a new access token and a new refresh token"""
+    user_id = refresh_token_user_id(body.refresh_token)
+    rotated = None
+    if user_id is not None:
+        # The token carries its user id, which routes the session to the user's shard
+        db.info["user_id"] = user_id
+        rotated = crud.rotate_refresh_token(db, user_id, body.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user, refresh_token = rotated
+    return _token_response(user, refresh_token)
+
+@router.post("/logout", response_model=APIResponse)
+async def logout(body: RefreshRequest, db: Session = Depends(get_db)):
+    """Revoke a refresh token and every token rotated from the same login"""
+    user_id = refresh_token_user_id(body.refresh_token)
+    if user_id is not None:
+        db.info["user_id"] = user_id
+        crud.revoke_refresh_token(db, user_id, body.refresh_token)
+    return APIResponse(success=True, message="Logged out")
+
+@router.post("/password", response_model=APIResponse)
+async def change_password(
+    body: PasswordChange,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Change the password; every refresh token issued so far is revoked"""
+    if not verify_password(body.current_password, current_user.hashed_password):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Current password is incorrect"
+        )
+    crud.update_user(db, current_user.id, UserUpdate(
+        email=current_user.email, name=current_user.name, password=body.new_password
+    ))
+    return APIResponse(success=True, message="Password changed; sign in again on other devices")
+
+def _token_response(user, refresh_token: str) -> dict:
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
         data={"sub": user.email}, expires_delta=access_token_expires
@@ -53,7 +100,9 @@ async def login(
 
     return {
         "access_token": access_token,
-        "token_type": "bearer"
+        "token_type": "bearer",
+        "expires_in": int(access_token_expires.total_seconds()),
+        "refresh_token": refresh_token
     }
 
 @router.post("/test-token", response_model=User)
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.dependencies import get_current_active_user
+from app.schemas import Dashboard
+from app.cache import user_cache
+from app import crud, models
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+# Goal cards shown; the stats count every goal
+GOAL_CARD_LIMIT = 1000
+
+@router.get("", response_model=Dashboard)
+async def get_dashboard(
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Goal summaries, task counts and what to work on next, in one call"""
+    cached, generation = user_cache.lookup(current_user.id, "dashboard")
+    if cached is not None:
+        return cached
+
+    goals = crud.get_user_goals_summary(db, current_user.id, limit=GOAL_CARD_LIMIT)
+    goals_by_status = crud.get_goal_status_counts(db, current_user.id)
+    tasks_by_status = crud.get_task_status_counts(db, current_user.id)
+
+    dashboard = Dashboard(
+        stats={
+            "total_goals": sum(goals_by_status.values()),
+            "active_goals": goals_by_status.get("active", 0),
+            "completed_goals": goals_by_status.get("completed", 0),
+            "total_tasks": sum(tasks_by_status.values()),
+            "tasks_by_status": tasks_by_status,
+        },
+        goals=goals,
+        in_progress_tasks=crud.get_in_progress_tasks(db, current_user.id),
+        next_tasks=crud.get_next_actionable_tasks(db, current_user.id)
+    )
+    return user_cache.set(current_user.id, "dashboard", dashboard, generation, db.cache_max_age())
@@ -1,72 +1,282 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status, BackgroundTasks
 from sqlalchemy.orm import Session
+import asyncio
+import logging
+import time
 import uuid
 
 from app.database import get_db
-from app.dependencies import get_current_active_user, verify_goal_access
-from app.schemas import Goal, GoalCreate, GoalUpdate, GoalSummary, APIResponse
+from app.dependencies import get_current_active_user, verify_goal_access, parse_id, etag, if_match_version
+from app.schemas import (
+    Goal, GoalCreate, GoalRecord, GoalUpdate, GoalSummary, APIResponse, ArchivedGoal,
+    GoalBatchCreate, GoalBatchStatus, GoalBatchItem, GoalGraph,
+    DependencyBulkUpdate, DependencyBulkResult
+)
 from app.llm_service import llm_service
+from app.plan_jobs import plan_jobs, PENDING, PROCESSING, COMPLETED, FAILED
+from app.graph import topological_layers, transitive_reduction
+from app.archive import get_archived_goal
+from app.cache import user_cache, goal_key
+from app.idempotency import idempotent, request_fingerprint
+from app.request_context import log_fields
 from app import crud, models
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/goals", tags=["goals"])
 
 @router.post("/", response_model=APIResponse)
 async def create_goal(
     goal: GoalCreate,
+    request: Request,
     background_tasks: BackgroundTasks,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Create a new goal and generate tasks using LLM"""
-    # Create the goal first
-    db_goal = crud.create_goal(db, goal, current_user.id)
+    # A retry with the same Idempotency-Key gets the first response: no second goal, no second LLM call
+    fingerprint = request_fingerprint(request.method, request.url.path, goal)
+    async with idempotent(db, current_user.id, idempotency_key, fingerprint) as attempt:
+        if attempt.replay is not None:
+            return attempt.replay
+
+        # Create the goal first
+        db_goal = crud.create_goal(db, goal, current_user.id)
+
+        # Schedule task generation in the background
+        background_tasks.add_task(generate_tasks_for_goal, db_goal.id, goal.text, current_user.id)
+
+        return attempt.store(APIResponse(
+            success=True,
+            message="Goal created successfully. Tasks are being generated...",
+            data={
+                "goal_id": str(db_goal.id),
+                "status": "processing"
+            }
+        ))
+
+@router.post("/batch", response_model=APIResponse)
+async def create_goals_batch(
+    batch: GoalBatchCreate,
+    background_tasks: BackgroundTasks,
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Create many goals in one transaction and generate their tasks concurrently"""
+    batch_id = uuid.uuid4()
+    goal_ids = crud.create_goals_bulk(db, batch.goals, current_user.id, batch_id)
 
-    # Schedule task generation in the background
-    background_tasks.add_task(generate_tasks_for_goal, db_goal.id, goal.text)
+    jobs = [(goal_id, goal.text) for goal_id, goal in zip(goal_ids, batch.goals)]
+    background_tasks.add_task(generate_tasks_for_goals, jobs, current_user.id)
 
     return APIResponse(
         success=True,
-        message="Goal created successfully. Tasks are being generated...",
+        message=f"{len(goal_ids)} goals created successfully. Tasks are being generated...",
         data={
-            "goal_id": str(db_goal.id),
-            "status": "processing"
+            "batch_id": str(batch_id),
+            "goals": [{"goal_id": str(goal_id), "status": PENDING} for goal_id in goal_ids]
         }
     )
 
+@router.get("/batch/{batch_id}", response_model=GoalBatchStatus)
+async def get_goals_batch(
+    batch_id: str,
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get the task generation status of every goal in a batch"""
+    try:
+        batch_uuid = uuid.UUID(batch_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid batch ID format"
+        )
+
+    # Only the caller's goals are read, so another user's batch id finds nothing
+    statuses = {row.id: row.plan_status or COMPLETED for row in crud.get_batch_statuses(db, batch_uuid, current_user.id)}
+    if not statuses:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch not found"
+        )
+
+    return GoalBatchStatus(
+        batch_id=batch_uuid,
+        done=all(s in (COMPLETED, FAILED) for s in statuses.values()),
+        goals=[GoalBatchItem(goal_id=goal_id, status=s) for goal_id, s in statuses.items()]
+    )
+
 @router.get("/", response_model=List[GoalSummary])
 async def get_user_goals(
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    include: Optional[str] = Query(None, pattern="^archived$")
+):
+    """Get all goals for the current user (?include=archived adds the cold tier)"""
+    cache_key = f"goals:{skip}:{limit}:{include or ''}"
+    cached, generation = user_cache.lookup(current_user.id, cache_key)
+    if cached is not None:
+        return cached
+
+    goals = crud.get_user_goals_summary(db, current_user.id, skip, limit, include_archived=include == "archived")
+    return user_cache.set(current_user.id, cache_key, goals, generation, db.cache_max_age())
+
+@router.get("/archived/{goal_id}", response_model=ArchivedGoal)
+async def get_archived_goal_detail(
+    goal_id: str,
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
 ):
-    """Get all goals for the current user"""
-    goals = crud.get_user_goals_summary(db, current_user.id, skip, limit)
-    return goals
+    """Get a goal from the cold tier with all its tasks (read-only)"""
+    goal = get_archived_goal(db, parse_id(goal_id, "goal"), current_user.id)
+    if goal is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Archived goal not found"
+        )
+    return goal
 
 @router.get("/{goal_id}", response_model=Goal)
 async def get_goal(
-    goal: models.Goal = Depends(verify_goal_access),
+    goal_id: str,
+    response: Response,
+    current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Get a specific goal with all its tasks"""
-    return goal
+    # Cache entries are per user, so a hit needs no ownership query
+    cache_key = goal_key(parse_id(goal_id, "goal"))
+    cached, generation = user_cache.lookup(current_user.id, cache_key)
+    if cached is None:
+        goal = verify_goal_access(goal_id, current_user, db)
+        cached = user_cache.set(current_user.id, cache_key, Goal.model_validate(goal), generation, db.cache_max_age())
+    response.headers["ETag"] = etag(cached["version"])
+    return cached
+
+@router.get("/{goal_id}/graph", response_model=GoalGraph)
+async def get_goal_graph(
+    goal_id: str,
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Dependency graph of a goal as indexed arrays, with topological order and layers"""
+    cache_key = goal_key(parse_id(goal_id, "goal"), "graph")
+    cached, generation = user_cache.lookup(current_user.id, cache_key)
+    if cached is not None:
+        return cached
+
+    goal = verify_goal_access(goal_id, current_user, db)
+    tasks, dependencies = crud.get_goal_graph(db, goal.id)
+    index = {task.id: i for i, task in enumerate(tasks)}
+    edges = [
+        [index[dep.depends_on_task_id], index[dep.task_id]]
+        for dep in dependencies
+        if dep.depends_on_task_id in index  # skip edges to tasks of other goals
+    ]
+    order, layers, has_cycle = topological_layers(len(tasks), edges)
+
+    graph = GoalGraph(
+        goal_id=goal.id,
+        tasks=[task._asdict() for task in tasks],
+        edges=edges,
+        order=order,
+        layers=layers,
+        has_cycle=has_cycle
+    )
+    return user_cache.set(current_user.id, cache_key, graph, generation, db.cache_max_age())
+
+@router.post("/{goal_id}/dependencies/bulk", response_model=DependencyBulkResult)
+async def bulk_update_dependencies(
+    update: DependencyBulkUpdate,
+    goal: models.Goal = Depends(verify_goal_access),
+    db: Session = Depends(get_db)
+):
+    """Add (or replace) many dependencies at once, validating the whole graph in one pass"""
+    tasks, existing = crud.get_goal_graph(db, goal.id)
+    index = {task.id: i for i, task in enumerate(tasks)}
+    task_ids = [task.id for task in tasks]
+
+    requested = []
+    for edge in update.edges:
+        for task_id in (edge.task_id, edge.depends_on_task_id):
+            if task_id not in index:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Task {task_id} not found in this goal"
+                )
+        if edge.task_id == edge.depends_on_task_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A task cannot depend on itself"
+            )
+        requested.append((index[edge.depends_on_task_id], index[edge.task_id]))
+
+    # Edges to tasks of other goals are left alone
+    current = [
+        (index[dep.depends_on_task_id], index[dep.task_id])
+        for dep in existing if dep.depends_on_task_id in index
+    ]
+    edges = requested if update.replace else current + requested
+
+    # Dependencies on tasks of other goals can close a cycle through this one
+    outside = crud.get_edges_leaving_goal(db, goal.id, goal.user_id)
+    nodes = dict(index)
+    for dep in outside:
+        for task_id in (dep.task_id, dep.depends_on_task_id):
+            nodes.setdefault(task_id, len(nodes))
+    checked = edges + [(nodes[dep.depends_on_task_id], nodes[dep.task_id]) for dep in outside]
+    _, _, has_cycle = topological_layers(len(nodes), checked)
+    if has_cycle:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="These dependencies would create a circular reference"
+        )
+
+    final = transitive_reduction(len(tasks), edges) if update.reduce else list(dict.fromkeys(edges))
+    final_set, current_set = set(final), set(current)
+    added = [edge for edge in final if edge not in current_set]
+    removed = [edge for edge in current_set if edge not in final_set]
+    crud.apply_dependency_changes(
+        db,
+        [(task_ids[target], task_ids[source]) for source, target in added],
+        [(task_ids[target], task_ids[source]) for source, target in removed],
+        goal.user_id
+    )
+    return DependencyBulkResult(
+        added=len(added),
+        removed=len(removed),
+        redundant=len(set(requested) - final_set),
+        edges=len(final)
+    )
 
-@router.put("/{goal_id}", response_model=Goal)
+@router.put("/{goal_id}", response_model=GoalRecord)
 async def update_goal(
+    goal_id: str,
     goal_update: GoalUpdate,
-    goal: models.Goal = Depends(verify_goal_access),
+    response: Response,
+    expected_version: Optional[int] = Depends(if_match_version),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    """Update a goal"""
-    updated_goal = crud.update_goal(db, goal.id, current_user.id, goal_update)
+    """Update a goal; with If-Match, only if it is still at that version"""
+    try:
+        updated_goal = crud.update_goal(db, parse_id(goal_id, "goal"), current_user.id, goal_update, expected_version)
+    except crud.StaleVersionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Goal was modified concurrently; it is now at version {e.current_version}"
+        )
     if not updated_goal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Goal not found"
         )
+    response.headers["ETag"] = etag(updated_goal.version)
     return updated_goal
 
 @router.delete("/{goal_id}", response_model=APIResponse)
@@ -90,35 +300,62 @@ async def delete_goal(
 
 @router.post("/{goal_id}/regenerate-tasks", response_model=APIResponse)
 async def regenerate_tasks(
+    request: Request,
     background_tasks: BackgroundTasks,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     goal: models.Goal = Depends(verify_goal_access),
     db: Session = Depends(get_db)
 ):
     """Regenerate tasks for a goal using LLM"""
-    # Delete existing tasks
-    existing_tasks = crud.get_goal_tasks(db, goal.id, goal.user_id)
-    for task in existing_tasks:
-        crud.delete_task(db, task.id, goal.user_id)
+    fingerprint = request_fingerprint(request.method, request.url.path)
+    async with idempotent(db, goal.user_id, idempotency_key, fingerprint) as attempt:
+        if attempt.replay is not None:
+            return attempt.replay
 
-    # Schedule new task generation
-    background_tasks.add_task(generate_tasks_for_goal, goal.id, goal.text)
+        # Delete existing tasks
+        existing_tasks = crud.get_goal_tasks(db, goal.id, goal.user_id)
+        for task in existing_tasks:
+            crud.delete_task(db, task.id, goal.user_id)
 
-    return APIResponse(
-        success=True,
-        message="Tasks are being regenerated...",
-        data={"status": "processing"}
-    )
+        # Schedule new task generation; the goal's own indexed plan must not simply come back
+        crud.set_plan_status(db, goal.id, PENDING)
+        background_tasks.add_task(generate_tasks_for_goal, goal.id, goal.text, goal.user_id, reuse=False)
 
-async def generate_tasks_for_goal(goal_id: uuid.UUID, goal_text: str):
+        return attempt.store(APIResponse(
+            success=True,
+            message="Tasks are being regenerated...",
+            data={"status": "processing"}
+        ))
+
+async def generate_tasks_for_goals(jobs: List[Tuple[uuid.UUID, str]], user_id: uuid.UUID):
+    """Background task to generate tasks for a batch of goals, bounded by plan_jobs' semaphore"""
+    await asyncio.gather(*(
+        generate_tasks_for_goal(goal_id, goal_text, user_id) for goal_id, goal_text in jobs
+    ))
+
+async def generate_tasks_for_goal(goal_id: uuid.UUID, goal_text: str, user_id: Optional[uuid.UUID] = None,
+                                  reuse: bool = True):
     """Background task to generate tasks using LLM"""
+    # Tracked so a graceful shutdown can wait for the job to finish
+    async with plan_jobs.running():
+        with log_fields(goal_id=str(goal_id), user_id=str(user_id) if user_id else None):
+            await _generate_tasks_for_goal(goal_id, goal_text, user_id, reuse)
+
+async def _generate_tasks_for_goal(goal_id: uuid.UUID, goal_text: str, user_id: Optional[uuid.UUID],
+                                   reuse: bool = True):
+    started = time.perf_counter()
     try:
         # Get a new database session for the background task
         from app.database import SessionLocal
         db = SessionLocal()
+        # Routes the session to the user's shard
+        db.info["user_id"] = user_id
 
         try:
-            # Generate plan using LLM
-            plan = await llm_service.generate_task_plan(goal_text)
+            # Generate plan using LLM, never more than llm_max_concurrency at once
+            async with plan_jobs.semaphore:
+                crud.set_plan_status(db, goal_id, PROCESSING)
+                plan = await llm_service.generate_task_plan(goal_text, user_id, reuse=reuse)
 
             # Convert LLM response to the format expected by crud.create_tasks_bulk
             tasks_data = []
@@ -131,12 +368,23 @@ async def generate_tasks_for_goal(goal_id: uuid.UUID, goal_text: str):
                 })
 
             # Create tasks in database
-            crud.create_tasks_bulk(db, tasks_data, goal_id)
+            crud.create_tasks_bulk(db, tasks_data, goal_id, user_id)
+            crud.set_plan_status(db, goal_id, COMPLETED)
+            logger.info(
+                "Generated %d tasks", len(tasks_data),
+                extra={"duration_ms": round((time.perf_counter() - started) * 1000, 1)}
+            )
 
+        except Exception:
+            db.rollback()
+            crud.set_plan_status(db, goal_id, FAILED)
+            raise
         finally:
             db.close()
 
     except Exception as e:
-        # Log the error (in production, use proper logging)
-        print(f"Error generating tasks for goal {goal_id}: {str(e)}")
+        logger.error(
+            "Error generating tasks for goal %s: %s", goal_id, e, exc_info=True,
+            extra={"duration_ms": round((time.perf_counter() - started) * 1000, 1)}
+        )
         # In production, you might want to update the goal status to indicate failure
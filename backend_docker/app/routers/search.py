@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.dependencies import get_current_active_user
+from app.schemas import SearchResults
+from app import models, search as search_index
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+@router.get("", response_model=SearchResults)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Full-text search across the current user's goals and tasks"""
+    # Fetch one extra row to know whether another page exists without counting
+    hits = search_index.search(db, current_user.id, q, skip, limit + 1)
+    return SearchResults(
+        query=q,
+        skip=skip,
+        limit=limit,
+        has_more=len(hits) > limit,
+        hits=hits[:limit]
+    )
@@ -1,36 +1,71 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 import uuid
 
 from app.database import get_db
-from app.dependencies import get_current_active_user, verify_task_access, verify_goal_access
-from app.schemas import Task, TaskCreate, TaskUpdate, APIResponse
+from app.dependencies import (
+    get_current_active_user, verify_task_access, verify_goal_access, parse_id, etag, if_match_version
+)
+from app.schemas import Task, TaskCreate, TaskRecord, TaskUpdate, APIResponse, ReadyTasks
+from app.cache import user_cache, goal_key
 from app import crud, models
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+# Declared before /{task_id} so "ready" is not parsed as a task id
+@router.get("/ready", response_model=ReadyTasks)
+async def get_ready_tasks(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    sort: str = Query("goal", pattern="^(goal|duration)$"),
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Unfinished tasks, across all goals, whose prerequisites are all completed"""
+    # Fetch one extra row to know whether another page exists without counting
+    tasks = crud.get_ready_tasks(db, current_user.id, skip, limit + 1, sort)
+    return ReadyTasks(
+        sort=sort,
+        skip=skip,
+        limit=limit,
+        has_more=len(tasks) > limit,
+        tasks=tasks[:limit]
+    )
+
 @router.get("/{task_id}", response_model=Task)
 async def get_task(
+    response: Response,
     task: models.Task = Depends(verify_task_access)
 ):
     """Get a specific task"""
+    response.headers["ETag"] = etag(task.version)
     return task
 
-@router.patch("/{task_id}", response_model=Task)
+@router.patch("/{task_id}", response_model=TaskRecord)
 async def update_task(
+    task_id: str,
     task_update: TaskUpdate,
-    task: models.Task = Depends(verify_task_access),
+    response: Response,
+    expected_version: Optional[int] = Depends(if_match_version),
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Update a task (name, status, etc.)"""
-    updated_task = crud.update_task(db, task.id, current_user.id, task_update)
+    """Update a task (name, status, etc.); with If-Match, only if it is still at that version"""
+    # Ownership check, version check and write are one UPDATE ... RETURNING
+    try:
+        updated_task = crud.update_task(db, parse_id(task_id, "task"), current_user.id, task_update, expected_version)
+    except crud.StaleVersionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Task was modified concurrently; it is now at version {e.current_version}"
+        )
     if not updated_task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
+    response.headers["ETag"] = etag(updated_task.version)
     return updated_task
 
 @router.delete("/{task_id}", response_model=APIResponse)
@@ -84,7 +119,7 @@ async def add_task_dependency(
         )
 
     # Create the dependency
-    dependency = crud.create_task_dependency(db, task.id, depends_on_uuid)
+    dependency = crud.create_task_dependency(db, task.id, depends_on_uuid, current_user.id)
 
     return APIResponse(
         success=True,
@@ -108,7 +143,7 @@ async def remove_task_dependency(
             detail="Invalid task ID format"
         )
 
-    success = crud.delete_task_dependency(db, task.id, depends_on_uuid)
+    success = crud.delete_task_dependency(db, task.id, depends_on_uuid, current_user.id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -146,15 +181,21 @@ async def create_task(
         )
 
     # Create the task
-    task = crud.create_task(db, task_create, goal_uuid)
+    task = crud.create_task(db, task_create, goal_uuid, current_user.id)
     return task
 
 @router.get("/goal/{goal_id}", response_model=List[Task])
 async def get_goal_tasks(
-    goal: models.Goal = Depends(verify_goal_access),
+    goal_id: str,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
     """Get all tasks for a specific goal"""
+    cache_key = goal_key(parse_id(goal_id, "goal"), "tasks")
+    cached, generation = user_cache.lookup(current_user.id, cache_key)
+    if cached is not None:
+        return cached
+
+    goal = verify_goal_access(goal_id, current_user, db)
     tasks = crud.get_goal_tasks(db, goal.id, current_user.id)
-    return tasks
+    return user_cache.set(current_user.id, cache_key, [Task.model_validate(task) for task in tasks], generation, db.cache_max_age())
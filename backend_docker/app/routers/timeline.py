@@ -0,0 +1,35 @@
+from datetime import date, datetime, timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.dependencies import get_current_active_user
+from app.schemas import Timeline
+from app.cache import user_cache
+from app.config import settings
+from app.timeline import build_timeline
+from app import crud, models
+
+router = APIRouter(prefix="/timeline", tags=["timeline"])
+
+@router.get("", response_model=Timeline)
+async def get_timeline(
+    start: Optional[date] = None,
+    capacity: Optional[float] = Query(None, gt=0, le=100),
+    workdays_only: bool = False,
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Schedule of all open tasks across goals under a daily capacity, with per-day load"""
+    start = start or datetime.now(timezone.utc).date()
+    capacity = capacity or settings.timeline_daily_capacity
+    # A user-wide view: any write to the user's goals or tasks drops it
+    cache_key = f"timeline:{start}:{capacity}:{int(workdays_only)}"
+    cached, generation = user_cache.lookup(current_user.id, cache_key)
+    if cached is not None:
+        return cached
+
+    tasks, edges = crud.get_timeline_inputs(db, current_user.id)
+    timeline = build_timeline(tasks, edges, start, capacity, settings.timeline_horizon_days, workdays_only)
+    return user_cache.set(current_user.id, cache_key, timeline, generation, db.cache_max_age())
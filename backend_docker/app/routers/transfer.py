@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.dependencies import get_current_active_user
+from app.schemas import APIResponse
+from app.transfer import export_user_data, UserDataImporter, ImportFormatError, iter_lines
+from app import crud, models
+
+router = APIRouter(tags=["export"])
+
+@router.get("/export")
+async def export_data(
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Stream all of the current user's goals, tasks and dependencies as NDJSON"""
+    return StreamingResponse(
+        export_user_data(db, current_user.id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="goals-export.ndjson"'}
+    )
+
+@router.post("/import", response_model=APIResponse)
+async def import_data(
+    request: Request,
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Import an NDJSON export into the current user's account with fresh ids"""
+    importer = UserDataImporter(db, current_user.id)
+    line_number = 0
+    try:
+        async for line in iter_lines(request.stream()):
+            line_number += 1
+            importer.add_line(line, line_number)
+        counts = importer.finish()
+        db.commit()
+    except ImportFormatError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception:
+        db.rollback()
+        raise
+
+    crud.user_data_changed(current_user.id)
+    return APIResponse(
+        success=True,
+        message="Import completed successfully",
+        data=counts
+    )
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr, Field
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID
 
 # User Schemas
@@ -13,6 +13,7 @@ class UserCreate(UserBase):
 
 class UserUpdate(UserBase):
     password: Optional[str] = None
+    is_active: Optional[bool] = None
 
 class User(UserBase):
     id: UUID
@@ -26,6 +27,15 @@ class User(UserBase):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    expires_in: Optional[int] = None  # access token lifetime in seconds
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class PasswordChange(BaseModel):
+    current_password: str
+    new_password: str
 
 class TokenData(BaseModel):
     email: Optional[str] = None
@@ -56,18 +66,21 @@ class TaskDependency(BaseModel):
     class Config:
         from_attributes = True
 
-class Task(TaskBase):
+class TaskRecord(TaskBase):
     id: UUID
     goal_id: UUID
     status: str
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
     created_at: datetime
-    dependencies: List[TaskDependency] = []
+    version: int = 1  # send back in If-Match to update only this version
 
     class Config:
         from_attributes = True
 
+class Task(TaskRecord):
+    dependencies: List[TaskDependency] = []
+
 # Goal Schemas
 class GoalBase(BaseModel):
     text: str
@@ -75,20 +88,35 @@ class GoalBase(BaseModel):
 class GoalCreate(GoalBase):
     pass
 
+class GoalBatchCreate(BaseModel):
+    goals: List[GoalCreate] = Field(..., min_length=1, max_length=100)
+
+class GoalBatchItem(BaseModel):
+    goal_id: UUID
+    status: str
+
+class GoalBatchStatus(BaseModel):
+    batch_id: UUID
+    done: bool
+    goals: List[GoalBatchItem]
+
 class GoalUpdate(BaseModel):
     text: Optional[str] = None
     status: Optional[str] = None
 
-class Goal(GoalBase):
+class GoalRecord(GoalBase):
     id: UUID
     user_id: UUID
     status: str
     created_at: datetime
-    tasks: List[Task] = []
+    version: int = 1  # send back in If-Match to update only this version
 
     class Config:
         from_attributes = True
 
+class Goal(GoalRecord):
+    tasks: List[Task] = []
+
 class GoalSummary(BaseModel):
     id: UUID
     text: str
@@ -96,10 +124,119 @@ class GoalSummary(BaseModel):
     created_at: datetime
     task_count: int
     completed_tasks: int
+    archived: bool = False  # stored in the cold tier (read-only)
 
     class Config:
         from_attributes = True
 
+class ArchivedGoal(GoalBase):
+    """A goal in the cold tier with its tasks, read-only"""
+    id: UUID
+    status: str
+    created_at: datetime
+    archived_at: Optional[datetime] = None
+    task_count: int
+    completed_tasks: int
+    tasks: List[Task] = []
+
+class DependencyEdge(BaseModel):
+    task_id: UUID
+    depends_on_task_id: UUID
+
+class DependencyBulkUpdate(BaseModel):
+    edges: List[DependencyEdge] = Field(..., max_length=5000)
+    replace: bool = False  # drop the goal's existing edges that are not listed
+    reduce: bool = True  # skip (and remove) edges implied by longer dependency chains
+
+class DependencyBulkResult(BaseModel):
+    added: int
+    removed: int
+    redundant: int  # requested edges not stored because a longer path implies them
+    edges: int  # edges stored for the goal afterwards
+
+class GraphTask(BaseModel):
+    id: UUID
+    name: str
+    status: str
+    duration_days: int
+
+class GoalGraph(BaseModel):
+    goal_id: UUID
+    tasks: List[GraphTask]  # edges, order and layers refer to positions in this list
+    edges: List[List[int]]  # [prerequisite, dependent]
+    order: List[int]  # topological order
+    layers: List[int]  # layers[i]: longest prerequisite chain before tasks[i]
+    has_cycle: bool = False
+
+# Dashboard Schemas
+class DashboardTask(BaseModel):
+    id: UUID
+    goal_id: UUID
+    goal_text: str
+    name: str
+    status: str
+    duration_days: int
+
+class DashboardStats(BaseModel):
+    total_goals: int
+    active_goals: int
+    completed_goals: int
+    total_tasks: int
+    tasks_by_status: Dict[str, int]
+
+class ReadyTasks(BaseModel):
+    sort: str
+    skip: int
+    limit: int
+    has_more: bool
+    tasks: List[DashboardTask]
+
+class Dashboard(BaseModel):
+    stats: DashboardStats
+    goals: List[GoalSummary]
+    in_progress_tasks: List[DashboardTask]
+    next_tasks: List[DashboardTask]
+
+# Timeline Schemas
+class TimelineTask(BaseModel):
+    id: UUID
+    goal_id: UUID
+    name: str
+    status: str
+    duration_days: int
+    start: Optional[date] = None  # None: not reached within the horizon
+    end: Optional[date] = None
+
+class TimelineGoal(BaseModel):
+    goal_id: UUID
+    goal_text: str
+    load: List[float]  # work scheduled on each of Timeline.days
+
+class Timeline(BaseModel):
+    start: date
+    capacity: float  # task-days of work per day
+    days: List[date]
+    load: List[float]  # total work scheduled per day, never above capacity
+    end: Optional[date] = None  # the day the last open task finishes
+    goals: List[TimelineGoal]
+    tasks: List[TimelineTask]
+
+# Search Schemas
+class SearchHit(BaseModel):
+    kind: str  # goal or task
+    id: UUID
+    goal_id: UUID
+    title: str
+    snippet: Optional[str] = None
+    rank: float
+
+class SearchResults(BaseModel):
+    query: str
+    skip: int
+    limit: int
+    has_more: bool
+    hits: List[SearchHit]
+
 # LLM Schemas
 class LLMTaskResponse(BaseModel):
     name: str
@@ -0,0 +1,198 @@
+from collections import namedtuple
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+import logging
+import re
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.database import Base
+
+logger = logging.getLogger(__name__)
+
+_QUERY_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_Hit = namedtuple("_Hit", "kind id goal_id title snippet rank")
+
+# SQLite: FTS5 tables kept in sync by triggers. goals_fts indexes the goals
+# table directly; tasks_fts reads through a view that carries the owning
+# user_id, so user scoping is part of the MATCH instead of a post-filter.
+_SQLITE_SEARCH_DDL = [
+    """CREATE VIEW IF NOT EXISTS task_search_source AS
+        SELECT t.rowid AS task_rowid, t.name, t.description, g.user_id
+        FROM tasks t JOIN goals g ON g.id = t.goal_id""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS goals_fts USING fts5(
+        text, user_id, content='goals', tokenize='porter unicode61')""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        name, description, user_id,
+        content='task_search_source', content_rowid='task_rowid', tokenize='porter unicode61')""",
+    """CREATE TRIGGER IF NOT EXISTS goals_fts_ai AFTER INSERT ON goals BEGIN
+        INSERT INTO goals_fts(rowid, text, user_id) VALUES (new.rowid, new.text, new.user_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS goals_fts_ad AFTER DELETE ON goals BEGIN
+        INSERT INTO goals_fts(goals_fts, rowid, text, user_id) VALUES ('delete', old.rowid, old.text, old.user_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS goals_fts_au AFTER UPDATE OF text ON goals BEGIN
+        INSERT INTO goals_fts(goals_fts, rowid, text, user_id) VALUES ('delete', old.rowid, old.text, old.user_id);
+        INSERT INTO goals_fts(rowid, text, user_id) VALUES (new.rowid, new.text, new.user_id);
+    END""",
+    # Tasks are always removed before their goal (ORM cascade), so the owner lookup still resolves
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, name, description, user_id)
+        VALUES (new.rowid, new.name, new.description, (SELECT user_id FROM goals WHERE id = new.goal_id));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, name, description, user_id)
+        VALUES ('delete', old.rowid, old.name, old.description, (SELECT user_id FROM goals WHERE id = old.goal_id));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF name, description ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, name, description, user_id)
+        VALUES ('delete', old.rowid, old.name, old.description, (SELECT user_id FROM goals WHERE id = old.goal_id));
+        INSERT INTO tasks_fts(rowid, name, description, user_id)
+        VALUES (new.rowid, new.name, new.description, (SELECT user_id FROM goals WHERE id = new.goal_id));
+    END""",
+]
+
+_SQLITE_DROP_DDL = [
+    *(f"DROP TRIGGER IF EXISTS {table}_fts_{event}" for table in ("goals", "tasks") for event in ("ai", "ad", "au")),
+    "DROP TABLE IF EXISTS tasks_fts",
+    "DROP TABLE IF EXISTS goals_fts",
+    "DROP VIEW IF EXISTS task_search_source",
+]
+
+# Postgres: expression GIN indexes stay in sync without triggers
+_POSTGRES_SEARCH_DDL = [
+    """CREATE INDEX IF NOT EXISTS ix_goals_text_fts ON goals
+        USING GIN (to_tsvector('english', text))""",
+    """CREATE INDEX IF NOT EXISTS ix_tasks_text_fts ON tasks
+        USING GIN (to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, '')))""",
+]
+
+def create_search_index(connection: Connection) -> None:
+    """Create the full-text index for the connection's dialect, backfilling existing rows"""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        existed = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = 'goals_fts'")
+        ).first() is not None
+        for statement in _SQLITE_SEARCH_DDL:
+            connection.exec_driver_sql(statement)
+        if not existed:
+            connection.exec_driver_sql("INSERT INTO goals_fts(goals_fts) VALUES ('rebuild')")
+            connection.exec_driver_sql("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+    elif dialect == "postgresql":
+        for statement in _POSTGRES_SEARCH_DDL:
+            connection.exec_driver_sql(statement)
+
+def drop_search_index(connection: Connection) -> None:
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        for statement in _SQLITE_DROP_DDL:
+            connection.exec_driver_sql(statement)
+    elif dialect == "postgresql":
+        connection.exec_driver_sql("DROP INDEX IF EXISTS ix_tasks_text_fts, ix_goals_text_fts")
+
+@event.listens_for(Base.metadata, "after_create")
+def _after_create(target, connection, tables=None, **kw):
+    if {"goals", "tasks"} <= set(target.tables):
+        create_search_index(connection)
+
+@event.listens_for(Base.metadata, "before_drop")
+def _before_drop(target, connection, **kw):
+    drop_search_index(connection)
+
+def _fts5_query(query: str, user_id: UUID, columns: str) -> Optional[str]:
+    """Build a safe FTS5 expression: every word is quoted and prefix-matched"""
+    tokens = _QUERY_TOKEN_RE.findall(query)
+    if not tokens:
+        return None
+    terms = " ".join(f'"{token}"*' for token in tokens)
+    return f'user_id:"{user_id.hex}" AND {{{columns}}}:({terms})'
+
+def search(db: Session, user_id: UUID, query: str, skip: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+    """Ranked goal and task hits for one user (best first)"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        rows = _search_sqlite(db, user_id, query, skip, limit)
+    elif dialect == "postgresql":
+        rows = _search_postgres(db, user_id, query, skip, limit)
+    else:
+        rows = _search_like(db, user_id, query, skip, limit)
+
+    return [
+        {
+            "kind": row.kind,
+            "id": UUID(str(row.id)),
+            "goal_id": UUID(str(row.goal_id)),
+            "title": row.title,
+            "snippet": row.snippet,
+            "rank": float(row.rank),
+        }
+        for row in rows
+    ]
+
+def _search_sqlite(db: Session, user_id: UUID, query: str, skip: int, limit: int):
+    goal_match = _fts5_query(query, user_id, "text")
+    task_match = _fts5_query(query, user_id, "name description")
+    if goal_match is None:
+        return []
+    sql = text("""
+        SELECT kind, id, goal_id, title, snippet, rank FROM (
+            SELECT 'goal' AS kind, g.id AS id, g.id AS goal_id, g.text AS title,
+                   snippet(goals_fts, 0, '[', ']', '...', 12) AS snippet,
+                   bm25(goals_fts, 1.0, 0.0) AS rank
+            FROM goals_fts JOIN goals g ON g.rowid = goals_fts.rowid
+            WHERE goals_fts MATCH :goal_match
+            UNION ALL
+            SELECT 'task', t.id, t.goal_id, t.name,
+                   snippet(tasks_fts, -1, '[', ']', '...', 12),
+                   bm25(tasks_fts, 2.0, 1.0, 0.0)
+            FROM tasks_fts JOIN tasks t ON t.rowid = tasks_fts.rowid
+            WHERE tasks_fts MATCH :task_match
+        )
+        ORDER BY rank
+        LIMIT :limit OFFSET :skip
+    """)
+    return db.execute(sql, {
+        "goal_match": goal_match, "task_match": task_match, "limit": limit, "skip": skip
+    }).all()
+
+def _search_postgres(db: Session, user_id: UUID, query: str, skip: int, limit: int):
+    # Expressions match the GIN index definitions exactly so the planner can use them
+    sql = text("""
+        WITH q AS (SELECT websearch_to_tsquery('english', :query) AS query)
+        SELECT kind, id, goal_id, title, snippet, rank FROM (
+            SELECT 'goal' AS kind, g.id AS id, g.id AS goal_id, g.text AS title, NULL AS snippet,
+                   -ts_rank(to_tsvector('english', g.text), q.query) AS rank
+            FROM goals g, q
+            WHERE g.user_id = :user_id AND to_tsvector('english', g.text) @@ q.query
+            UNION ALL
+            SELECT 'task', t.id, t.goal_id, t.name, NULL,
+                   -ts_rank(to_tsvector('english', coalesce(t.name, '') || ' ' || coalesce(t.description, '')), q.query)
+            FROM tasks t JOIN goals g ON g.id = t.goal_id, q
+            WHERE g.user_id = :user_id
+              AND to_tsvector('english', coalesce(t.name, '') || ' ' || coalesce(t.description, '')) @@ q.query
+        ) hits
+        ORDER BY rank
+        LIMIT :limit OFFSET :skip
+    """)
+    return db.execute(sql, {"query": query, "user_id": user_id, "limit": limit, "skip": skip}).all()
+
+def _search_like(db: Session, user_id: UUID, query: str, skip: int, limit: int):
+    """Unindexed fallback for databases without a full-text engine"""
+    from app import models
+
+    pattern = f"%{query}%"
+    goals = db.query(models.Goal.id, models.Goal.text).filter(
+        models.Goal.user_id == user_id, models.Goal.text.ilike(pattern)
+    ).all()
+    tasks = db.query(models.Task.id, models.Task.goal_id, models.Task.name).join(models.Goal).filter(
+        models.Goal.user_id == user_id,
+        models.Task.name.ilike(pattern) | models.Task.description.ilike(pattern)
+    ).all()
+
+    rows = [_Hit("goal", g.id, g.id, g.text, None, 0.0) for g in goals]
+    rows += [_Hit("task", t.id, t.goal_id, t.name, None, 0.0) for t in tasks]
+    return rows[skip:skip + limit]
@@ -0,0 +1,78 @@
+from typing import Any, Dict, Optional
+import os
+
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
+
+from app.config import settings
+
+def worker_count() -> int:
+    """Configured worker count, or one per CPU (2-8) when the per-user state is shared
+
+    The read cache and read-your-writes stickiness only span workers with
+    CACHE_BACKEND=redis; with the memory backend the default is one worker
+    and asking for more is refused.
+    """
+    shared = settings.cache_backend == "redis"
+    if settings.web_workers > 1 and not shared:
+        raise RuntimeError("WEB_WORKERS > 1 needs CACHE_BACKEND=redis: the memory cache is per process")
+    if settings.web_workers > 0:
+        return settings.web_workers
+    return min(max(2, os.cpu_count() or 1), 8) if shared else 1
+
+class TunedUvicornWorker(UvicornWorker):
+    """Uvicorn worker pinned to uvloop and httptools (installed by uvicorn[standard])"""
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools"}
+
+def _post_fork(server, worker) -> None:
+    # With preload the engines were created in the master; never share its pooled connections
+    from app.database import shard_engines, replica_engine
+    for shard_engine in shard_engines:
+        shard_engine.dispose(close=False)
+    if replica_engine is not None:
+        replica_engine.dispose(close=False)
+
+def _when_ready(server) -> None:
+    workers = server.cfg.workers
+    server.log.info(
+        "Serving on %s:%s: %d workers (%s/%s), %d plan generations per worker (%d total), drain timeout %gs",
+        settings.web_host, settings.web_port, workers,
+        TunedUvicornWorker.CONFIG_KWARGS["loop"], TunedUvicornWorker.CONFIG_KWARGS["http"],
+        settings.llm_max_concurrency, workers * settings.llm_max_concurrency, settings.shutdown_drain_seconds
+    )
+
+def gunicorn_options() -> Dict[str, Any]:
+    return {
+        "bind": f"{settings.web_host}:{settings.web_port}",
+        "workers": worker_count(),
+        "worker_class": "app.server.TunedUvicornWorker",
+        "preload_app": True,
+        # Leave the lifespan shutdown time to drain plan jobs before the worker is killed
+        "graceful_timeout": int(settings.shutdown_drain_seconds) + 5,
+        "timeout": 60,
+        "keepalive": 5,
+        "loglevel": "debug" if settings.debug else "info",
+        "post_fork": _post_fork,
+        "when_ready": _when_ready,
+    }
+
+class ProductionServer(BaseApplication):
+    """Gunicorn master supervising uvicorn workers, restarting any that die"""
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None):
+        self.options = options or gunicorn_options()
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+        return app
+
+def run() -> None:
+    ProductionServer().run()
+
+if __name__ == "__main__":
+    run()
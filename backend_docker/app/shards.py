@@ -0,0 +1,198 @@
+from bisect import bisect
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+import hashlib
+import logging
+import threading
+import time
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+def _hash(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+class HashRing:
+    """Consistent hash of user ids onto shard indexes
+
+    Each shard owns ``vnodes`` points on the ring. Appending a shard only
+    takes over about 1/N of the users, so a rebalance moves that fraction
+    and nobody else. Shards must only ever be appended, never reordered.
+    """
+
+    def __init__(self, shard_count: int, vnodes: int = 64):
+        points = sorted(
+            (_hash(f"shard-{shard}-vnode-{vnode}".encode()), shard)
+            for shard in range(shard_count)
+            for vnode in range(vnodes)
+        )
+        self._keys = [key for key, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    def shard_for(self, user_id: UUID) -> int:
+        i = bisect(self._keys, _hash(user_id.bytes)) % len(self._keys)
+        return self._shards[i]
+
+class ShardRouter:
+    """Maps users to one of several databases
+
+    Shard 0 is ``DATABASE_URL`` and also holds ``user_directory``, the
+    email / user id -> shard lookup. New users are placed by the hash
+    ring; existing users stay where the directory says until a rebalance
+    moves them. Lookups are cached for ``cache_ttl`` seconds.
+    """
+
+    def __init__(self, engines: List[Engine], cache_ttl: float = 60.0):
+        self.engines = engines
+        self.ring = HashRing(len(engines))
+        self.cache_ttl = cache_ttl
+        self._by_user: Dict[UUID, Tuple[int, float]] = {}
+        self._by_email: Dict[str, Tuple[Optional[Tuple[UUID, int]], float]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def sharded(self) -> bool:
+        return len(self.engines) > 1
+
+    @property
+    def directory_engine(self) -> Engine:
+        return self.engines[0]
+
+    def place(self, user_id: UUID) -> int:
+        """Shard a new user belongs on"""
+        return self.ring.shard_for(user_id)
+
+    def _cached(self, cache: dict, key):
+        entry = cache.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry
+        return None
+
+    def shard_of_user(self, user_id: UUID) -> int:
+        entry = self._cached(self._by_user, user_id)
+        if entry is not None:
+            return entry[0]
+        from app.models import UserDirectory
+
+        with self.directory_engine.connect() as connection:
+            shard = connection.execute(
+                select(UserDirectory.shard).where(UserDirectory.user_id == user_id)
+            ).scalar()
+        if shard is None:
+            shard = self.place(user_id)
+        with self._lock:
+            self._by_user[user_id] = (shard, time.monotonic() + self.cache_ttl)
+        return shard
+
+    def lookup_email(self, email: str) -> Optional[Tuple[UUID, int]]:
+        """(user id, shard) registered for an email, or None"""
+        entry = self._cached(self._by_email, email)
+        if entry is not None:
+            return entry[0]
+        from app.models import UserDirectory
+
+        with self.directory_engine.connect() as connection:
+            row = connection.execute(
+                select(UserDirectory.user_id, UserDirectory.shard).where(UserDirectory.email == email)
+            ).first()
+        found = (row.user_id, row.shard) if row is not None else None
+        if found is not None:
+            # Unknown emails are not cached, so a fresh registration is visible at once
+            with self._lock:
+                self._by_email[email] = (found, time.monotonic() + self.cache_ttl)
+        return found
+
+    def forget(self, user_id: Optional[UUID] = None, email: Optional[str] = None) -> None:
+        with self._lock:
+            if user_id is not None:
+                self._by_user.pop(user_id, None)
+            if email is not None:
+                self._by_email.pop(email, None)
+
+def _user_rows(tables, user_id: UUID):
+    """(table, where clause) pairs selecting everything a user owns, parents first"""
+    (users, goals, tasks, dependencies, archived_goals, archived_tasks, archived_dependencies,
+     idempotency_keys, refresh_tokens) = tables
+    goal_ids = select(goals.c.id).where(goals.c.user_id == user_id)
+    task_ids = select(tasks.c.id).where(tasks.c.goal_id.in_(goal_ids))
+    archived_goal_ids = select(archived_goals.c.id).where(archived_goals.c.user_id == user_id)
+    archived_task_ids = select(archived_tasks.c.id).where(archived_tasks.c.goal_id.in_(archived_goal_ids))
+    return [
+        (users, users.c.id == user_id),
+        (goals, goals.c.user_id == user_id),
+        (tasks, tasks.c.goal_id.in_(goal_ids)),
+        (dependencies, dependencies.c.task_id.in_(task_ids)),
+        (archived_goals, archived_goals.c.user_id == user_id),
+        (archived_tasks, archived_tasks.c.goal_id.in_(archived_goal_ids)),
+        (archived_dependencies, archived_dependencies.c.task_id.in_(archived_task_ids)),
+        (idempotency_keys, idempotency_keys.c.user_id == user_id),
+        (refresh_tokens, refresh_tokens.c.user_id == user_id),
+    ]
+
+def move_user(router: ShardRouter, user_id: UUID, source: int, target: int) -> int:
+    """Copy a user's rows to the target shard, repoint the directory, then delete the source rows
+
+    Each step commits before the next starts, so the directory only ever
+    names a shard holding the user's committed rows. If repointing fails
+    the copy is removed again and the user stays on the source. Returns
+    the number of rows moved. Requests routed by a stale cache entry
+    during the move can still hit the source shard, so run rebalances in
+    a quiet period (or with a short cache TTL).
+    """
+    from app import models
+    from app.models import UserDirectory
+
+    tables = [model.__table__ for model in (
+        models.User, models.Goal, models.Task, models.TaskDependency,
+        models.ArchivedGoal, models.ArchivedTask, models.ArchivedTaskDependency,
+        models.IdempotencyKey, models.RefreshToken,
+    )]
+    selections = _user_rows(tables, user_id)
+    moved = 0
+    with router.engines[source].connect() as src, router.engines[target].begin() as dst:
+        for table, where in selections:
+            rows = [dict(row._mapping) for row in src.execute(select(table).where(where))]
+            if rows:
+                dst.execute(table.insert(), rows)
+                moved += len(rows)
+
+    try:
+        with router.directory_engine.begin() as directory:
+            directory.execute(
+                update(UserDirectory).where(UserDirectory.user_id == user_id).values(shard=target)
+            )
+    except Exception:
+        with router.engines[target].begin() as dst:
+            for table, where in reversed(selections):
+                dst.execute(delete(table).where(where))
+        raise
+    router.forget(user_id=user_id)
+
+    with router.engines[source].begin() as src:
+        for table, where in reversed(selections):
+            src.execute(delete(table).where(where))
+    return moved
+
+def rebalance(router: ShardRouter, dry_run: bool = False) -> List[Tuple[UUID, int, int]]:
+    """Move every user whose directory shard differs from its hash-ring shard
+
+    Returns the (user id, source, target) moves made (or planned, with dry_run).
+    """
+    from app.models import UserDirectory
+
+    with router.directory_engine.connect() as connection:
+        entries = connection.execute(select(UserDirectory.user_id, UserDirectory.shard)).all()
+
+    moves = [
+        (entry.user_id, entry.shard, router.place(entry.user_id))
+        for entry in entries
+        if entry.shard != router.place(entry.user_id)
+    ]
+    if dry_run:
+        return moves
+    for user_id, source, target in moves:
+        rows = move_user(router, user_id, source, target)
+        logger.info("Moved user %s from shard %s to shard %s (%d rows)", user_id, source, target, rows)
+    return moves
@@ -0,0 +1,155 @@
+from datetime import date
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.graph import topological_layers
+
+_EPS = 1e-9
+
+def critical_path_lengths(durations: np.ndarray, edges: np.ndarray, layers: np.ndarray) -> np.ndarray:
+    """Work on the longest chain starting at each task, the task itself included
+
+    ``edges`` is an ``(m, 2)`` array of ``(prerequisite, dependent)`` pairs
+    that all point to a later layer, so one pass from the last layer back
+    fills every chain, one vectorized step per layer.
+    """
+    tail = durations.astype(float)
+    if len(edges) == 0:
+        return tail
+    source_layers = layers[edges[:, 0]]
+    for layer in range(int(layers.max()) - 1, -1, -1):
+        in_layer = edges[source_layers == layer]
+        if len(in_layer) == 0:
+            continue
+        longest = np.zeros(len(tail))
+        np.maximum.at(longest, in_layer[:, 0], tail[in_layer[:, 1]])
+        members = layers == layer
+        tail[members] = durations[members] + longest[members]
+    return tail
+
+def level_schedule(
+    durations: np.ndarray,
+    edges: Sequence[Tuple[int, int]],
+    capacity: float,
+    horizon: int,
+    groups: np.ndarray,
+    n_groups: int,
+    started: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Resource-leveled list schedule of indexed tasks under a daily work capacity
+
+    A task needs ``durations[i]`` days of work and gets at most one day of
+    work per day, and only from the day after all its prerequisites
+    finished. Each day the capacity is handed out in priority order: longest
+    remaining chain first, then tasks already in progress, then index order.
+    Edges that close a cycle are ignored. Returns ``(first_day, last_day,
+    group_load)``: per task the day its work starts and ends (-1 when not
+    finished within ``horizon`` days), and per group the work done each day.
+    """
+    n = len(durations)
+    durations = np.maximum(np.asarray(durations, dtype=float), 0.0)
+    order, _, has_cycle = topological_layers(n, edges)
+    if has_cycle:
+        position = np.empty(n, dtype=np.int64)
+        position[order] = np.arange(n)
+        edges = [(a, b) for a, b in edges if position[a] < position[b]]
+    _, layers, _ = topological_layers(n, edges)
+    edges = np.array(edges, dtype=np.int64).reshape(-1, 2)
+    layers = np.asarray(layers, dtype=np.int64)
+
+    # Work in priority order, so a cumulative sum hands out the day's capacity
+    tail = critical_path_lengths(durations, edges, layers)
+    rank = np.lexsort((np.arange(n), ~np.asarray(started, dtype=bool), -tail))
+    slot = np.empty(n, dtype=np.int64)
+    slot[rank] = np.arange(n)
+    remaining = durations[rank]
+    task_groups = np.asarray(groups, dtype=np.int64)[rank]
+    sources, targets = slot[edges[:, 0]], slot[edges[:, 1]]
+    waiting = np.bincount(targets, minlength=n)
+
+    first = np.full(n, -1, dtype=np.int64)
+    last = np.full(n, -1, dtype=np.int64)
+    done = np.zeros(n, dtype=bool)
+    group_load = np.zeros((n_groups, horizon))
+    for day in range(horizon):
+        ready = (waiting == 0) & ~done
+        if not ready.any():
+            break
+        want = np.where(ready, np.minimum(1.0, remaining), 0.0)
+        before = np.cumsum(want) - want
+        give = np.clip(capacity - before, 0.0, want)
+        remaining -= give
+
+        first[(first < 0) & ((give > 0) | (ready & (remaining <= _EPS)))] = day
+        finished = ready & (remaining <= _EPS)
+        last[finished] = day
+        done |= finished
+        np.subtract.at(waiting, targets[finished[sources]], 1)
+        group_load[:, day] = np.bincount(task_groups, weights=give, minlength=n_groups)
+
+    return first[slot], last[slot], group_load
+
+def day_dates(start: date, n_days: int, workdays_only: bool = False) -> np.ndarray:
+    """Calendar date of each schedule day, skipping weekends when ``workdays_only``"""
+    offsets = np.arange(n_days)
+    if workdays_only:
+        return np.busday_offset(np.datetime64(start, "D"), offsets, roll="forward")
+    return np.datetime64(start, "D") + offsets
+
+def build_timeline(tasks: List[Any], edges: List[Any], start: date, capacity: float,
+                   horizon: int, workdays_only: bool = False) -> Dict[str, Any]:
+    """Schedule task rows (id, goal_id, goal_text, name, status, duration_days) across goals"""
+    index = {task.id: i for i, task in enumerate(tasks)}
+    goal_ids = list(dict.fromkeys(task.goal_id for task in tasks))
+    goal_index = {goal_id: i for i, goal_id in enumerate(goal_ids)}
+    first, last, group_load = level_schedule(
+        np.array([task.duration_days or 0 for task in tasks], dtype=float),
+        [
+            (index[edge.depends_on_task_id], index[edge.task_id])
+            for edge in edges
+            if edge.task_id in index and edge.depends_on_task_id in index
+        ],
+        capacity,
+        horizon,
+        np.array([goal_index[task.goal_id] for task in tasks], dtype=np.int64),
+        len(goal_ids),
+        np.array([task.status == "in_progress" for task in tasks], dtype=bool)
+    )
+
+    n_days = int(last.max()) + 1 if len(tasks) and last.max() >= 0 else 0
+    if (last < 0).any():
+        n_days = horizon  # some work runs past the horizon: report all of it
+    dates = day_dates(start, n_days, workdays_only)
+    group_load = np.round(group_load[:, :n_days], 3)
+
+    def to_date(days: np.ndarray) -> List[Any]:
+        # One vectorized lookup; -1 (not within the horizon) becomes None
+        found = dates[np.clip(days, 0, max(n_days - 1, 0))].astype(object) if n_days else [None] * len(days)
+        return [found[i] if days[i] >= 0 else None for i in range(len(days))]
+
+    starts, ends = to_date(first), to_date(last)
+    goal_text = {task.goal_id: task.goal_text for task in tasks}
+    return {
+        "start": start,
+        "capacity": capacity,
+        "days": dates.astype(object).tolist(),
+        "load": group_load.sum(axis=0).round(3).tolist(),
+        "end": ends[int(np.argmax(last))] if n_days and (last >= 0).all() else None,
+        "goals": [
+            {"goal_id": goal_id, "goal_text": goal_text[goal_id], "load": group_load[i].tolist()}
+            for i, goal_id in enumerate(goal_ids)
+        ],
+        "tasks": [
+            {
+                "id": task.id,
+                "goal_id": task.goal_id,
+                "name": task.name,
+                "status": task.status,
+                "duration_days": task.duration_days,
+                "start": starts[i],
+                "end": ends[i]
+            }
+            for i, task in enumerate(tasks)
+        ],
+    }
@@ -0,0 +1,105 @@
+from collections import OrderedDict, defaultdict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+import math
+import time
+
+class TokenUsageTracker:
+    """Prompt / completion token totals per model and per user
+
+    Only the ``max_users`` most recently active users are tracked, and
+    snapshots report the ``top_users`` heaviest of them.
+    """
+
+    def __init__(self, window_seconds: float = 60.0, max_users: int = 10000, top_users: int = 10):
+        self.window_seconds = window_seconds
+        self.max_users = max_users
+        self.top_users = top_users
+        self.by_model: Dict[str, Dict[str, int]] = defaultdict(self._empty)
+        self.by_user: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self._recent: Deque[Tuple[float, int]] = deque()
+
+    @staticmethod
+    def _empty() -> Dict[str, int]:
+        return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+    def record(self, model: str, user_id: Optional[Any], prompt_tokens: int, completion_tokens: int) -> None:
+        buckets = [self.by_model[model]]
+        if user_id is not None:
+            key = str(user_id)
+            if key not in self.by_user:
+                self.by_user[key] = self._empty()
+                while len(self.by_user) > self.max_users:
+                    self.by_user.popitem(last=False)
+            self.by_user.move_to_end(key)
+            buckets.append(self.by_user[key])
+        for bucket in buckets:
+            bucket["calls"] += 1
+            bucket["prompt_tokens"] += prompt_tokens
+            bucket["completion_tokens"] += completion_tokens
+            bucket["total_tokens"] += prompt_tokens + completion_tokens
+
+        now = time.monotonic()
+        self._recent.append((now, prompt_tokens + completion_tokens))
+        self._trim(now)
+
+    def _trim(self, now: float) -> None:
+        while self._recent and now - self._recent[0][0] > self.window_seconds:
+            self._recent.popleft()
+
+    def tokens_in_window(self) -> int:
+        """Tokens spent in the last window, to compare against the provider's per-minute quota"""
+        self._trim(time.monotonic())
+        return sum(tokens for _, tokens in self._recent)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "by_model": {model: dict(totals) for model, totals in self.by_model.items()},
+            "users_tracked": len(self.by_user),
+            "top_users": [
+                {"user_id": user, **totals}
+                for user, totals in sorted(
+                    self.by_user.items(), key=lambda item: item[1]["total_tokens"], reverse=True
+                )[:self.top_users]
+            ],
+            "tokens_last_minute": self.tokens_in_window(),
+        }
+
+class MaxTokensBudget:
+    """Adaptive max_tokens derived from the completion sizes of recent plans
+
+    Until enough plans have been observed the ceiling is used. After that the
+    budget is the high percentile of observed completions plus headroom, so
+    the provider reserves (and rate-limits on) far fewer tokens per call.
+    """
+
+    def __init__(self, ceiling: int, floor: int, headroom: float = 1.3,
+                 percentile: float = 0.95, min_samples: int = 5, window: int = 100):
+        self.ceiling = ceiling
+        self.floor = floor
+        self.headroom = headroom
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.samples: Deque[int] = deque(maxlen=window)
+        self.truncations = 0
+
+    def observe(self, completion_tokens: int, truncated: bool = False) -> None:
+        if truncated:
+            # A cut-off plan says nothing about its real size; assume it needed the ceiling
+            self.truncations += 1
+            completion_tokens = self.ceiling
+        self.samples.append(completion_tokens)
+
+    def next_max_tokens(self) -> int:
+        if len(self.samples) < self.min_samples:
+            return self.ceiling
+        ordered = sorted(self.samples)
+        idx = min(len(ordered) - 1, math.ceil(self.percentile * len(ordered)) - 1)
+        budget = int(ordered[idx] * self.headroom)
+        return max(self.floor, min(self.ceiling, budget))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "max_tokens": self.next_max_tokens(),
+            "samples": len(self.samples),
+            "truncations": self.truncations,
+        }
@@ -0,0 +1,230 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from uuid import UUID
+import json
+import uuid
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app import models
+
+EXPORT_FORMAT_VERSION = 1
+
+_GOAL_COLUMNS = ("id", "text", "status", "created_at")
+_TASK_COLUMNS = ("id", "goal_id", "name", "description", "status", "duration_days",
+                 "start_date", "end_date", "created_at")
+
+class ImportFormatError(ValueError):
+    """Raised for malformed lines in an import stream"""
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Not JSON serializable: {type(value)}")
+
+def _line(record: Dict[str, Any]) -> str:
+    return json.dumps(record, default=_json_default, separators=(",", ":")) + "\n"
+
+class _Peekable:
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self.head = next(self._rows, None)
+
+    def take_while(self, goal_id) -> Iterator:
+        while self.head is not None and self.head.goal_id == goal_id:
+            yield self.head
+            self.head = next(self._rows, None)
+
+def _tier_cursors(db: Session, user_id: UUID, goal_model, task_model, dependency_model, batch_size: int):
+    """Server-side cursors over one tier's goals, tasks and edges, each ordered by goal id"""
+    stream = {"yield_per": batch_size}
+    goals = db.execute(
+        select(*(getattr(goal_model, c) for c in _GOAL_COLUMNS))
+        .where(goal_model.user_id == user_id)
+        .order_by(goal_model.id)
+        .execution_options(**stream)
+    )
+    tasks = db.execute(
+        select(*(getattr(task_model, c) for c in _TASK_COLUMNS))
+        .join(goal_model, goal_model.id == task_model.goal_id)
+        .where(goal_model.user_id == user_id)
+        .order_by(task_model.goal_id, task_model.created_at)
+        .execution_options(**stream)
+    )
+    dependencies = db.execute(
+        select(
+            task_model.goal_id,
+            dependency_model.task_id,
+            dependency_model.depends_on_task_id
+        )
+        .join(task_model, task_model.id == dependency_model.task_id)
+        .join(goal_model, goal_model.id == task_model.goal_id)
+        .where(goal_model.user_id == user_id)
+        .order_by(task_model.goal_id)
+        .execution_options(**stream)
+    )
+    return goals, _Peekable(tasks), _Peekable(dependencies)
+
+_TIERS = (
+    (False, models.Goal, models.Task, models.TaskDependency),
+    (True, models.ArchivedGoal, models.ArchivedTask, models.ArchivedTaskDependency),
+)
+
+def export_user_data(db: Session, user_id: UUID, batch_size: int = 1000) -> Iterator[str]:
+    """Stream a user's goals, tasks and dependency edges as NDJSON
+
+    Three server-side cursors ordered by goal id are merged, so each goal is
+    followed by its tasks and then its edges while memory stays constant.
+    The hot tier is streamed first, then the cold tier with goals marked
+    ``"archived": true``.
+    """
+    buffer: List[str] = [_line({"type": "export", "version": EXPORT_FORMAT_VERSION})]
+    for archived, goal_model, task_model, dependency_model in _TIERS:
+        goals, tasks, dependencies = _tier_cursors(db, user_id, goal_model, task_model, dependency_model, batch_size)
+        for goal in goals:
+            record = {"type": "goal", **goal._asdict()}
+            if archived:
+                record["archived"] = True
+            buffer.append(_line(record))
+            for task in tasks.take_while(goal.id):
+                buffer.append(_line({"type": "task", **task._asdict()}))
+            for dep in dependencies.take_while(goal.id):
+                buffer.append(_line({
+                    "type": "dependency",
+                    "task_id": dep.task_id,
+                    "depends_on_task_id": dep.depends_on_task_id
+                }))
+            if len(buffer) >= batch_size:
+                yield "".join(buffer)
+                buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+class UserDataImporter:
+    """Bulk-insert an NDJSON export for a user, assigning fresh ids
+
+    Rows are buffered and written with executemany in chunks, parents
+    before children. Dependencies whose target task has not been seen yet
+    are held back until the end of the stream. Archived goals come back as
+    ordinary goals; the next compaction moves them to the cold tier again.
+    """
+
+    def __init__(self, db: Session, user_id: UUID, chunk_size: int = 1000):
+        self.db = db
+        self.user_id = user_id
+        self.chunk_size = chunk_size
+        self.goal_ids: Dict[str, UUID] = {}
+        self.task_ids: Dict[str, UUID] = {}
+        self._goals: List[dict] = []
+        self._tasks: List[dict] = []
+        self._dependencies: List[dict] = []
+        self._deferred: List[tuple] = []
+        self.counts = {"goals": 0, "tasks": 0, "dependencies": 0, "skipped_dependencies": 0}
+
+    def add_line(self, line: str, line_number: int) -> None:
+        line = line.strip()
+        if not line:
+            return
+        try:
+            record = json.loads(line)
+            kind = record["type"]
+            if kind == "export":
+                if record.get("version") != EXPORT_FORMAT_VERSION:
+                    raise ImportFormatError(f"Line {line_number}: unsupported export version")
+            elif kind == "goal":
+                self._add_goal(record)
+            elif kind == "task":
+                self._add_task(record)
+            elif kind == "dependency":
+                self._add_dependency(record["task_id"], record["depends_on_task_id"])
+            else:
+                raise ImportFormatError(f"Line {line_number}: unknown record type {kind!r}")
+        except ImportFormatError:
+            raise
+        except (ValueError, KeyError, TypeError) as e:
+            raise ImportFormatError(f"Line {line_number}: {e}")
+
+        if len(self._goals) + len(self._tasks) + len(self._dependencies) >= self.chunk_size:
+            self.flush()
+
+    def _add_goal(self, record: dict) -> None:
+        new_id = uuid.uuid4()
+        self.goal_ids[record["id"]] = new_id
+        self._goals.append({
+            "id": new_id,
+            "user_id": self.user_id,
+            "text": record["text"],
+            "status": record.get("status") or "active",
+            "created_at": _parse_datetime(record.get("created_at")),
+        })
+
+    def _add_task(self, record: dict) -> None:
+        goal_id = self.goal_ids.get(record["goal_id"])
+        if goal_id is None:
+            raise ImportFormatError(f"Task {record['id']} references a goal not in the stream")
+        new_id = uuid.uuid4()
+        self.task_ids[record["id"]] = new_id
+        self._tasks.append({
+            "id": new_id,
+            "goal_id": goal_id,
+            "name": record["name"],
+            "description": record.get("description"),
+            "status": record.get("status") or "pending",
+            "duration_days": record.get("duration_days") or 1,
+            "start_date": _parse_datetime(record.get("start_date")),
+            "end_date": _parse_datetime(record.get("end_date")),
+            "created_at": _parse_datetime(record.get("created_at")),
+        })
+
+    def _add_dependency(self, task_id: str, depends_on_task_id: str) -> None:
+        if task_id in self.task_ids and depends_on_task_id in self.task_ids:
+            self._dependencies.append({
+                "id": uuid.uuid4(),
+                "task_id": self.task_ids[task_id],
+                "depends_on_task_id": self.task_ids[depends_on_task_id],
+            })
+        else:
+            self._deferred.append((task_id, depends_on_task_id))
+
+    def flush(self) -> None:
+        for model, rows, key in (
+            (models.Goal, self._goals, "goals"),
+            (models.Task, self._tasks, "tasks"),
+            (models.TaskDependency, self._dependencies, "dependencies"),
+        ):
+            if rows:
+                if model is not models.TaskDependency:
+                    # Let the server default fill created_at when the export had none
+                    for row in rows:
+                        if row["created_at"] is None:
+                            del row["created_at"]
+                self.db.execute(insert(model), rows)
+                self.counts[key] += len(rows)
+                rows.clear()
+
+    def finish(self) -> Dict[str, int]:
+        deferred, self._deferred = self._deferred, []
+        for task_id, depends_on_task_id in deferred:
+            if task_id in self.task_ids and depends_on_task_id in self.task_ids:
+                self._add_dependency(task_id, depends_on_task_id)
+            else:
+                self.counts["skipped_dependencies"] += 1
+        self.flush()
+        return self.counts
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into text lines without reading it all into memory"""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8")
+    if pending:
+        yield pending.decode("utf-8")
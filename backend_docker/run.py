@@ -17,10 +17,18 @@ def main():
     try:
         from app.config import settings
 
+        # Production: gunicorn-supervised uvicorn workers; otherwise one (optionally reloading) process
+        production = "--production" in sys.argv or settings.environment == "production"
+
         print("🚀 Starting Smart Task Planner API...")
         print("⚡ Powered by Groq's Ultra-Fast LLMs")
         print(f"📍 Environment: {settings.environment}")
         print(f"🔧 Debug mode: {settings.debug}")
+        if production:
+            from app.server import worker_count
+            workers = worker_count()
+            print(f"🏭 Production mode: {workers} workers (uvloop + httptools), "
+                  f"{settings.llm_max_concurrency} plan generations each")
         print(f"🧠 AI Model: Llama 3 70B (via Groq)")
         print()
         print("📚 API Documentation: http://localhost:8000/docs")
@@ -41,13 +49,17 @@ def main():
         print("Press Ctrl+C to stop the server")
         print("-" * 60)
 
-        uvicorn.run(
-            "app.main:app",
-            host="0.0.0.0",
-            port=8000,
-            reload=settings.debug,
-            log_level="info" if not settings.debug else "debug"
-        )
+        if production:
+            from app.server import run
+            run()
+        else:
+            uvicorn.run(
+                "app.main:app",
+                host=settings.web_host,
+                port=settings.web_port,
+                reload=settings.debug,
+                log_level="info" if not settings.debug else "debug"
+            )
     except KeyboardInterrupt:
         print("\n👋 Shutting down gracefully...")
     except ImportError as e:
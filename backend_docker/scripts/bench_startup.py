@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: import time, startup (lifespan) time and first-request latency
+
+Each run is a fresh interpreter against a throwaway SQLite database that is
+migrated once up front, so startup measures the production path (revision
+check only).
+
+    python scripts/bench_startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+
+_CHILD = r"""
+import json, time, uuid
+from fastapi.testclient import TestClient  # test harness only, kept out of the timings
+t0 = time.perf_counter()
+from app.main import app
+t1 = time.perf_counter()
+with TestClient(app) as client:
+    t2 = time.perf_counter()
+    client.get("/health")
+    t3 = time.perf_counter()
+    client.post("/api/v1/auth/register", json={"email": f"{uuid.uuid4().hex}@example.com", "name": "Bench", "password": "benchpass123"})
+    t4 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "startup_ms": (t2 - t1) * 1000,
+    "first_request_ms": (t3 - t2) * 1000,
+    "first_register_ms": (t4 - t3) * 1000,
+}))
+"""
+
+def run_once(env: dict) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD], cwd=project_root, env=env,
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            PYTHONPATH=str(project_root),
+            DATABASE_URL=f"sqlite:///{tmp}/bench.db",
+            PLAN_INDEX_PATH="",
+            DB_MIGRATE_ON_STARTUP="false",
+        )
+        subprocess.run(
+            [sys.executable, "-m", "alembic", "upgrade", "head"],
+            cwd=project_root, env=env, capture_output=True, check=True
+        )
+
+        results = [run_once(env) for _ in range(args.runs)]
+
+    print(f"{'metric':<20}{'median ms':>12}{'max ms':>12}")
+    for metric in results[0]:
+        values = [r[metric] for r in results]
+        print(f"{metric:<20}{statistics.median(values):>12.1f}{max(values):>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Move users onto the shard the hash ring assigns them
+
+Run after appending a URL to DATABASE_SHARD_URLS (and `alembic upgrade head`,
+which migrates every shard). Only users whose directory entry disagrees
+with the ring are copied, roughly 1/N of them for a newly added shard.
+
+    python scripts/rebalance_shards.py --dry-run
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import shard_router
+from app.shards import rebalance
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dry-run", action="store_true", help="list the moves without copying anything")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    moves = rebalance(shard_router, dry_run=args.dry_run)
+    for user_id, source, target in moves:
+        print(f"{user_id}: shard {source} -> {target}")
+    print(f"{len(moves)} users {'to move' if args.dry_run else 'moved'} across {len(shard_router.engines)} shards")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import os
+import pytest
+from contextlib import contextmanager
+
+# Keep the plan similarity index in memory during tests
+os.environ["PLAN_INDEX_PATH"] = ""
+# The app's own database is brought to the migrations head when a TestClient starts
+os.environ["DB_MIGRATE_ON_STARTUP"] = "true"
+os.environ["METRICS_TOKEN"] = "test-metrics-token"
+
+from app.query_monitor import track_queries
+
+@pytest.fixture
+def query_budget():
+    """Fail the test if a block issues more SQL statements than it declares
+
+    Usage:
+        with query_budget(3):
+            client.get(...)
+    """
+    @contextmanager
+    def _budget(max_queries: int, max_repeats: int = None):
+        with track_queries() as stats:
+            yield stats
+        if stats.count > max_queries:
+            shapes = "\n".join(f"  {n}x {shape}" for shape, n in stats.shapes.most_common())
+            pytest.fail(f"Query budget exceeded: {stats.count} > {max_queries}\n{shapes}")
+        if max_repeats is not None:
+            repeated = stats.repeated_shapes(max_repeats)
+            if repeated:
+                shape, n = repeated[0]
+                pytest.fail(f"Statement repeated {n}x (limit {max_repeats}): {shape}")
+
+    return _budget
+
+@pytest.fixture
+def no_generation(monkeypatch):
+    """Create goals without starting background plan generation"""
+    async def _noop_generate(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr("app.routers.goals.generate_tasks_for_goal", _noop_generate)
+
+@pytest.fixture
+def auth_tokens(client):
+    """Register (if needed) and log in a user; returns the login response body
+
+    Usage:
+        tokens = auth_tokens("someone@example.com")
+    """
+    def _login(email: str, password: str = "testpass123") -> dict:
+        client.post("/api/v1/auth/register", json={"email": email, "name": "Test User", "password": password})
+        return client.post("/api/v1/auth/login", data={"username": email, "password": password}).json()
+
+    return _login
+
+@pytest.fixture
+def auth_headers(auth_tokens):
+    """Authorization headers for a freshly logged-in user
+
+    Usage:
+        headers = auth_headers("someone@example.com")
+    """
+    def _headers(email: str) -> dict:
+        return {"Authorization": f"Bearer {auth_tokens(email)['access_token']}"}
+
+    return _headers
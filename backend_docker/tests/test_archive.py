@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+import json
+
+from app import archive, models
+from tests.test_main import client, TestingSessionLocal
+
+def test_compaction_moves_goals_to_cold_tier(client, no_generation, auth_headers):
+    headers = auth_headers("archive@example.com")
+
+    def goal(text):
+        return client.post("/api/v1/goals/", json={"text": text}, headers=headers).json()["data"]["goal_id"]
+
+    active, shelved, finished, recent = goal("Active goal"), goal("Shelved goal"), goal("Old finished goal"), goal("Recently finished goal")
+    first = client.post(f"/api/v1/tasks/?goal_id={shelved}", json={"name": "Sketch glacier"}, headers=headers).json()["id"]
+    second = client.post(f"/api/v1/tasks/?goal_id={shelved}", json={"name": "Paint glacier"}, headers=headers).json()["id"]
+    client.post(f"/api/v1/tasks/{second}/dependencies", params={"depends_on_task_id": first}, headers=headers)
+    client.patch(f"/api/v1/tasks/{first}", json={"status": "completed"}, headers=headers)
+
+    client.put(f"/api/v1/goals/{shelved}", json={"status": "archived"}, headers=headers)
+    client.put(f"/api/v1/goals/{recent}", json={"status": "completed"}, headers=headers)
+    client.put(f"/api/v1/goals/{finished}", json={"status": "completed"}, headers=headers)
+    db = TestingSessionLocal()
+    try:
+        db.get(models.Goal, UUID(finished)).updated_at = datetime.now(timezone.utc) - timedelta(days=60)
+        db.commit()
+
+        moved = archive.compact(db, datetime.now(timezone.utc) - timedelta(days=30))
+        assert moved == {"goals": 2, "tasks": 2, "dependencies": 1}
+        assert db.query(models.Task).filter(models.Task.goal_id == UUID(shelved)).count() == 0
+        assert db.query(models.TaskDependency).filter(models.TaskDependency.task_id == UUID(second)).count() == 0
+        assert archive.compact(db, datetime.now(timezone.utc)) == {"goals": 1, "tasks": 0, "dependencies": 0}
+    finally:
+        db.close()
+
+    hot = client.get("/api/v1/goals/", headers=headers).json()
+    assert sorted(g["text"] for g in hot) == ["Active goal"]
+    assert client.get(f"/api/v1/goals/{shelved}", headers=headers).status_code == 404
+    assert client.get("/api/v1/search", params={"q": "glacier"}, headers=headers).json()["hits"] == []
+
+    everything = client.get("/api/v1/goals/", params={"include": "archived"}, headers=headers).json()
+    assert everything[0]["text"] == "Active goal" and not everything[0]["archived"]
+    cold = {g["text"]: g for g in everything[1:]}
+    assert set(cold) == {"Shelved goal", "Old finished goal", "Recently finished goal"}
+    assert all(g["archived"] for g in cold.values())
+    assert (cold["Shelved goal"]["task_count"], cold["Shelved goal"]["completed_tasks"]) == (2, 1)
+
+    other = auth_headers("archive-other@example.com")
+    assert client.get("/api/v1/goals/", params={"include": "archived"}, headers=other).json() == []
+
+    # Cold goals stay readable, by their owner only
+    detail = client.get(f"/api/v1/goals/archived/{shelved}", headers=headers).json()
+    assert (detail["text"], detail["status"], detail["task_count"]) == ("Shelved goal", "archived", 2)
+    tasks = {t["name"]: t for t in detail["tasks"]}
+    assert [d["depends_on_task_id"] for d in tasks["Paint glacier"]["dependencies"]] == [first]
+    assert client.get(f"/api/v1/goals/archived/{shelved}", headers=other).status_code == 404
+    assert client.get(f"/api/v1/goals/archived/{active}", headers=headers).status_code == 404
+
+    # ...and are part of the export, after the active ones
+    records = [json.loads(line) for line in client.get("/api/v1/export", headers=headers).text.splitlines()]
+    goals = [r for r in records if r["type"] == "goal"]
+    assert [(g["text"], g.get("archived", False)) for g in goals][0] == ("Active goal", False)
+    assert {g["text"] for g in goals if g.get("archived")} == {"Shelved goal", "Old finished goal", "Recently finished goal"}
+    assert [r["type"] for r in records].count("task") == 2
+    assert [r["type"] for r in records].count("dependency") == 1
+
+def test_compaction_skips_goals_being_generated(client, no_generation, auth_headers):
+    from app import crud
+    headers = auth_headers("archive-busy@example.com")
+    goal_id = client.post("/api/v1/goals/", json={"text": "Busy goal"}, headers=headers).json()["data"]["goal_id"]
+    client.put(f"/api/v1/goals/{goal_id}", json={"status": "archived"}, headers=headers)
+    assert client.post(f"/api/v1/goals/{goal_id}/regenerate-tasks", headers=headers).status_code == 200
+
+    db = TestingSessionLocal()
+    try:
+        for plan_status in ("pending", "processing"):
+            crud.set_plan_status(db, UUID(goal_id), plan_status)
+            assert archive.compact(db, datetime.now(timezone.utc))["goals"] == 0
+        crud.set_plan_status(db, UUID(goal_id), "completed")
+        assert archive.compact(db, datetime.now(timezone.utc))["goals"] == 1
+    finally:
+        db.close()
+
+def test_only_one_process_compacts_a_database(tmp_path):
+    from app.database import _create_engine
+    engine = _create_engine(f"sqlite:///{tmp_path / 'shared.db'}")
+    try:
+        with archive.compaction_lock(engine) as first:
+            with archive.compaction_lock(engine) as second:
+                assert (first, second) == (True, False)
+        with archive.compaction_lock(engine) as again:
+            assert again
+    finally:
+        engine.dispose()
@@ -0,0 +1,57 @@
+from app.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def _breaker(clock):
+    return CircuitBreaker(failure_threshold=3, reset_seconds=30.0, slow_call_seconds=5.0, clock=clock)
+
+def test_opens_after_consecutive_failures_and_probes_once():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_success(0.5)  # a success resets the streak
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    clock.now = 31.0
+    assert breaker.allow()  # the probe
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    clock.now = 62.0
+    assert breaker.allow()
+    breaker.record_success(0.5)
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["times_opened"] == 2
+
+def test_slow_successes_count_as_failures():
+    breaker = _breaker(FakeClock())
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_success(8.0)
+    assert breaker.state == OPEN
+    assert breaker.snapshot()["slow_calls"] == 3
+
+def test_abandoned_probe_frees_the_slot():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for _ in range(3):
+        breaker.allow()
+        breaker.record_failure()
+    clock.now = 31.0
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
@@ -0,0 +1,39 @@
+from tests.test_main import client
+
+def test_dashboard_aggregates_and_caches(client, query_budget, no_generation, auth_headers):
+    headers = auth_headers("dash@example.com")
+    goal_id = client.post("/api/v1/goals/", json={"text": "Write a novel"}, headers=headers).json()["data"]["goal_id"]
+    outline = client.post(f"/api/v1/tasks/?goal_id={goal_id}", json={"name": "Outline"}, headers=headers).json()
+    draft = client.post(f"/api/v1/tasks/?goal_id={goal_id}", json={"name": "Draft"}, headers=headers).json()
+    client.post(f"/api/v1/tasks/{draft['id']}/dependencies", params={"depends_on_task_id": outline["id"]}, headers=headers)
+
+    with query_budget(6):
+        dashboard = client.get("/api/v1/dashboard", headers=headers).json()
+    assert dashboard["stats"]["total_goals"] == 1
+    assert dashboard["stats"]["tasks_by_status"] == {"pending": 2}
+    assert [t["name"] for t in dashboard["next_tasks"]] == ["Outline"]
+    assert dashboard["in_progress_tasks"] == []
+
+    # Served from cache: only the auth lookup hits the database
+    with query_budget(1):
+        client.get("/api/v1/dashboard", headers=headers)
+
+    # A write invalidates the cached view
+    client.patch(f"/api/v1/tasks/{outline['id']}", json={"status": "completed"}, headers=headers)
+    dashboard = client.get("/api/v1/dashboard", headers=headers).json()
+    assert dashboard["stats"]["tasks_by_status"] == {"pending": 1, "completed": 1}
+    assert [t["name"] for t in dashboard["next_tasks"]] == ["Draft"]
+
+    client.patch(f"/api/v1/tasks/{draft['id']}", json={"status": "in_progress"}, headers=headers)
+    dashboard = client.get("/api/v1/dashboard", headers=headers).json()
+    assert [t["name"] for t in dashboard["in_progress_tasks"]] == ["Draft"]
+    assert dashboard["next_tasks"] == []
+
+def test_dashboard_stats_count_goals_beyond_the_cards(client, monkeypatch, no_generation, auth_headers):
+    monkeypatch.setattr("app.routers.dashboard.GOAL_CARD_LIMIT", 2)
+    headers = auth_headers("many-goals@example.com")
+    for text in ("One", "Two", "Three"):
+        client.post("/api/v1/goals/", json={"text": text}, headers=headers)
+    dashboard = client.get("/api/v1/dashboard", headers=headers).json()
+    assert len(dashboard["goals"]) == 2
+    assert (dashboard["stats"]["total_goals"], dashboard["stats"]["active_goals"]) == (3, 3)
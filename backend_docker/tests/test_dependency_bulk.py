@@ -0,0 +1,80 @@
+from uuid import UUID
+
+from app import crud
+from tests.test_main import client, TestingSessionLocal
+
+def _goal_with_tasks(client, headers, names):
+    goal_id = client.post("/api/v1/goals/", json={"text": "Ship a release"}, headers=headers).json()["data"]["goal_id"]
+    ids = {name: client.post(f"/api/v1/tasks/?goal_id={goal_id}", json={"name": name}, headers=headers).json()["id"]
+           for name in names}
+    return goal_id, ids
+
+def _edges(client, headers, goal_id):
+    graph = client.get(f"/api/v1/goals/{goal_id}/graph", headers=headers).json()
+    names = [t["name"] for t in graph["tasks"]]
+    return sorted((names[a], names[b]) for a, b in graph["edges"])
+
+def test_bulk_dependencies_reduce_and_reject_cycles(client, query_budget, no_generation, auth_headers):
+    headers = auth_headers("bulk@example.com")
+    goal_id, ids = _goal_with_tasks(client, headers, ["Code", "Test", "Release"])
+    url = f"/api/v1/goals/{goal_id}/dependencies/bulk"
+
+    edges = [
+        {"task_id": ids["Test"], "depends_on_task_id": ids["Code"]},
+        {"task_id": ids["Release"], "depends_on_task_id": ids["Test"]},
+        {"task_id": ids["Release"], "depends_on_task_id": ids["Code"]},  # implied by Code -> Test -> Release
+    ]
+    with query_budget(7):
+        result = client.post(url, json={"edges": edges}, headers=headers).json()
+    assert result == {"added": 2, "removed": 0, "redundant": 1, "edges": 2}
+    assert _edges(client, headers, goal_id) == [("Code", "Test"), ("Test", "Release")]
+
+    cycle = [{"task_id": ids["Code"], "depends_on_task_id": ids["Release"]}]
+    response = client.post(url, json={"edges": cycle}, headers=headers)
+    assert response.status_code == 400
+    assert _edges(client, headers, goal_id) == [("Code", "Test"), ("Test", "Release")]
+
+    # Replace: only the listed edges remain
+    result = client.post(url, json={"edges": edges[2:], "replace": True}, headers=headers).json()
+    assert result == {"added": 1, "removed": 2, "redundant": 0, "edges": 1}
+    assert _edges(client, headers, goal_id) == [("Code", "Release")]
+
+def test_bulk_dependencies_only_accept_tasks_of_the_goal(client, no_generation, auth_headers):
+    headers = auth_headers("bulk-scope@example.com")
+    goal_id, ids = _goal_with_tasks(client, headers, ["A", "B"])
+    _, other_ids = _goal_with_tasks(client, headers, ["C"])
+
+    url = f"/api/v1/goals/{goal_id}/dependencies/bulk"
+    foreign = [{"task_id": ids["A"], "depends_on_task_id": other_ids["C"]}]
+    assert client.post(url, json={"edges": foreign}, headers=headers).status_code == 404
+    itself = [{"task_id": ids["A"], "depends_on_task_id": ids["A"]}]
+    assert client.post(url, json={"edges": itself}, headers=headers).status_code == 400
+
+def test_generated_plans_store_reduced_dependencies(client, no_generation, auth_headers):
+    headers = auth_headers("bulk-llm@example.com")
+    goal_id = client.post("/api/v1/goals/", json={"text": "Bake bread"}, headers=headers).json()["data"]["goal_id"]
+
+    db = TestingSessionLocal()
+    try:
+        crud.create_tasks_bulk(db, [
+            {"name": "Mix", "depends_on": []},
+            {"name": "Proof", "depends_on": ["Mix"]},
+            {"name": "Bake", "depends_on": ["Proof", "Mix"]},
+        ], UUID(goal_id))
+    finally:
+        db.close()
+    assert _edges(client, headers, goal_id) == [("Mix", "Proof"), ("Proof", "Bake")]
+
+def test_bulk_dependencies_see_cycles_through_other_goals(client, no_generation, auth_headers):
+    headers = auth_headers("bulk-cross@example.com")
+    goal_id, ids = _goal_with_tasks(client, headers, ["Draft", "Review"])
+    _, other_ids = _goal_with_tasks(client, headers, ["Approve"])
+    # Draft -> Review -> Approve (other goal) -> Draft, closed by the bulk edge below
+    for task, prerequisite in ((other_ids["Approve"], ids["Review"]), (ids["Draft"], other_ids["Approve"])):
+        added = client.post(f"/api/v1/tasks/{task}/dependencies?depends_on_task_id={prerequisite}", headers=headers)
+        assert added.status_code == 200
+
+    url = f"/api/v1/goals/{goal_id}/dependencies/bulk"
+    closing = [{"task_id": ids["Review"], "depends_on_task_id": ids["Draft"]}]
+    assert client.post(url, json={"edges": closing}, headers=headers).status_code == 400
+    assert _edges(client, headers, goal_id) == []
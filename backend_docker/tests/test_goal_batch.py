@@ -0,0 +1,71 @@
+import json
+import uuid
+
+from app import database, models
+from app.llm_service import llm_service
+from tests.test_main import client, get_auth_headers, TestingSessionLocal
+
+PLAN = {"tasks": [
+    {"name": "Plan", "description": "", "duration_days": 1, "depends_on": []},
+    {"name": "Execute", "description": "", "duration_days": 3, "depends_on": ["Plan"]},
+]}
+
+async def fake_call(prompt, max_tokens, user_id=None):
+    return json.dumps(PLAN), "stop"
+
+def test_batch_create_generates_plans(client, monkeypatch):
+    monkeypatch.setattr(llm_service, "_call_groq_api", fake_call)
+    monkeypatch.setattr(database, "SessionLocal", TestingSessionLocal)
+    headers = get_auth_headers(client)
+
+    goals = [{"text": f"Batch goal {i}"} for i in range(5)]
+    response = client.post("/api/v1/goals/batch", json={"goals": goals}, headers=headers)
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert len(data["goals"]) == 5
+
+    response = client.get(f"/api/v1/goals/batch/{data['batch_id']}", headers=headers)
+    assert response.status_code == 200
+    status = response.json()
+    assert status["done"] is True
+    assert {g["status"] for g in status["goals"]} == {"completed"}
+
+    goal = client.get(f"/api/v1/goals/{data['goals'][0]['goal_id']}", headers=headers).json()
+    assert [t["name"] for t in goal["tasks"]] == ["Plan", "Execute"]
+
+def test_batch_status_is_read_from_the_database(client, monkeypatch):
+    async def no_fallback(goal_text, user_id=None):
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(llm_service, "generate_task_plan", no_fallback)
+    monkeypatch.setattr(database, "SessionLocal", TestingSessionLocal)
+    headers = get_auth_headers(client)
+    data = client.post("/api/v1/goals/batch", json={"goals": [{"text": "Doomed"}]}, headers=headers).json()["data"]
+
+    # Nothing is held in the worker: a status written by any process is visible
+    db = TestingSessionLocal()
+    try:
+        goal = db.query(models.Goal).filter(models.Goal.id == uuid.UUID(data["goals"][0]["goal_id"])).one()
+        assert str(goal.batch_id) == data["batch_id"] and goal.plan_status == "failed"
+    finally:
+        db.close()
+    status = client.get(f"/api/v1/goals/batch/{data['batch_id']}", headers=headers).json()
+    assert status["done"] is True
+    assert status["goals"][0]["status"] == "failed"
+
+def test_batch_status_hidden_from_other_users(client, monkeypatch):
+    monkeypatch.setattr(llm_service, "_call_groq_api", fake_call)
+    monkeypatch.setattr(database, "SessionLocal", TestingSessionLocal)
+    headers = get_auth_headers(client)
+    response = client.post("/api/v1/goals/batch", json={"goals": [{"text": "Mine"}]}, headers=headers)
+    batch_id = response.json()["data"]["batch_id"]
+
+    client.post("/api/v1/auth/register", json={"email": "other@example.com", "name": "Other", "password": "otherpass123"})
+    token = client.post("/api/v1/auth/login", data={"username": "other@example.com", "password": "otherpass123"}).json()["access_token"]
+    response = client.get(f"/api/v1/goals/batch/{batch_id}", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 404
+
+def test_batch_rejects_empty(client):
+    headers = get_auth_headers(client)
+    response = client.post("/api/v1/goals/batch", json={"goals": []}, headers=headers)
+    assert response.status_code == 422
@@ -0,0 +1,51 @@
+from app.graph import topological_layers, transitive_reduction
+from tests.test_main import client
+
+def test_topological_layers_diamond():
+    # 0 -> 1, 0 -> 2, 1 -> 3, 2 -> 3, plus a shortcut 0 -> 3
+    order, layers, has_cycle = topological_layers(4, [(0, 1), (0, 2), (1, 3), (2, 3), (0, 3)])
+    assert order == [0, 1, 2, 3]
+    assert layers == [0, 1, 1, 2]
+    assert not has_cycle
+
+def test_topological_layers_reports_cycles():
+    order, layers, has_cycle = topological_layers(3, [(1, 2), (2, 1)])
+    assert has_cycle
+    assert order == [0, 1, 2]
+    assert layers == [0, 1, 1]
+
+def test_goal_graph_endpoint(client, query_budget, no_generation, auth_headers):
+    headers = auth_headers("graph@example.com")
+    goal_id = client.post("/api/v1/goals/", json={"text": "Open a cafe"}, headers=headers).json()["data"]["goal_id"]
+    ids = {}
+    for name in ("Lease", "Permits", "Fit out", "Open"):
+        ids[name] = client.post(f"/api/v1/tasks/?goal_id={goal_id}", json={"name": name}, headers=headers).json()["id"]
+    for task, prerequisite in (("Fit out", "Lease"), ("Fit out", "Permits"), ("Open", "Fit out")):
+        client.post(f"/api/v1/tasks/{ids[task]}/dependencies", params={"depends_on_task_id": ids[prerequisite]}, headers=headers)
+
+    with query_budget(4):
+        graph = client.get(f"/api/v1/goals/{goal_id}/graph", headers=headers).json()
+
+    names = [t["name"] for t in graph["tasks"]]
+    position = {name: i for i, name in enumerate(names)}
+    assert sorted(names) == ["Fit out", "Lease", "Open", "Permits"]
+    assert sorted(map(tuple, graph["edges"])) == sorted([
+        (position["Lease"], position["Fit out"]),
+        (position["Permits"], position["Fit out"]),
+        (position["Fit out"], position["Open"]),
+    ])
+    layer = {name: graph["layers"][i] for name, i in position.items()}
+    assert layer == {"Lease": 0, "Permits": 0, "Fit out": 1, "Open": 2}
+    ordered = [names[i] for i in graph["order"]]
+    assert ordered.index("Fit out") > max(ordered.index("Lease"), ordered.index("Permits"))
+    assert ordered[-1] == "Open"
+    assert graph["has_cycle"] is False
+
+    other = auth_headers("graph-other@example.com")
+    assert client.get(f"/api/v1/goals/{goal_id}/graph", headers=other).status_code == 404
+
+def test_transitive_reduction_drops_implied_edges():
+    edges = [(0, 1), (1, 2), (0, 2), (2, 3), (0, 3), (0, 1)]
+    assert transitive_reduction(4, edges) == [(0, 1), (1, 2), (2, 3)]
+    # Parallel branches are both kept
+    assert transitive_reduction(4, [(0, 1), (0, 2), (1, 3), (2, 3)]) == [(0, 1), (0, 2), (1, 3), (2, 3)]
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.config import settings
+from app.http_pool import PoolStats, create_llm_http_client
+from app.llm_service import LLMService
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def test_pooled_client_reuses_connections(local_server):
+    stats = PoolStats()
+
+    async def main():
+        client = create_llm_http_client(stats)
+        try:
+            for _ in range(3):
+                response = await client.get(local_server)
+                assert response.text == "ok"
+        finally:
+            await client.aclose()
+
+    asyncio.run(main())
+    snapshot = stats.snapshot()
+    assert snapshot["requests"] == 3
+    assert snapshot["connections_opened"] == 1
+    assert snapshot["reused_connections"] == 2
+
+def test_llm_client_uses_shared_pool_and_closes():
+    service = LLMService()
+    assert service.get_pool_stats() == {}
+
+    client = service.client
+    assert client is service.client  # built once
+    assert client._client is service._http_client
+    assert client.timeout.connect == settings.llm_connect_timeout
+    assert client.timeout.read == settings.llm_read_timeout
+
+    http_client = service._http_client
+    asyncio.run(service.aclose())
+    assert http_client.is_closed
+    assert service._client is None
@@ -0,0 +1,96 @@
+import asyncio
+import uuid
+
+from app import models
+from app.idempotency import idempotent, request_fingerprint
+from tests.test_main import client, TestingSessionLocal
+
+def _count_generations(monkeypatch):
+    calls = []
+
+    async def counting_generate(goal_id, goal_text, user_id=None, reuse=True):
+        calls.append(goal_id)
+
+    monkeypatch.setattr("app.routers.goals.generate_tasks_for_goal", counting_generate)
+    return calls
+
+def test_retried_goal_creation_is_replayed(client, monkeypatch, auth_headers):
+    calls = _count_generations(monkeypatch)
+    headers = auth_headers("retry@example.com")
+    keyed = {**headers, "Idempotency-Key": "create-1"}
+
+    first = client.post("/api/v1/goals/", json={"text": "Learn Rust"}, headers=keyed)
+    again = client.post("/api/v1/goals/", json={"text": "Learn Rust"}, headers=keyed)
+    assert first.status_code == again.status_code == 200
+    assert again.json() == first.json()
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert len(calls) == 1
+    assert [g["text"] for g in client.get("/api/v1/goals/", headers=headers).json()] == ["Learn Rust"]
+
+    # Same key, different payload
+    assert client.post("/api/v1/goals/", json={"text": "Learn Go"}, headers=keyed).status_code == 422
+    # Keys are per user, and requests without a key are never deduplicated
+    other = auth_headers("retry-other@example.com")
+    assert client.post("/api/v1/goals/", json={"text": "Learn Rust"}, headers={**other, "Idempotency-Key": "create-1"}).json()["data"]["goal_id"] != first.json()["data"]["goal_id"]
+    client.post("/api/v1/goals/", json={"text": "Learn Rust"}, headers=headers)
+    assert len(calls) == 3
+
+def test_retried_regeneration_keeps_new_tasks(client, monkeypatch, auth_headers):
+    calls = _count_generations(monkeypatch)
+    headers = auth_headers("regenerate@example.com")
+    goal_id = client.post("/api/v1/goals/", json={"text": "Move house"}, headers=headers).json()["data"]["goal_id"]
+    keyed = {**headers, "Idempotency-Key": "regen-1"}
+
+    assert client.post(f"/api/v1/goals/{goal_id}/regenerate-tasks", headers=keyed).status_code == 200
+    client.post(f"/api/v1/tasks/?goal_id={goal_id}", json={"name": "Pack boxes"}, headers=headers)
+    replay = client.post(f"/api/v1/goals/{goal_id}/regenerate-tasks", headers=keyed)
+
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert len(calls) == 2  # goal creation and the first regeneration only
+    assert [t["name"] for t in client.get(f"/api/v1/tasks/goal/{goal_id}", headers=headers).json()] == ["Pack boxes"]
+
+def test_concurrent_duplicates_run_once():
+    with TestingSessionLocal() as db:
+        user = models.User(email=f"{uuid.uuid4().hex}@example.com", name="C", hashed_password="x")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+    fingerprint = request_fingerprint("POST", "/api/v1/goals/", {"text": "x"})
+    runs = []
+
+    async def handle():
+        db = TestingSessionLocal()
+        try:
+            async with idempotent(db, user_id, "same-key", fingerprint) as attempt:
+                if attempt.replay is not None:
+                    return attempt.replay.body
+                runs.append(1)
+                await asyncio.sleep(0.2)  # the duplicate arrives while this one is running
+                return attempt.store({"run": len(runs)})
+        finally:
+            db.close()
+
+    async def both():
+        return await asyncio.gather(handle(), handle())
+
+    first, second = asyncio.run(both())
+    assert runs == [1]
+    assert first == {"run": 1}
+    assert second == b'{"run":1}'
+
+def test_failed_request_releases_its_key():
+    with TestingSessionLocal() as db:
+        user = models.User(email=f"{uuid.uuid4().hex}@example.com", name="F", hashed_password="x")
+        db.add(user)
+        db.commit()
+
+        async def failing():
+            async with idempotent(db, user.id, "flaky", "hash"):
+                raise RuntimeError("boom")
+
+        try:
+            asyncio.run(failing())
+        except RuntimeError:
+            pass
+        assert db.query(models.IdempotencyKey).filter_by(user_id=user.id).count() == 0
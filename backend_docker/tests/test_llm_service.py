@@ -0,0 +1,285 @@
+import asyncio
+import json
+import pytest
+
+from app.llm_service import LLMService, PlanParseError
+
+PLAN = {
+    "tasks": [
+        {"name": "Research", "description": "Read up", "duration_days": 2, "depends_on": []},
+        {"name": "Build", "description": "Do it", "duration_days": 5, "depends_on": ["Research"]},
+        {"name": "Launch", "description": "Ship", "duration_days": 1, "depends_on": ["Build"]},
+    ]
+}
+
+@pytest.fixture
+def service():
+    return LLMService()
+
+def test_parse_clean_response(service):
+    plan = service._parse_llm_response(json.dumps(PLAN))
+    assert [t.name for t in plan.tasks] == ["Research", "Build", "Launch"]
+    assert service.stats["parsed_clean"] == 1
+    assert service.stats["parsed_after_repair"] == 0
+
+def test_parse_repairs_trailing_commas_and_fences(service):
+    text = '```json\n{"tasks": [{"name": "Research", "depends_on": [],},]}\n```'
+    plan = service._parse_llm_response(text)
+    assert plan.tasks[0].name == "Research"
+    assert service.get_stats()["round_trips_saved"] == 1
+
+def test_trailing_comma_repair_leaves_strings_alone(service):
+    text = '{"tasks": [{"name": "Pick [a, b,] or {x,}", "description": "Say \\"hi,}\\"", "depends_on": [],},]}'
+    plan = service._parse_llm_response(text)
+    assert plan.tasks[0].name == "Pick [a, b,] or {x,}"
+    assert plan.tasks[0].description == 'Say "hi,}"'
+
+def test_parse_repairs_truncated_array(service):
+    text = json.dumps(PLAN)
+    truncated = text[:text.index('"Launch"') + 12]
+    plan = service._parse_llm_response(truncated)
+    assert [t.name for t in plan.tasks] == ["Research", "Build"]
+
+def test_parse_repairs_dangling_dependencies(service):
+    data = json.loads(json.dumps(PLAN))
+    data["tasks"][1]["depends_on"] = ["research ", "Nonexistent"]
+    data["tasks"][2]["depends_on"] = ["Launch", "Build"]
+    plan = service._parse_llm_response(json.dumps(data))
+    assert plan.tasks[1].depends_on == ["Research"]
+    assert plan.tasks[2].depends_on == ["Build"]
+    assert service.stats["dependencies_repaired"] == 2
+
+def test_parse_rejects_garbage(service):
+    with pytest.raises(PlanParseError):
+        service._parse_llm_response("I cannot help with that.")
+
+def test_generate_retries_only_unrepairable_output(service, monkeypatch):
+    responses = iter(["not json at all", json.dumps(PLAN)])
+    calls = []
+
+    async def fake_call(prompt, max_tokens, user_id=None):
+        calls.append(prompt)
+        return next(responses), "stop"
+
+    monkeypatch.setattr(service, "_call_groq_api", fake_call)
+    plan = asyncio.run(service.generate_task_plan("Launch a product"))
+    assert len(plan.tasks) == 3
+    assert len(calls) == 2
+
+def test_generate_falls_back_after_repeated_bad_output(service, monkeypatch):
+    async def fake_call(prompt, max_tokens, user_id=None):
+        return "still not json", "stop"
+
+    monkeypatch.setattr(service, "_call_groq_api", fake_call)
+    plan = asyncio.run(service.generate_task_plan("Learn to paint"))
+    assert len(plan.tasks) == 1
+    assert plan.tasks[0].name == "Complete: Learn to paint"
+    assert service.stats["fallback_plans"] == 1
+
+def test_prompt_templates_are_versioned(service):
+    from app.prompts import PROMPT_TEMPLATES
+    assert service.prompt_version in PROMPT_TEMPLATES
+    assert "Ship a podcast" in service._create_planning_prompt("Ship a podcast")
+    compact = PROMPT_TEMPLATES["v2"]
+    verbose = PROMPT_TEMPLATES["v1"]
+    assert len(compact.system + compact.user) < len(verbose.system + verbose.user) / 2
+
+def test_token_usage_aggregated_per_user_and_model():
+    from app.token_budget import TokenUsageTracker
+    tracker = TokenUsageTracker()
+    tracker.record("model-a", "user-1", 100, 300)
+    tracker.record("model-a", "user-2", 120, 280)
+    tracker.record("model-b", "user-1", 90, 310)
+    snapshot = tracker.snapshot()
+    assert snapshot["by_model"]["model-a"]["total_tokens"] == 800
+    assert snapshot["top_users"][0] == {
+        "user_id": "user-1", "calls": 2, "prompt_tokens": 190, "completion_tokens": 610, "total_tokens": 800
+    }
+    assert snapshot["users_tracked"] == 2
+    assert snapshot["tokens_last_minute"] == 1200
+
+def test_token_usage_tracks_a_bounded_number_of_users():
+    from app.token_budget import TokenUsageTracker
+    tracker = TokenUsageTracker(max_users=3, top_users=2)
+    for i in range(5):
+        tracker.record("model-a", f"user-{i}", 10 * i, 0)
+    snapshot = tracker.snapshot()
+    assert snapshot["users_tracked"] == 3
+    assert [u["user_id"] for u in snapshot["top_users"]] == ["user-4", "user-3"]
+
+def test_max_tokens_adapts_to_observed_plan_sizes():
+    from app.token_budget import MaxTokensBudget
+    budget = MaxTokensBudget(ceiling=2000, floor=400)
+    assert budget.next_max_tokens() == 2000
+    for size in (500, 520, 480, 610, 550):
+        budget.observe(size)
+    assert budget.next_max_tokens() == int(610 * 1.3)
+    budget.observe(100, truncated=True)
+    assert budget.next_max_tokens() == 2000
+
+def test_concurrent_identical_goals_share_one_call(service, monkeypatch):
+    calls = []
+
+    async def slow_call(prompt, max_tokens, user_id=None):
+        calls.append(prompt)
+        await asyncio.sleep(0.05)
+        return json.dumps(PLAN), "stop"
+
+    monkeypatch.setattr(service, "_call_groq_api", slow_call)
+
+    async def run():
+        goals = ["Onboard a new hire", "onboard a  new hire", "ONBOARD A NEW HIRE ", "Onboard a new hire"]
+        return await asyncio.gather(*(service.generate_task_plan(g) for g in goals))
+
+    plans = asyncio.run(run())
+    assert len(calls) == 1
+    assert service.get_stats()["coalesced"] == 3
+    assert service.get_stats()["in_flight"] == 0
+    assert all(p == plans[0] for p in plans)
+    assert len({id(p) for p in plans}) == 4  # each caller persists its own copy
+
+def test_different_users_with_the_same_goal_share_one_call(service, monkeypatch):
+    calls = []
+
+    async def slow_call(prompt, max_tokens, user_id=None):
+        calls.append(user_id)
+        await asyncio.sleep(0.05)
+        return json.dumps(PLAN), "stop"
+
+    monkeypatch.setattr(service, "_call_groq_api", slow_call)
+
+    async def run():
+        return await asyncio.gather(
+            service.generate_task_plan("Plan a garden party", "user-1"),
+            service.generate_task_plan("plan a garden party", "user-2"),
+        )
+
+    first, second = asyncio.run(run())
+    assert len(calls) == 1
+    assert first == second
+    # Each caller's index gets the plan, so either can reuse it later
+    assert service.plan_index.search("Plan a garden party", "user-1")[0].similarity > 0.99
+    assert service.plan_index.search("Plan a garden party", "user-2")[0].similarity > 0.99
+
+def test_cancelled_caller_does_not_cancel_shared_generation(service, monkeypatch):
+    finished, cancelled = [], []
+
+    async def slow_call(prompt, max_tokens, user_id=None):
+        try:
+            await asyncio.sleep(0.1)
+        except asyncio.CancelledError:
+            cancelled.append(prompt)
+            raise
+        finished.append(prompt)
+        return json.dumps(PLAN), "stop"
+
+    monkeypatch.setattr(service, "_call_groq_api", slow_call)
+
+    async def leader_gives_up():
+        leader = asyncio.ensure_future(service.generate_task_plan("Plan a wedding"))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(service.generate_task_plan("plan a wedding"))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert len(asyncio.run(leader_gives_up()).tasks) == 3
+    assert (len(finished), len(cancelled)) == (1, 0)
+
+    async def everyone_gives_up():
+        waiter = asyncio.ensure_future(service.generate_task_plan("Plan a birthday"))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.sleep(0.01)
+
+    asyncio.run(everyone_gives_up())
+    assert len(cancelled) == 1
+    assert service.get_stats()["in_flight"] == 0
+
+def test_open_circuit_short_circuits_to_fallback(service, monkeypatch):
+    from fastapi import HTTPException
+    calls = []
+
+    async def failing_call(prompt, max_tokens, user_id=None):
+        calls.append(prompt)
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(service, "_call_groq_api", failing_call)
+    service.retry_delay = 0
+    service.breaker.failure_threshold = 3
+
+    with pytest.raises(HTTPException):
+        asyncio.run(service.generate_task_plan("Write a thesis"))
+    assert len(calls) == 3
+    assert service.breaker.state == "open"
+
+    # No more Groq calls while open: the template plan comes back at once
+    plan = asyncio.run(service.generate_task_plan("Write a thesis"))
+    assert plan.tasks[0].name == "Complete: Write a thesis"
+    assert len(calls) == 3
+    assert service.get_stats()["short_circuited"] == 1
+
+def test_generation_deadline_bounds_all_attempts(service, monkeypatch):
+    import time
+    from fastapi import HTTPException
+    from app.config import settings
+
+    async def hanging_call(prompt, max_tokens, user_id=None):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(service, "_call_groq_api", hanging_call)
+    monkeypatch.setattr(settings, "llm_generation_deadline_seconds", 0.2)
+
+    started = time.monotonic()
+    with pytest.raises(HTTPException):
+        asyncio.run(service.generate_task_plan("Learn the cello"))
+    assert time.monotonic() - started < 1.5
+    assert service.get_stats()["deadline_exceeded"] >= 1
+
+def test_spent_deadline_skips_groq_and_spares_the_breaker(service, monkeypatch):
+    from app.config import settings
+    calls = []
+
+    async def call(prompt, max_tokens, user_id=None):
+        calls.append(prompt)
+        return json.dumps(PLAN), "stop"
+
+    monkeypatch.setattr(service, "_call_groq_api", call)
+    monkeypatch.setattr(settings, "llm_generation_deadline_seconds", 0)
+    plan = asyncio.run(service.generate_task_plan("Learn the banjo"))
+    assert plan.tasks[0].name == "Complete: Learn the banjo"
+    assert calls == []
+    assert service.breaker.consecutive_failures == 0
+    assert service.get_stats()["deadline_exceeded"] == 1
+
+def test_open_circuit_never_serves_another_users_plan(service):
+    service.plan_index.add("Run a marathon", PLAN, "user-1")
+    service.breaker.failure_threshold = 1
+    service.breaker.record_failure()
+
+    other = asyncio.run(service.generate_task_plan("Run a marathon in spring", "user-2"))
+    assert other.tasks[0].name == "Complete: Run a marathon in spring"
+    own = asyncio.run(service.generate_task_plan("Run a marathon in spring", "user-1"))
+    assert own.tasks[0].name == "Research"
+
+def test_truncated_adaptive_budget_retries_at_the_ceiling(service, monkeypatch):
+    for size in (300, 320, 310, 290, 305):
+        service.max_tokens_budget.observe(size)
+    ceiling = service.max_tokens_budget.ceiling
+    assert service.max_tokens_budget.next_max_tokens() < ceiling
+    text = json.dumps(PLAN)
+    budgets = []
+
+    async def call(prompt, max_tokens, user_id=None):
+        budgets.append(max_tokens)
+        if max_tokens < ceiling:
+            return text[:text.index('"Launch"') + 12], "length"
+        return text, "stop"
+
+    monkeypatch.setattr(service, "_call_groq_api", call)
+    plan = asyncio.run(service.generate_task_plan("Launch a product"))
+    assert [t.name for t in plan.tasks] == ["Research", "Build", "Launch"]
+    assert budgets[1] == ceiling and len(budgets) == 2
+    stats = service.get_stats()
+    assert stats["truncated_retries"] == 1
+    assert stats["parsed_after_repair"] == 0
@@ -0,0 +1,80 @@
+import io
+import json
+import logging
+import queue
+from logging.handlers import QueueListener
+
+from app.logging_setup import BoundedQueueHandler, ContextFilter, JsonFormatter, SamplingFilter, get_logging_stats
+from app.request_context import begin_log_fields, bind_log_fields, end_log_fields, log_fields
+
+def _pipeline(max_chars=2000, burst=0, maxsize=100):
+    """Queue handler feeding a JSON writer thread, as configure_logging wires it"""
+    log_queue = queue.Queue(maxsize=maxsize)
+    handler = BoundedQueueHandler(log_queue, max_chars)
+    handler.addFilter(SamplingFilter(burst, 60.0))
+    handler.addFilter(ContextFilter())
+    output = io.StringIO()
+    writer = logging.StreamHandler(output)
+    writer.setFormatter(JsonFormatter())
+    logger = logging.getLogger(f"test.pipeline.{id(handler)}")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    return logger, handler, QueueListener(log_queue, writer), output
+
+def _records(output):
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+def test_records_carry_request_context_and_extra_fields():
+    logger, _, listener, output = _pipeline()
+    listener.start()
+    token = begin_log_fields(request_id="req-1")
+    try:
+        bind_log_fields(user_id="user-1")
+        with log_fields(goal_id="goal-1"):
+            logger.info("Generated 3 tasks", extra={"duration_ms": 12.5})
+        logger.warning("outside the job")
+    finally:
+        end_log_fields(token)
+    logger.info("no request")
+    listener.stop()
+
+    inside, outside, bare = _records(output)
+    assert inside["message"] == "Generated 3 tasks"
+    assert (inside["request_id"], inside["user_id"], inside["goal_id"], inside["duration_ms"]) == ("req-1", "user-1", "goal-1", 12.5)
+    assert "goal_id" not in outside and outside["user_id"] == "user-1"
+    assert "request_id" not in bare
+
+def test_large_messages_and_tracebacks_are_truncated():
+    logger, _, listener, output = _pipeline(max_chars=100)
+    listener.start()
+    logger.debug("raw response: " + "x" * 5000)
+    try:
+        raise ValueError("y" * 5000)
+    except ValueError:
+        logger.exception("parse failed")
+    listener.stop()
+
+    for record in _records(output):
+        assert len(record["message"]) < 150
+        assert record["message"].endswith("chars truncated]")
+
+def test_noisy_call_sites_are_sampled_but_errors_are_not():
+    logger, _, listener, output = _pipeline(burst=3)
+    listener.start()
+    for i in range(50):
+        logger.info(f"noisy {i}")
+    for i in range(5):
+        logger.error(f"failure {i}")
+    listener.stop()
+
+    messages = [r["message"] for r in _records(output)]
+    assert messages == ["noisy 0", "noisy 1", "noisy 2"] + [f"failure {i}" for i in range(5)]
+
+def test_full_queue_drops_instead_of_blocking():
+    logger, handler, _, _ = _pipeline(maxsize=5)
+    for i in range(20):
+        logger.info(f"record {i}")  # no writer running: the queue fills up
+    assert handler.queue.qsize() == 5
+    assert handler.dropped == 15
+    assert set(get_logging_stats()) == {"queued", "dropped", "suppressed"}
@@ -1,25 +1,19 @@
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from app import database
 from app.main import app
-from app.database import get_db, Base
+from app.database import Base, make_session_factory
 import tempfile
 import os
 
 # Create a temporary database for testing
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = make_session_factory(engine)
 
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
-
-app.dependency_overrides[get_db] = override_get_db
+# Requests go through the real get_db, against the test database
+database.SessionLocal = TestingSessionLocal
 
 @pytest.fixture(scope="module")
 def client():
@@ -29,6 +23,7 @@ def client():
         yield test_client
     # Clean up
     Base.metadata.drop_all(bind=engine)
+    engine.dispose()
     if os.path.exists("test.db"):
         os.remove("test.db")
 
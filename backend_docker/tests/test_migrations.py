@@ -0,0 +1,55 @@
+import subprocess
+import sys
+
+import pytest
+from alembic import command
+from sqlalchemy import create_engine, inspect
+
+from app.migrations import (
+    BASELINE_REVISION, SchemaOutOfDateError, alembic_config, current_revision, ensure_schema, head_revision
+)
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    yield engine
+    engine.dispose()
+
+def test_startup_check_refuses_unmigrated_database(engine):
+    with pytest.raises(SchemaOutOfDateError, match="alembic upgrade head"):
+        ensure_schema(engine)
+
+def test_upgrade_builds_schema_then_check_passes(engine):
+    head = head_revision()
+    assert ensure_schema(engine, upgrade=True) == head
+    tables = set(inspect(engine).get_table_names())
+    assert {"users", "goals", "tasks", "task_dependencies", "goals_fts"} <= tables
+    assert ensure_schema(engine) == head
+
+def test_user_directory_only_on_shard_zero(engine, tmp_path):
+    other = create_engine(f"sqlite:///{tmp_path / 'shard1.db'}")
+    try:
+        assert ensure_schema(other, upgrade=True, shard=1) == head_revision()
+        assert "user_directory" not in inspect(other).get_table_names()
+        assert "users" in inspect(other).get_table_names()
+    finally:
+        other.dispose()
+    ensure_schema(engine, upgrade=True)
+    assert "user_directory" in inspect(engine).get_table_names()
+
+def test_database_from_create_all_is_stamped(engine):
+    # A database made by create_all before migrations existed: the baseline schema, no revision
+    with engine.begin() as connection:
+        command.upgrade(alembic_config(connection), BASELINE_REVISION)
+        connection.exec_driver_sql("DROP TABLE alembic_version")
+    with pytest.raises(SchemaOutOfDateError, match="alembic stamp"):
+        ensure_schema(engine)
+    assert ensure_schema(engine, upgrade=True) == head_revision()
+    assert current_revision(engine) == head_revision()
+    # The search index is not part of the baseline, so stamped databases get it on upgrade
+    assert {"goals_fts", "tasks_fts"} <= set(inspect(engine).get_table_names())
+
+def test_importing_app_skips_heavy_clients():
+    code = "import sys, app.main; print(sorted(m for m in ('groq', 'passlib') if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
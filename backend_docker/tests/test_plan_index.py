@@ -0,0 +1,76 @@
+import asyncio
+import json
+
+from app.llm_service import LLMService
+from app.plan_index import PlanIndex
+
+PLAN = {"tasks": [
+    {"name": "Book exam", "description": "", "duration_days": 1, "depends_on": []},
+    {"name": "Study", "description": "", "duration_days": 20, "depends_on": ["Book exam"]},
+]}
+
+def test_search_ranks_similar_goals_first():
+    index = PlanIndex(path=None)
+    index.add("Prepare for AWS certification", PLAN, "user-1")
+    index.add("Run a half marathon", PLAN, "user-1")
+    matches = index.search("study for AWS cert exam", "user-1", k=2)
+    assert matches[0].goal_text == "Prepare for AWS certification"
+    assert matches[0].similarity > matches[1].similarity
+
+def test_search_only_sees_the_callers_plans():
+    index = PlanIndex(path=None)
+    index.add("Prepare for AWS certification", PLAN, "user-1")
+    index.add("Prepare for AWS certification", PLAN, "user-2")
+    assert len(index) == 2
+    assert [m.goal_text for m in index.search("Prepare for AWS certification", "user-2")] == ["Prepare for AWS certification"]
+    assert index.search("Prepare for AWS certification", "user-3") == []
+
+def test_index_persists_to_disk(tmp_path):
+    path = str(tmp_path / "plans.npz")
+    index = PlanIndex(path=path)
+    index.add("Learn watercolor painting", PLAN, "user-1")
+    index.save()
+
+    reloaded = PlanIndex(path=path)
+    assert len(reloaded) == 1
+    assert reloaded.search("Learn watercolor painting", "user-1")[0].similarity > 0.99
+    assert reloaded.search("Learn watercolor painting", "user-2") == []
+
+def test_same_goal_replaces_entry():
+    index = PlanIndex(path=None)
+    index.add("Launch a mobile app", PLAN, "user-1")
+    index.add("launch a mobile app", PLAN, "user-1")
+    assert len(index) == 1
+
+def test_generate_reuses_and_few_shots(monkeypatch):
+    service = LLMService()
+    prompts = []
+
+    async def fake_call(prompt, max_tokens, user_id=None):
+        prompts.append(prompt)
+        return json.dumps(PLAN), "stop"
+
+    monkeypatch.setattr(service, "_call_groq_api", fake_call)
+
+    asyncio.run(service.generate_task_plan("Prepare for AWS certification", "user-1"))
+    asyncio.run(service.generate_task_plan("prepare for AWS certification!", "user-1"))
+    assert len(prompts) == 1  # near-identical goal reused the stored plan
+
+    asyncio.run(service.generate_task_plan("Study for the AWS cert exam", "user-1"))
+    assert len(prompts) == 2
+    assert "Plans for similar goals" in prompts[1]
+
+    # Another user's plans are never reused or shown
+    asyncio.run(service.generate_task_plan("Prepare for AWS certification", "user-2"))
+    assert len(prompts) == 3
+    assert "Plans for similar goals" not in prompts[2]
+
+    # Regeneration asks for a fresh plan, with the old one only as an example
+    asyncio.run(service.generate_task_plan("Prepare for AWS certification", "user-1", reuse=False))
+    assert len(prompts) == 4
+    assert "Plans for similar goals" in prompts[3]
+
+    stats = service.get_reuse_stats()
+    assert stats["reused"] == 1
+    assert stats["few_shot"] == 2
+    assert stats["misses"] == 2
@@ -0,0 +1,73 @@
+import logging
+import pytest
+
+from app import query_monitor
+from app.query_monitor import normalize_statement, QueryStats
+from tests.test_main import client, get_auth_headers
+
+def test_normalize_statement_groups_in_lists():
+    """IN lists of different lengths and literals share one shape"""
+    a = normalize_statement("SELECT * FROM tasks WHERE id IN (?, ?, ?) AND duration_days > 3")
+    b = normalize_statement("SELECT *\n  FROM tasks WHERE id IN (?) AND duration_days > 10")
+    assert a == b
+
+def test_repeated_shapes():
+    stats = QueryStats()
+    for _ in range(5):
+        stats.record("SELECT * FROM task_dependencies WHERE depends_on_task_id = ?", 0.1)
+    stats.record("SELECT * FROM tasks", 0.1)
+    assert stats.repeated_shapes(4) == [
+        ("SELECT * FROM task_dependencies WHERE depends_on_task_id = ?", 5)
+    ]
+
+def test_request_id_header(client):
+    response = client.get("/health", headers={"X-Request-ID": "abc123"})
+    assert response.headers["X-Request-ID"] == "abc123"
+    assert client.get("/health").headers["X-Request-ID"]
+
+def test_list_goals_within_query_budget(client, query_budget):
+    """Listing goals is a user lookup plus one aggregate query"""
+    headers = get_auth_headers(client)
+    with query_budget(3, max_repeats=1):
+        response = client.get("/api/v1/goals/", headers=headers)
+    assert response.status_code == 200
+
+def test_failed_statement_leaves_no_timing_state():
+    from sqlalchemy import create_engine, exc
+
+    engine = create_engine("sqlite://")
+    query_monitor.install_query_monitor()
+    with query_monitor.track_queries() as stats, engine.connect() as conn:
+        with pytest.raises(exc.OperationalError):
+            conn.exec_driver_sql("SELECT * FROM no_such_table")
+        conn.exec_driver_sql("SELECT 1")
+        assert "query_start_time" not in conn.info
+    assert stats.count == 1
+    engine.dispose()
+
+def test_bulk_task_creation_is_one_insert_per_table(client, query_budget, no_generation):
+    from uuid import UUID
+    from app import crud
+    from tests.test_main import TestingSessionLocal
+
+    headers = get_auth_headers(client)
+    goal_id = client.post("/api/v1/goals/", json={"text": "Bulk plan"}, headers=headers).json()["data"]["goal_id"]
+    tasks = [{"name": f"Step {i}", "depends_on": [f"Step {i - 1}"] if i else []} for i in range(20)]
+    db = TestingSessionLocal()
+    try:
+        with query_budget(4, max_repeats=1):
+            task_ids = crud.create_tasks_bulk(db, tasks, UUID(goal_id))
+    finally:
+        db.close()
+    assert len(task_ids) == 20
+
+def test_n_plus_one_is_logged(caplog, monkeypatch):
+    """A statement shape repeated past the threshold within a request is flagged"""
+    monkeypatch.setattr(query_monitor.settings, "n_plus_one_threshold", 2)
+    token = query_monitor.begin_request()
+    stats = query_monitor._request_stats_var.get()
+    for _ in range(3):
+        stats.record("SELECT * FROM task_dependencies WHERE depends_on_task_id = ?", 0.1)
+    with caplog.at_level(logging.WARNING, logger="app.query_monitor"):
+        query_monitor.end_request(token)
+    assert any("Possible N+1" in r.getMessage() for r in caplog.records)
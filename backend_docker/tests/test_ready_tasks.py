@@ -0,0 +1,39 @@
+from tests.test_main import client
+
+def _task(client, headers, goal_id, name, duration):
+    return client.post(
+        f"/api/v1/tasks/?goal_id={goal_id}", json={"name": name, "duration_days": duration}, headers=headers
+    ).json()["id"]
+
+def test_ready_tasks_across_goals(client, query_budget, no_generation, auth_headers):
+    headers = auth_headers("ready@example.com")
+    house = client.post("/api/v1/goals/", json={"text": "Renovate the house"}, headers=headers).json()["data"]["goal_id"]
+    trip = client.post("/api/v1/goals/", json={"text": "Plan a trip"}, headers=headers).json()["data"]["goal_id"]
+
+    quotes = _task(client, headers, house, "Get quotes", 3)
+    builder = _task(client, headers, house, "Hire builder", 1)
+    _task(client, headers, trip, "Book flights", 2)
+    visa = _task(client, headers, trip, "Apply for visa", 5)
+    done = _task(client, headers, trip, "Renew passport", 4)
+    client.post(f"/api/v1/tasks/{builder}/dependencies", params={"depends_on_task_id": quotes}, headers=headers)
+    client.post(f"/api/v1/tasks/{visa}/dependencies", params={"depends_on_task_id": done}, headers=headers)
+    client.patch(f"/api/v1/tasks/{done}", json={"status": "completed"}, headers=headers)
+    client.patch(f"/api/v1/tasks/{quotes}", json={"status": "in_progress"}, headers=headers)
+
+    with query_budget(2):
+        page = client.get("/api/v1/tasks/ready", params={"sort": "duration"}, headers=headers).json()
+    # Hire builder waits on quotes; the passport is done, which unblocks the visa
+    assert [t["name"] for t in page["tasks"]] == ["Book flights", "Get quotes", "Apply for visa"]
+    assert page["has_more"] is False
+
+    # Grouped by goal: each goal's ready tasks are contiguous
+    goals = [t["goal_id"] for t in client.get("/api/v1/tasks/ready", headers=headers).json()["tasks"]]
+    assert goals == sorted(goals, key=goals.index)
+
+    page = client.get("/api/v1/tasks/ready", params={"limit": 2}, headers=headers).json()
+    assert len(page["tasks"]) == 2
+    assert page["has_more"] is True
+
+    other = auth_headers("ready-other@example.com")
+    assert client.get("/api/v1/tasks/ready", headers=other).json()["tasks"] == []
+    assert client.get("/api/v1/tasks/ready", params={"sort": "name"}, headers=headers).status_code == 422
@@ -0,0 +1,81 @@
+from app import models
+from tests.test_main import client, TestingSessionLocal
+
+def _refresh(client, refresh_token):
+    return client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+
+def test_refresh_rotates_without_checking_the_password(client, monkeypatch, auth_tokens):
+    tokens = auth_tokens("refresh@example.com")
+    assert tokens["refresh_token"] and tokens["expires_in"] > 0
+
+    def no_bcrypt(*args):
+        raise AssertionError("refresh must not verify a password")
+
+    monkeypatch.setattr("app.auth.verify_password", no_bcrypt)
+    response = _refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    me = client.post("/api/v1/auth/test-token", headers={"Authorization": f"Bearer {rotated['access_token']}"})
+    assert me.json()["email"] == "refresh@example.com"
+
+    # Only hashes are stored
+    db = TestingSessionLocal()
+    try:
+        stored = {row.token_hash for row in db.query(models.RefreshToken).all()}
+    finally:
+        db.close()
+    assert len(stored) == 2 and rotated["refresh_token"] not in stored
+
+def test_reusing_a_rotated_token_revokes_the_family(client, auth_tokens):
+    tokens = auth_tokens("reuse@example.com")
+    other_login = auth_tokens("reuse@example.com")
+    rotated = _refresh(client, tokens["refresh_token"]).json()
+
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
+    # The thief's replay also locks out the legitimate holder of the newer token
+    assert _refresh(client, rotated["refresh_token"]).status_code == 401
+    # Other logins are separate families
+    assert _refresh(client, other_login["refresh_token"]).status_code == 200
+
+def test_logout_revokes_and_bad_tokens_are_rejected(client, auth_tokens):
+    tokens = auth_tokens("logout@example.com")
+    assert client.post("/api/v1/auth/logout", json={"refresh_token": tokens["refresh_token"]}).status_code == 200
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
+
+    for bad in ("", "not-a-token", tokens["refresh_token"][:-2] + "xx", "0" * 32 + ".abc"):
+        response = _refresh(client, bad)
+        assert response.status_code == 401
+        assert response.headers["WWW-Authenticate"] == "Bearer"
+
+def test_missing_credentials_are_401(client):
+    response = client.get("/api/v1/goals/")
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+
+def test_password_change_revokes_every_session(client, auth_tokens):
+    first = auth_tokens("rotate-pw@example.com")
+    second = auth_tokens("rotate-pw@example.com")
+    headers = {"Authorization": f"Bearer {first['access_token']}"}
+    url = "/api/v1/auth/password"
+    wrong = client.post(url, json={"current_password": "guess", "new_password": "newpass456"}, headers=headers)
+    assert wrong.status_code == 400
+
+    changed = client.post(url, json={"current_password": "testpass123", "new_password": "newpass456"}, headers=headers)
+    assert changed.status_code == 200
+    assert _refresh(client, first["refresh_token"]).status_code == 401
+    assert _refresh(client, second["refresh_token"]).status_code == 401
+
+    fresh = client.post("/api/v1/auth/login", data={"username": "rotate-pw@example.com", "password": "newpass456"}).json()
+    assert _refresh(client, fresh["refresh_token"]).status_code == 200
+
+def test_deactivation_revokes_every_session(client, auth_tokens):
+    from app import crud, schemas
+    tokens = auth_tokens("deactivate@example.com")
+    db = TestingSessionLocal()
+    try:
+        user = crud.get_user_by_email(db, "deactivate@example.com")
+        crud.update_user(db, user.id, schemas.UserUpdate(email=user.email, name=user.name, is_active=False))
+    finally:
+        db.close()
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
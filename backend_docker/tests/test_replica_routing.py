@@ -0,0 +1,96 @@
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+
+from app import database, models
+from app.cache import user_cache
+from app.database import Base, make_session_factory, mark_user_write, _create_engine
+from app.main import app
+
+@pytest.fixture
+def routed(tmp_path):
+    """Primary and replica as two SQLite files; nothing replicates between them"""
+    primary = _create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = _create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(bind=primary)
+    Base.metadata.create_all(bind=replica)
+    yield make_session_factory(primary, replica), primary, replica
+    primary.dispose()
+    replica.dispose()
+
+def _add_goal(engine, user_id, text):
+    with make_session_factory(engine)() as db:
+        if db.get(models.User, user_id) is None:
+            db.add(models.User(id=user_id, email=f"{user_id.hex}@example.com", name="R", hashed_password="x"))
+        db.add(models.Goal(user_id=user_id, text=text))
+        db.commit()
+
+def test_read_only_session_uses_replica_until_user_writes(routed, monkeypatch):
+    factory, primary, replica = routed
+    user_id = uuid.uuid4()
+    _add_goal(primary, user_id, "on primary")
+    _add_goal(replica, user_id, "on replica")
+
+    with factory() as db:
+        db.info.update(read_only=True, user_id=user_id)
+        assert [g.text for g in db.query(models.Goal)] == ["on replica"]
+
+        mark_user_write(user_id)
+        db.expunge_all()
+        assert [g.text for g in db.query(models.Goal)] == ["on primary"]
+
+    with factory() as db:
+        db.info["user_id"] = user_id  # not read-only: always the primary
+        monkeypatch.setattr(database.settings, "replica_sticky_seconds", 0)
+        assert [g.text for g in db.query(models.Goal)] == ["on primary"]
+
+def test_writes_from_read_only_session_go_to_primary(routed):
+    factory, primary, replica = routed
+    user_id = uuid.uuid4()
+    _add_goal(primary, user_id, "seed")
+    _add_goal(replica, user_id, "seed")
+
+    with factory() as db:
+        db.info["read_only"] = True
+        db.add(models.Goal(user_id=user_id, text="new"))
+        db.commit()
+
+    with make_session_factory(primary)() as db:
+        assert db.query(models.Goal).filter_by(text="new").count() == 1
+    with make_session_factory(replica)() as db:
+        assert db.query(models.Goal).filter_by(text="new").count() == 0
+
+def test_get_requests_read_from_replica_with_stickiness(routed, monkeypatch, no_generation):
+    factory, primary, replica = routed
+
+    monkeypatch.setattr(database, "SessionLocal", factory)
+    with TestClient(app) as client:
+        client.post("/api/v1/auth/register", json={"email": "reader@example.com", "name": "Reader", "password": "readpass123"})
+        token = client.post("/api/v1/auth/login", data={"username": "reader@example.com", "password": "readpass123"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        # The user only exists on the primary: auth falls back to it
+        client.post("/api/v1/goals/", json={"text": "Fresh goal"}, headers=headers)
+        goals = client.get("/api/v1/goals/", headers=headers).json()
+        assert [g["text"] for g in goals] == ["Fresh goal"]  # sticky after the write
+
+        # Replicate only the user row, so auth succeeds on the replica
+        with make_session_factory(primary)() as db:
+            user = db.query(models.User).filter_by(email="reader@example.com").one()
+            db.expunge(user)
+        with make_session_factory(replica)() as db:
+            db.merge(user)
+            db.commit()
+
+        monkeypatch.setattr(database.settings, "replica_sticky_seconds", 0)
+        user_cache.invalidate_user(user.id)  # otherwise the list is served from the read cache
+        assert client.get("/api/v1/goals/", headers=headers).json() == []  # replica has not caught up
+
+        # The lagging read was not cached: once the replica catches up, the goal shows
+        with make_session_factory(primary)() as db:
+            goal = db.query(models.Goal).filter_by(text="Fresh goal").one()
+            db.expunge(goal)
+        with make_session_factory(replica)() as db:
+            db.merge(goal)
+            db.commit()
+        assert [g["text"] for g in client.get("/api/v1/goals/", headers=headers).json()] == ["Fresh goal"]
@@ -0,0 +1,149 @@
+import uuid
+
+import pytest
+
+from app import cache
+from app.cache import LRUBackend, RedisBackend, UserCache, goal_key
+from tests.test_main import client
+
+class FakeRedis:
+    """The slice of redis-py the cache uses, kept in a dict"""
+
+    def __init__(self):
+        self.hashes = {}
+        self.values = {}
+        self.expiry = {}
+
+    def get(self, name):
+        value = self.values.get(name)
+        return str(value).encode() if value is not None else None
+
+    def set(self, name, value, ex=None):
+        self.values[name] = value
+        self.expiry[name] = ex
+
+    def incr(self, name):
+        self.values[name] = self.values.get(name, 0) + 1
+        return self.values[name]
+
+    def hget(self, name, key):
+        value = self.hashes.get(name, {}).get(key)
+        return value.encode() if value is not None else None
+
+    def hset(self, name, key, value):
+        self.hashes.setdefault(name, {})[key] = value
+
+    def hkeys(self, name):
+        return [key.encode() for key in self.hashes.get(name, {})]
+
+    def hdel(self, name, *keys):
+        for key in keys:
+            self.hashes.get(name, {}).pop(key, None)
+
+    def delete(self, name):
+        self.hashes.pop(name, None)
+
+    def expire(self, name, seconds):
+        self.expiry[name] = seconds
+
+@pytest.mark.parametrize("backend", [LRUBackend, lambda: RedisBackend(FakeRedis(), ttl_seconds=60)])
+def test_goal_writes_only_drop_that_goals_views(backend):
+    user_cache = UserCache(backend())
+    user, goal_a, goal_b = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    for key in ("dashboard", "goals:0:100:", goal_key(goal_a), goal_key(goal_a, "tasks"), goal_key(goal_b, "graph")):
+        user_cache.set(user, key, {"id": goal_a, "key": key})
+    assert user_cache.get(user, goal_key(goal_a)) == {"id": str(goal_a), "key": goal_key(goal_a)}
+
+    user_cache.invalidate_goals(user, [goal_a])
+    assert user_cache.get(user, "dashboard") is None
+    assert user_cache.get(user, "goals:0:100:") is None
+    assert user_cache.get(user, goal_key(goal_a)) is None
+    assert user_cache.get(user, goal_key(goal_a, "tasks")) is None
+    assert user_cache.get(user, goal_key(goal_b, "graph")) is not None
+
+    user_cache.invalidate_user(user)
+    assert user_cache.get(user, goal_key(goal_b, "graph")) is None
+    stats = user_cache.get_stats()
+    assert stats["by_kind"]["goal:graph"] == {"hits": 1, "misses": 1, "sets": 1, "stale": 0, "hit_ratio": 0.5}
+    assert stats["hits"] == 2 and stats["misses"] == 5
+
+@pytest.mark.parametrize("backend", [LRUBackend, lambda: RedisBackend(FakeRedis(), ttl_seconds=60)])
+def test_view_computed_across_a_write_is_not_stored(backend):
+    user_cache = UserCache(backend())
+    user, goal = uuid.uuid4(), uuid.uuid4()
+    cached, generation = user_cache.lookup(user, goal_key(goal))
+    assert cached is None
+    # A write lands while the view is being computed from the old rows
+    user_cache.invalidate_goals(user, [goal])
+    assert user_cache.set(user, goal_key(goal), {"version": 1}, generation) == {"version": 1}
+    assert user_cache.get(user, goal_key(goal)) is None
+    assert user_cache.get_stats()["by_kind"]["goal"]["stale"] == 1
+
+    cached, generation = user_cache.lookup(user, goal_key(goal))
+    user_cache.set(user, goal_key(goal), {"version": 2}, generation)
+    assert user_cache.get(user, goal_key(goal)) == {"version": 2}
+
+def test_recent_writes_are_shared_between_workers():
+    redis = FakeRedis()
+    worker_a, worker_b = UserCache(RedisBackend(redis)), UserCache(RedisBackend(redis))
+    user = uuid.uuid4()
+    assert not worker_b.has_recent_write(user, 5)
+    worker_a.mark_write(user, 5)
+    assert worker_b.has_recent_write(user, 5)
+    assert redis.expiry[f"taskplanner:cache:{user}:written"] == 5
+    assert not worker_b.has_recent_write(user, 0)
+
+def test_memory_backend_entries_expire():
+    now = [0.0]
+    backend = LRUBackend(max_users=10, ttl_seconds=30, clock=lambda: now[0])
+    user = uuid.uuid4()
+    backend.set(user, "dashboard", {"goals": 1})
+    now[0] = 29
+    assert backend.get(user, "dashboard") == {"goals": 1}
+    now[0] = 31
+    assert backend.get(user, "dashboard") is None
+
+@pytest.mark.parametrize("backend", [LRUBackend, lambda: RedisBackend(FakeRedis(), ttl_seconds=60)])
+def test_max_age_caps_an_entry_below_the_backend_ttl(backend):
+    now = [0.0]
+    user_cache = UserCache(backend(), clock=lambda: now[0])
+    user = uuid.uuid4()
+    assert user_cache.set(user, "dashboard", {"goals": 1}, max_age=5) == {"goals": 1}
+    assert user_cache.set(user, "goals:0:100:", [], max_age=0) == []
+    assert user_cache.get(user, "goals:0:100:") is None  # not stored at all
+    now[0] = 4
+    assert user_cache.get(user, "dashboard") == {"goals": 1}
+    now[0] = 6
+    assert user_cache.get(user, "dashboard") is None
+
+def test_read_endpoints_are_cached_per_user(client, monkeypatch, query_budget, no_generation, auth_headers):
+    monkeypatch.setattr(cache.user_cache, "backend", RedisBackend(FakeRedis()))
+    headers = auth_headers("cached@example.com")
+    goal_id = client.post("/api/v1/goals/", json={"text": "Plant a garden"}, headers=headers).json()["data"]["goal_id"]
+    other_goal = client.post("/api/v1/goals/", json={"text": "Build a shed"}, headers=headers).json()["data"]["goal_id"]
+    task = client.post(f"/api/v1/tasks/?goal_id={goal_id}", json={"name": "Dig beds"}, headers=headers).json()
+
+    urls = ["/api/v1/goals/", f"/api/v1/goals/{goal_id}", f"/api/v1/tasks/goal/{goal_id}", f"/api/v1/goals/{other_goal}"]
+    first = [client.get(url, headers=headers) for url in urls]
+    # Hits cost only the auth lookup
+    with query_budget(len(urls)):
+        again = [client.get(url, headers=headers) for url in urls]
+    assert [r.json() for r in again] == [r.json() for r in first]
+    assert again[1].headers["ETag"] == first[1].headers["ETag"] == '"1"'
+
+    # Someone else's goal id is not served from the owner's entries
+    assert client.get(f"/api/v1/goals/{goal_id}", headers=auth_headers("intruder@example.com")).status_code == 404
+
+    client.patch(f"/api/v1/tasks/{task['id']}", json={"status": "completed"}, headers=headers)
+    assert client.get(f"/api/v1/tasks/goal/{goal_id}", headers=headers).json()[0]["status"] == "completed"
+    assert client.get(f"/api/v1/goals/{goal_id}", headers=headers).json()["tasks"][0]["status"] == "completed"
+    goals = {g["id"]: g for g in client.get("/api/v1/goals/", headers=headers).json()}
+    assert goals[goal_id]["completed_tasks"] == 1
+    # The untouched goal stayed cached
+    with query_budget(1):
+        client.get(f"/api/v1/goals/{other_goal}", headers=headers)
+
+    assert client.get("/metrics", headers=headers).status_code == 401
+    stats = client.get("/metrics", headers={"Authorization": "Bearer test-metrics-token"}).json()["response_cache"]
+    assert stats["backend"] == "RedisBackend"
+    assert stats["by_kind"]["goal"]["hits"] >= 3
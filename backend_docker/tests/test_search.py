@@ -0,0 +1,46 @@
+from tests.test_main import client
+
+def test_search_goals_and_tasks(client, no_generation, auth_headers):
+    headers = auth_headers("searcher@example.com")
+    goal_id = client.post("/api/v1/goals/", json={"text": "Pass the AWS certification"}, headers=headers).json()["data"]["goal_id"]
+    task = client.post(
+        f"/api/v1/tasks/?goal_id={goal_id}",
+        json={"name": "Book the exam", "description": "Schedule the certification exam slot"},
+        headers=headers
+    ).json()
+
+    response = client.get("/api/v1/search", params={"q": "certif"}, headers=headers)
+    assert response.status_code == 200
+    hits = response.json()["hits"]
+    assert {h["kind"] for h in hits} == {"goal", "task"}
+    assert any(h["id"] == task["id"] for h in hits)
+
+    # Updates and deletes are reflected by the triggers
+    client.patch(f"/api/v1/tasks/{task['id']}", json={"name": "Book the test", "description": "Pick a date"}, headers=headers)
+    hits = client.get("/api/v1/search", params={"q": "test"}, headers=headers).json()["hits"]
+    assert [h["id"] for h in hits] == [task["id"]]
+
+    client.delete(f"/api/v1/tasks/{task['id']}", headers=headers)
+    hits = client.get("/api/v1/search", params={"q": "test"}, headers=headers).json()["hits"]
+    assert hits == []
+
+def test_search_is_scoped_to_user(client, no_generation, auth_headers):
+    owner = auth_headers("owner@example.com")
+    client.post("/api/v1/goals/", json={"text": "Secret kayaking expedition"}, headers=owner)
+
+    other = auth_headers("intruder@example.com")
+    hits = client.get("/api/v1/search", params={"q": "kayaking"}, headers=other).json()["hits"]
+    assert hits == []
+    hits = client.get("/api/v1/search", params={"q": "kayaking"}, headers=owner).json()["hits"]
+    assert len(hits) == 1
+
+def test_search_paginates(client, no_generation, auth_headers):
+    headers = auth_headers("pager@example.com")
+    for i in range(3):
+        client.post("/api/v1/goals/", json={"text": f"Garden project {i}"}, headers=headers)
+
+    page = client.get("/api/v1/search", params={"q": "garden", "limit": 2}, headers=headers).json()
+    assert len(page["hits"]) == 2 and page["has_more"] is True
+    page = client.get("/api/v1/search", params={"q": "garden", "limit": 2, "skip": 2}, headers=headers).json()
+    assert len(page["hits"]) == 1 and page["has_more"] is False
+
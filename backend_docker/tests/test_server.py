@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+
+from app import server
+from app.config import settings
+from app.plan_jobs import PlanJobTracker
+
+def test_worker_count_is_sized_from_cpus(monkeypatch):
+    monkeypatch.setattr(settings, "cache_backend", "redis")
+    monkeypatch.setattr(settings, "web_workers", 0)
+    monkeypatch.setattr(server.os, "cpu_count", lambda: 1)
+    assert server.worker_count() == 2
+    monkeypatch.setattr(server.os, "cpu_count", lambda: 64)
+    assert server.worker_count() == 8
+
+    monkeypatch.setattr(settings, "web_workers", 3)
+    assert server.worker_count() == 3
+
+def test_memory_cache_keeps_a_single_worker(monkeypatch):
+    monkeypatch.setattr(settings, "cache_backend", "memory")
+    monkeypatch.setattr(settings, "web_workers", 0)
+    monkeypatch.setattr(server.os, "cpu_count", lambda: 16)
+    assert server.worker_count() == 1
+    monkeypatch.setattr(settings, "web_workers", 4)
+    with pytest.raises(RuntimeError):
+        server.worker_count()
+
+def test_gunicorn_options_leave_time_to_drain(monkeypatch):
+    monkeypatch.setattr(settings, "shutdown_drain_seconds", 20.0)
+    options = server.gunicorn_options()
+    assert options["preload_app"] is True
+    assert options["worker_class"] == "app.server.TunedUvicornWorker"
+    assert options["graceful_timeout"] > 20
+
+def test_drain_waits_for_in_flight_jobs():
+    tracker = PlanJobTracker(max_concurrency=1)
+    finished = []
+
+    async def job(name):
+        async with tracker.running():
+            async with tracker.semaphore:
+                await asyncio.sleep(0.01)
+                finished.append(name)
+
+    async def main():
+        assert await tracker.drain(timeout=0.1)  # nothing running
+        tasks = [asyncio.create_task(job(n)) for n in ("a", "b")]
+        await asyncio.sleep(0)
+        assert tracker.in_flight == 2  # the queued job counts too
+        assert await tracker.drain(timeout=1.0)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert finished == ["a", "b"]
+
+def test_drain_gives_up_after_timeout():
+    tracker = PlanJobTracker(max_concurrency=1)
+
+    async def main():
+        release = asyncio.Event()
+
+        async def stuck():
+            async with tracker.running():
+                await release.wait()
+
+        task = asyncio.create_task(stuck())
+        await asyncio.sleep(0)
+        assert not await tracker.drain(timeout=0.01)
+        release.set()
+        await task
+        assert tracker.in_flight == 0
+
+    asyncio.run(main())
@@ -0,0 +1,156 @@
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app import crud, database, models, schemas
+from app.database import Base, make_session_factory, _create_engine
+from app.main import app
+from app.shards import HashRing, ShardRouter, move_user, rebalance
+
+def _engines(tmp_path, count):
+    engines = [_create_engine(f"sqlite:///{tmp_path / f'shard{i}.db'}") for i in range(count)]
+    for engine in engines:
+        Base.metadata.create_all(bind=engine)
+    return engines
+
+def _users_on(engine):
+    with make_session_factory(engine)() as db:
+        return {user.email for user in db.query(models.User)}
+
+def test_adding_a_shard_only_moves_users_onto_it():
+    ids = [uuid.uuid4() for _ in range(3000)]
+    before, after = HashRing(3), HashRing(4)
+    moved = [i for i in ids if before.shard_for(i) != after.shard_for(i)]
+
+    assert all(after.shard_for(i) == 3 for i in moved)
+    assert 0.15 < len(moved) / len(ids) < 0.35
+    assert {before.shard_for(i) for i in ids} == {0, 1, 2}
+
+def test_requests_are_served_from_the_callers_shard(tmp_path, monkeypatch, no_generation):
+    engines = _engines(tmp_path, 3)
+    router = ShardRouter(engines)
+    factory = make_session_factory(engines[0], shard_router=router)
+
+    monkeypatch.setattr(database, "SessionLocal", factory)
+    try:
+        with TestClient(app) as client:
+            emails = [f"sharded{i}@example.com" for i in range(12)]
+            for email in emails:
+                client.post("/api/v1/auth/register", json={"email": email, "name": "S", "password": "shardpass123"})
+                token = client.post("/api/v1/auth/login", data={"username": email, "password": "shardpass123"}).json()["access_token"]
+                headers = {"Authorization": f"Bearer {token}"}
+                assert client.post("/api/v1/goals/", json={"text": f"Goal of {email}"}, headers=headers).status_code == 200
+                goals = client.get("/api/v1/goals/", headers=headers).json()
+                assert [g["text"] for g in goals] == [f"Goal of {email}"]
+
+            # Each user lives on exactly one shard, the one the directory names
+            with make_session_factory(engines[0])() as db:
+                directory = {entry.email: entry.shard for entry in db.query(models.UserDirectory)}
+            assert set(directory) == set(emails)
+            assert len(set(directory.values())) > 1
+            for shard, engine in enumerate(engines):
+                assert _users_on(engine) == {e for e, s in directory.items() if s == shard}
+
+            bad = client.post("/api/v1/auth/login", data={"username": "nobody@example.com", "password": "shardpass123"})
+            assert bad.status_code == 401
+    finally:
+        for engine in engines:
+            engine.dispose()
+
+def test_rebalance_moves_users_to_a_new_shard(tmp_path):
+    engines = _engines(tmp_path, 3)
+    old_router = ShardRouter(engines[:2])
+    factory = make_session_factory(engines[0], shard_router=old_router)
+
+    user_ids = {}
+    for i in range(30):
+        with factory() as db:
+            user = crud.create_user(db, schemas.UserCreate(email=f"move{i}@example.com", name="M", password="movepass123"))
+            goal = crud.create_goal(db, schemas.GoalCreate(text=f"goal {i}"), user.id)
+            crud.create_tasks_bulk(db, [
+                {"name": "first", "duration_days": 1, "depends_on": []},
+                {"name": "second", "duration_days": 1, "depends_on": ["first"]},
+            ], goal.id, user.id)
+            user_ids[user.id] = user.email
+
+    router = ShardRouter(engines)
+    planned = rebalance(router, dry_run=True)
+    assert planned and all(target == 2 for _, _, target in planned)
+    assert _users_on(engines[2]) == set()
+
+    moves = rebalance(router)
+    assert moves == planned
+    assert rebalance(router, dry_run=True) == []
+    assert _users_on(engines[2]) == {user_ids[user_id] for user_id, _, _ in moves}
+
+    # Moved users read their full graph from the new shard, nothing is left behind
+    factory = make_session_factory(engines[0], shard_router=router)
+    for user_id, source, _ in moves:
+        with factory() as db:
+            db.info["user_id"] = user_id
+            goals = crud.get_user_goals(db, user_id)
+            assert len(goals) == 1
+            assert db.query(models.TaskDependency).join(
+                models.Task, models.Task.id == models.TaskDependency.task_id
+            ).filter(models.Task.goal_id == goals[0].id).count() == 1
+        with make_session_factory(engines[source])() as db:
+            assert db.query(models.Goal).filter_by(user_id=user_id).count() == 0
+
+    for engine in engines:
+        engine.dispose()
+
+def test_failed_directory_update_leaves_user_on_source(tmp_path, monkeypatch):
+    engines = _engines(tmp_path, 2)
+    router = ShardRouter(engines[:1])
+    with make_session_factory(engines[0], shard_router=router)() as db:
+        user = crud.create_user(db, schemas.UserCreate(email="stay@example.com", name="S", password="staypass123"))
+        crud.create_goal(db, schemas.GoalCreate(text="stay put"), user.id)
+        user_id = user.id
+
+    router = ShardRouter(engines)
+
+    class BrokenDirectory:
+        def begin(self):
+            raise RuntimeError("directory unavailable")
+
+    monkeypatch.setattr(ShardRouter, "directory_engine", property(lambda self: BrokenDirectory()))
+    with pytest.raises(RuntimeError):
+        move_user(router, user_id, 0, 1)
+    assert _users_on(engines[0]) == {"stay@example.com"}
+    assert _users_on(engines[1]) == set()
+
+    monkeypatch.undo()
+    assert move_user(router, user_id, 0, 1) > 0
+    assert _users_on(engines[0]) == set() and _users_on(engines[1]) == {"stay@example.com"}
+    assert router.shard_of_user(user_id) == 1
+
+    for engine in engines:
+        engine.dispose()
+
+def test_failed_registration_removes_the_directory_entry(tmp_path, monkeypatch):
+    engines = _engines(tmp_path, 2)
+    router = ShardRouter(engines)
+
+    def shard_down(connection):
+        raise RuntimeError("shard 1 unavailable")
+
+    # Fails the user's shard at commit time, after the directory could have committed
+    event.listen(engines[1], "commit", shard_down)
+    monkeypatch.setattr(router, "place", lambda user_id: 1)
+    new_user = schemas.UserCreate(email="lost@example.com", name="L", password="lostpass123")
+    with make_session_factory(engines[0], shard_router=router)() as db:
+        with pytest.raises(RuntimeError):
+            crud.create_user(db, new_user)
+    assert router.lookup_email("lost@example.com") is None
+    assert _users_on(engines[1]) == set()
+
+    # The email is free again once the shard can take the user
+    monkeypatch.setattr(router, "place", lambda user_id: 0)
+    with make_session_factory(engines[0], shard_router=router)() as db:
+        user_id = crud.create_user(db, new_user).id
+    assert router.lookup_email("lost@example.com") == (user_id, 0)
+    assert _users_on(engines[0]) == {"lost@example.com"}
+
+    for engine in engines:
+        engine.dispose()
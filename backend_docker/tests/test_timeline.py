@@ -0,0 +1,57 @@
+from datetime import date
+
+import numpy as np
+
+from app.timeline import day_dates, level_schedule
+from tests.test_main import client
+
+def test_level_schedule_respects_capacity_and_dependencies():
+    rng = np.random.default_rng(7)
+    n = 300
+    durations = rng.integers(1, 6, n).astype(float)
+    edges = [(i, j) for i, j in rng.integers(0, n, (400, 2)) if i < j]
+    groups = np.arange(n) % 40
+    first, last, load = level_schedule(durations, edges, 2.5, 2000, groups, 40, np.zeros(n, dtype=bool))
+
+    assert (last >= 0).all()
+    assert load.sum(axis=0).max() <= 2.5 + 1e-9
+    assert np.isclose(load.sum(), durations.sum())
+    assert (last - first + 1 >= durations).all()
+    for prerequisite, dependent in edges:
+        assert first[dependent] > last[prerequisite]
+
+def test_level_schedule_prefers_the_critical_chain_and_ignores_cycles():
+    # 0 -> 1 is the longer chain, so it goes before the lone task 2
+    first, last, _ = level_schedule(np.array([1.0, 3.0, 2.0]), [(0, 1)], 1.0, 30, np.zeros(3, dtype=int), 1, np.zeros(3, dtype=bool))
+    assert list(first) == [0, 1, 4] and list(last) == [0, 3, 5]
+
+    first, last, _ = level_schedule(np.array([1.0, 1.0]), [(0, 1), (1, 0)], 2.0, 30, np.zeros(2, dtype=int), 1, np.zeros(2, dtype=bool))
+    assert (last >= 0).all()
+
+    assert list(day_dates(date(2026, 10, 16), 3, workdays_only=True).astype(str)) == ["2026-10-16", "2026-10-19", "2026-10-20"]
+
+def test_timeline_endpoint_levels_goals_and_is_cached(client, query_budget, no_generation, auth_headers):
+    headers = auth_headers("timeline@example.com")
+    garden = client.post("/api/v1/goals/", json={"text": "Plant a garden"}, headers=headers).json()["data"]["goal_id"]
+    book = client.post("/api/v1/goals/", json={"text": "Read a book"}, headers=headers).json()["data"]["goal_id"]
+    dig = client.post(f"/api/v1/tasks/?goal_id={garden}", json={"name": "Dig", "duration_days": 2}, headers=headers).json()
+    sow = client.post(f"/api/v1/tasks/?goal_id={garden}", json={"name": "Sow", "duration_days": 1}, headers=headers).json()
+    client.post(f"/api/v1/tasks/{sow['id']}/dependencies", params={"depends_on_task_id": dig["id"]}, headers=headers)
+    client.post(f"/api/v1/tasks/?goal_id={book}", json={"name": "Read", "duration_days": 2}, headers=headers)
+
+    url = "/api/v1/timeline?start=2026-01-05&capacity=2"
+    timeline = client.get(url, headers=headers).json()
+    assert timeline["days"] == ["2026-01-05", "2026-01-06", "2026-01-07"]
+    assert timeline["load"] == [2.0, 2.0, 1.0]
+    assert timeline["end"] == "2026-01-07"
+    assert {g["goal_id"]: g["load"] for g in timeline["goals"]} == {garden: [1.0, 1.0, 1.0], book: [1.0, 1.0, 0.0]}
+    assert {t["name"]: (t["start"], t["end"]) for t in timeline["tasks"]}["Sow"] == ("2026-01-07", "2026-01-07")
+
+    with query_budget(1):
+        assert client.get(url, headers=headers).json() == timeline
+
+    # Completed tasks drop out once the cached schedule is invalidated
+    client.patch(f"/api/v1/tasks/{dig['id']}", json={"status": "completed"}, headers=headers)
+    timeline = client.get(url, headers=headers).json()
+    assert timeline["load"] == [2.0, 1.0]
+    assert sorted(t["name"] for t in timeline["tasks"]) == ["Read", "Sow"]
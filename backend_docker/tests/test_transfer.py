@@ -0,0 +1,50 @@
+import json
+
+from tests.test_main import client
+
+def test_export_then_import_round_trip(client, no_generation, auth_headers):
+    source = auth_headers("source@example.com")
+    for goal_text in ("Renovate kitchen", "Learn guitar"):
+        goal_id = client.post("/api/v1/goals/", json={"text": goal_text}, headers=source).json()["data"]["goal_id"]
+        first = client.post(f"/api/v1/tasks/?goal_id={goal_id}", json={"name": f"{goal_text}: plan"}, headers=source).json()
+        second = client.post(f"/api/v1/tasks/?goal_id={goal_id}", json={"name": f"{goal_text}: do", "duration_days": 4}, headers=source).json()
+        client.post(f"/api/v1/tasks/{second['id']}/dependencies", params={"depends_on_task_id": first["id"]}, headers=source)
+
+    response = client.get("/api/v1/export", headers=source)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["type"] for r in records].count("goal") == 2
+    assert [r["type"] for r in records].count("task") == 4
+    assert [r["type"] for r in records].count("dependency") == 2
+    # Every goal is immediately followed by its own tasks and edges
+    current_goal = None
+    for record in records:
+        if record["type"] == "goal":
+            current_goal = record["id"]
+        elif record["type"] == "task":
+            assert record["goal_id"] == current_goal
+
+    target = auth_headers("target@example.com")
+    response = client.post("/api/v1/import", content=response.content, headers=target)
+    assert response.status_code == 200
+    assert response.json()["data"] == {"goals": 2, "tasks": 4, "dependencies": 2, "skipped_dependencies": 0}
+
+    goals = client.get("/api/v1/goals/", headers=target).json()
+    assert sorted(g["text"] for g in goals) == ["Learn guitar", "Renovate kitchen"]
+    assert all(g["task_count"] == 2 for g in goals)
+    old_ids = {r["id"] for r in records if "id" in r}
+    assert not old_ids & {g["id"] for g in goals}
+
+    detail = client.get(f"/api/v1/goals/{goals[0]['id']}", headers=target).json()
+    task_ids = {t["id"] for t in detail["tasks"]}
+    edges = [d["depends_on_task_id"] for t in detail["tasks"] for d in t["dependencies"]]
+    assert len(edges) == 1 and edges[0] in task_ids
+
+def test_import_rejects_malformed_stream(client, auth_headers):
+    headers = auth_headers("broken@example.com")
+    body = '{"type": "export", "version": 1}\n{"type": "goal", "id": "x", "text": "ok"}\nnot json\n'
+    response = client.post("/api/v1/import", content=body, headers=headers)
+    assert response.status_code == 400
+    assert "Line 3" in response.json()["detail"]
+    assert client.get("/api/v1/goals/", headers=headers).json() == []
@@ -0,0 +1,49 @@
+from tests.test_main import client
+
+def _goal(client, headers, text):
+    return client.post("/api/v1/goals/", json={"text": text}, headers=headers).json()["data"]["goal_id"]
+
+def test_task_update_is_one_statement_and_bumps_version(client, query_budget, no_generation, auth_headers):
+    headers = auth_headers("versioned@example.com")
+    goal_id = _goal(client, headers, "Write a novel")
+    task_id = client.post(f"/api/v1/tasks/?goal_id={goal_id}", json={"name": "Outline"}, headers=headers).json()["id"]
+
+    fetched = client.get(f"/api/v1/tasks/{task_id}", headers=headers)
+    assert fetched.headers["ETag"] == '"1"'
+
+    # One statement for auth, one UPDATE ... RETURNING
+    with query_budget(2):
+        response = client.patch(
+            f"/api/v1/tasks/{task_id}", json={"status": "in_progress"},
+            headers={**headers, "If-Match": fetched.headers["ETag"]}
+        )
+    assert response.status_code == 200
+    assert response.json()["status"] == "in_progress"
+    assert response.json()["version"] == 2
+    assert response.headers["ETag"] == '"2"'
+
+    # A second writer still holding version 1 is rejected, and nothing changes
+    stale = client.patch(f"/api/v1/tasks/{task_id}", json={"status": "completed"}, headers={**headers, "If-Match": '"1"'})
+    assert stale.status_code == 409
+    assert "version 2" in stale.json()["detail"]
+    assert client.get(f"/api/v1/tasks/{task_id}", headers=headers).json()["status"] == "in_progress"
+
+    # Without If-Match the write is unconditional
+    assert client.patch(f"/api/v1/tasks/{task_id}", json={"name": "Detailed outline"}, headers=headers).json()["version"] == 3
+    assert client.patch(f"/api/v1/tasks/{task_id}", json={"name": "x"}, headers={**headers, "If-Match": "soon"}).status_code == 400
+
+def test_goal_update_checks_version_and_owner(client, no_generation, auth_headers):
+    headers = auth_headers("versioned-goal@example.com")
+    goal_id = _goal(client, headers, "Run a marathon")
+
+    updated = client.put(f"/api/v1/goals/{goal_id}", json={"text": "Run a half marathon"}, headers={**headers, "If-Match": 'W/"1"'})
+    assert updated.status_code == 200
+    assert updated.json()["version"] == 2
+    assert client.get(f"/api/v1/goals/{goal_id}", headers=headers).headers["ETag"] == '"2"'
+    assert client.put(f"/api/v1/goals/{goal_id}", json={"status": "completed"}, headers={**headers, "If-Match": '"1"'}).status_code == 409
+
+    # Another user's goal looks missing, whatever version they send
+    other = auth_headers("versioned-other@example.com")
+    assert client.put(f"/api/v1/goals/{goal_id}", json={"text": "Mine now"}, headers={**other, "If-Match": '"2"'}).status_code == 404
+    assert client.put(f"/api/v1/goals/{goal_id}", json={"text": "Mine now"}, headers=other).status_code == 404
+    assert client.put("/api/v1/goals/not-a-uuid", json={"text": "x"}, headers=headers).status_code == 400
@@ -51,9 +51,10 @@ export const AuthProvider = ({ children }) => {
         },
       });
 
-      const { access_token } = response.data;
+      const { access_token, refresh_token } = response.data;
       setToken(access_token);
       localStorage.setItem('token', access_token);
+      localStorage.setItem('refreshToken', refresh_token);
       api.defaults.headers.common['Authorization'] = `Bearer ${access_token}`;
 
       // Get user info
@@ -87,9 +88,15 @@ export const AuthProvider = ({ children }) => {
   };
 
   const logout = () => {
+    const refreshToken = localStorage.getItem('refreshToken');
+    if (refreshToken) {
+      // Revoke the session server-side; nothing to do if that fails
+      api.post('/auth/logout', { refresh_token: refreshToken }).catch(() => {});
+    }
     setToken(null);
     setUser(null);
     localStorage.removeItem('token');
+    localStorage.removeItem('refreshToken');
     delete api.defaults.headers.common['Authorization'];
     toast.success('Logged out successfully');
   };
@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { goalService } from '../services/api';
+import { dashboardService } from '../services/api';
 import GoalCard from '../components/goals/GoalCard';
 import CreateGoalModal from '../components/goals/CreateGoalModal';
 import StatsCard from '../components/dashboard/StatsCard';
@@ -16,6 +16,7 @@ const Dashboard = () => {
     completedGoals: 0,
     totalTasks: 0,
     completedTasks: 0,
+    inProgressTasks: 0,
   });
 
   useEffect(() => {
@@ -25,9 +26,10 @@ const Dashboard = () => {
   const fetchGoals = async () => {
     try {
       setIsLoading(true);
-      const response = await goalService.getGoals();
-      setGoals(response.data);
-      calculateStats(response.data);
+      // One aggregate call: goal summaries and task counts computed server-side
+      const response = await dashboardService.getDashboard();
+      setGoals(response.data.goals);
+      updateStats(response.data.stats);
     } catch (error) {
       toast.error('Failed to fetch goals');
       console.error('Error fetching goals:', error);
@@ -36,19 +38,16 @@ const Dashboard = () => {
     }
   };
 
-  const calculateStats = (goalsData) => {
-    const totalGoals = goalsData.length;
-    const activeGoals = goalsData.filter(goal => goal.status === 'active').length;
-    const completedGoals = goalsData.filter(goal => goal.status === 'completed').length;
-    const totalTasks = goalsData.reduce((sum, goal) => sum + (goal.task_count || 0), 0);
-    const completedTasks = goalsData.reduce((sum, goal) => sum + (goal.completed_tasks || 0), 0);
+  const updateStats = (dashboardStats) => {
+    const tasksByStatus = dashboardStats.tasks_by_status || {};
 
     setStats({
-      totalGoals,
-      activeGoals,
-      completedGoals,
-      totalTasks,
-      completedTasks,
+      totalGoals: dashboardStats.total_goals,
+      activeGoals: dashboardStats.active_goals,
+      completedGoals: dashboardStats.completed_goals,
+      totalTasks: dashboardStats.total_tasks,
+      completedTasks: tasksByStatus.completed || 0,
+      inProgressTasks: tasksByStatus.in_progress || 0,
     });
   };
 
@@ -111,7 +110,7 @@ const Dashboard = () => {
         <StatsCard
           title="Total Tasks"
           value={stats.totalTasks}
-          subtitle={`${stats.completedTasks} completed`}
+          subtitle={`${stats.completedTasks} completed, ${stats.inProgressTasks} in progress`}
           icon={<Zap />}
           color="#8b5cf6"
         />
@@ -23,13 +23,48 @@ api.interceptors.request.use(
   }
 );
 
+// One refresh at a time; requests that fail meanwhile wait for the same one
+let refreshPromise = null;
+
+const refreshAccessToken = () => {
+  if (!refreshPromise) {
+    const refreshToken = localStorage.getItem('refreshToken');
+    refreshPromise = (refreshToken
+      ? api.post('/auth/refresh', { refresh_token: refreshToken })
+      : Promise.reject(new Error('No refresh token'))
+    ).then((response) => {
+      const { access_token, refresh_token } = response.data;
+      localStorage.setItem('token', access_token);
+      localStorage.setItem('refreshToken', refresh_token);
+      api.defaults.headers.common['Authorization'] = `Bearer ${access_token}`;
+      return access_token;
+    }).finally(() => {
+      refreshPromise = null;
+    });
+  }
+  return refreshPromise;
+};
+
 // Response interceptor for error handling
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
+  async (error) => {
+    const request = error.config;
+    if (error.response?.status === 401 && request && !request._retried && !request.url?.startsWith('/auth/')) {
+      // Access token expired: get a new one with the refresh token and retry once
+      request._retried = true;
+      try {
+        const token = await refreshAccessToken();
+        request.headers.Authorization = `Bearer ${token}`;
+        return api(request);
+      } catch (refreshError) {
+        // Fall through to the login redirect below
+      }
+    }
     if (error.response?.status === 401) {
       // Token expired or invalid
       localStorage.removeItem('token');
+      localStorage.removeItem('refreshToken');
       window.location.href = '/login';
       toast.error('Session expired. Please log in again.');
     } else if (error.response?.status >= 500) {
@@ -54,15 +89,25 @@ export const authService = {
 export const goalService = {
   getGoals: () => api.get('/goals/'),
   getGoal: (goalId) => api.get(`/goals/${goalId}`),
+  getGoalGraph: (goalId) => api.get(`/goals/${goalId}/graph`),
+  updateDependencies: (goalId, edges, options = {}) =>
+    api.post(`/goals/${goalId}/dependencies/bulk`, { edges, ...options }),
   createGoal: (goalData) => api.post('/goals/', goalData),
-  updateGoal: (goalId, goalData) => api.put(`/goals/${goalId}`, goalData),
+  // Pass the version the edit started from to get a 409 instead of overwriting someone else's change
+  updateGoal: (goalId, goalData, version) =>
+    api.put(`/goals/${goalId}`, goalData, version ? { headers: { 'If-Match': `"${version}"` } } : undefined),
   deleteGoal: (goalId) => api.delete(`/goals/${goalId}`),
   regenerateTasks: (goalId) => api.post(`/goals/${goalId}/regenerate-tasks`),
 };
 
+export const dashboardService = {
+  getDashboard: () => api.get('/dashboard'),
+};
+
 export const taskService = {
   getTask: (taskId) => api.get(`/tasks/${taskId}`),
-  updateTask: (taskId, taskData) => api.patch(`/tasks/${taskId}`, taskData),
+  updateTask: (taskId, taskData, version) =>
+    api.patch(`/tasks/${taskId}`, taskData, version ? { headers: { 'If-Match': `"${version}"` } } : undefined),
   deleteTask: (taskId) => api.delete(`/tasks/${taskId}`),
   addDependency: (taskId, dependsOnTaskId) => 
     api.post(`/tasks/${taskId}/dependencies`, { depends_on_task_id: dependsOnTaskId }),
@@ -71,4 +116,5 @@ export const taskService = {
   createTask: (taskData, goalId) => 
     api.post(`/tasks/?goal_id=${goalId}`, taskData),
   getGoalTasks: (goalId) => api.get(`/tasks/goal/${goalId}`),
+  getReadyTasks: (params = {}) => api.get('/tasks/ready', { params }),
 };
\ No newline at end of file